@@ -0,0 +1,251 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import socket
+from typing import Optional
+
+logger = logging.getLogger()
+
+HELP = {
+    "stats": "Counters, gauges and latency percentiles",
+    "reload": "Reload the index from the data file",
+    "set <name> <value>": "Change a tunable (see 'settings')",
+    "settings": "Current values of the live tunables",
+    "index": "Size, memory footprint and source file of the loaded index",
+    "resources [n]": "Last n resource samples (default 10)",
+    "slowlog [n]": "Last n requests over the slow threshold (default 10)",
+    "stalls [n]": "Last n event-loop stalls with their stacks (default 5)",
+    "profile start [seconds]": "Start a sampling profiler window",
+    "profile stop": "Stop the profiler and write its output",
+    "help": "This list",
+}
+
+
+# Local control socket for operating a running AsyncTCPServer
+class AdminControl:
+    # Speaks a line protocol over a Unix socket: one command per line,
+    # one JSON object per reply. Connections stay open until EOF so a
+    # shell session (e.g. `socat - UNIX-CONNECT:path`) can issue several.
+    def __init__(self, server) -> None:
+        self.server = server
+        self.path: Optional[str] = None
+        self.listener = None
+        # name -> (type, getter, setter) for `set`
+        self.tunables = {
+            "rate_limit": (
+                int,
+                lambda: server.rate_limit,
+                lambda value: setattr(server, "rate_limit", value),
+            ),
+            "log_sample_rate": (
+                float,
+                lambda: server.log_sample_rate,
+                lambda value: setattr(server, "log_sample_rate", value),
+            ),
+            "trace_sample_rate": (
+                float,
+                lambda: server.trace_writer.sample_rate,
+                lambda value: setattr(
+                    server.trace_writer, "sample_rate", value
+                ),
+            ),
+        }
+        self.tunables["slow_threshold_ms"] = (
+            float,
+            lambda: server.slow_log.threshold * 1000,
+            lambda value: setattr(server.slow_log, "threshold", value / 1000),
+        )
+        for kind in ("read", "write", "request"):
+            self.tunables[f"{kind}_timeout"] = (
+                float,
+                lambda kind=kind: server.timeouts[kind],
+                lambda value, kind=kind: server.timeouts.__setitem__(
+                    kind, value
+                ),
+            )
+
+    async def start(self, path: str) -> None:
+        # Listens on `path`, readable and writable by the owner only.
+        if os.path.exists(path):
+            os.remove(path)
+        self.path = path
+        self.listener = await asyncio.start_unix_server(
+            self.handle_connection, path=path
+        )
+        os.chmod(path, 0o600)
+        logger.info(f"Admin socket listening on {path}")
+
+    async def close(self) -> None:
+        if self.listener:
+            self.listener.close()
+            await self.listener.wait_closed()
+            self.listener = None
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+    async def handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                command = line.decode("utf-8", "replace").strip()
+                if not command:
+                    continue
+                reply = await self.execute(command)
+                writer.write((json.dumps(reply) + "\n").encode("utf-8"))
+                await writer.drain()
+        except ConnectionError as e:
+            logger.debug("Admin connection dropped: %s", e)
+        finally:
+            writer.close()
+
+    async def execute(self, command: str) -> dict:
+        # Runs one command and returns its JSON-serialisable reply.
+        name, *args = command.split()
+        handler = getattr(self, f"command_{name}", None)
+        if handler is None:
+            return {"ok": False, "error": f"Unknown command: {name}"}
+        try:
+            result = handler(*args)
+            if asyncio.iscoroutine(result):
+                result = await result
+        except (TypeError, ValueError) as e:
+            return {"ok": False, "error": str(e)}
+        except Exception as e:
+            logger.error(f"Admin command '{command}' failed: {e}")
+            return {"ok": False, "error": str(e)}
+        logger.info(f"Admin command: {command}")
+        return dict({"ok": True}, **result)
+
+    def command_help(self) -> dict:
+        return {"commands": HELP}
+
+    def command_stats(self) -> dict:
+        server = self.server
+        return {
+            "total_requests": server.total_requests,
+            "successful_requests": server.successful_requests,
+            "failed_requests": server.failed_requests,
+            "deadline_cuts": dict(server.deadline_cuts),
+            "open_connections": server.open_connections,
+            "executor": {
+                "type": server.executor_type, "workers": server.workers
+            },
+            "index_entries": (
+                len(server.file_content) if server.file_content else 0
+            ),
+            "index_generation": server.index_generation,
+            "latency_us": {
+                name: {
+                    f"p{q:g}": ns / 1000
+                    for q, ns in histogram.percentiles(
+                        (50, 90, 99, 99.9)
+                    ).items()
+                }
+                for name, histogram in server.latency.items()
+            },
+            "profiling": server.profiler.running,
+            "resources": server.resources.latest,
+            "event_loop": (
+                server.watchdog.summary() if server.watchdog else None
+            ),
+        }
+
+    def command_stalls(self, count: str = "5") -> dict:
+        watchdog = self.server.watchdog
+        if watchdog is None:
+            raise ValueError("Loop watchdog is disabled")
+        stalls = list(watchdog.stalls)
+        return dict(
+            watchdog.summary(),
+            entries=stalls[-int(count):] if int(count) else []
+        )
+
+    def command_slowlog(self, count: str = "10") -> dict:
+        slow_log = self.server.slow_log
+        return {
+            "threshold_ms": slow_log.threshold * 1000,
+            "recorded": slow_log.recorded,
+            "entries": slow_log.recent(int(count)),
+        }
+
+    def command_index(self) -> dict:
+        return {"file": self.server.file_path, **self.server.index_stats}
+
+    def command_resources(self, count: str = "10") -> dict:
+        samples = list(self.server.resources.samples)
+        return {"samples": samples[-int(count):] if int(count) else []}
+
+    def command_settings(self) -> dict:
+        return {
+            name: getter()
+            for name, (_, getter, _) in self.tunables.items()
+        }
+
+    def command_set(self, name: str, value: str) -> dict:
+        if name not in self.tunables:
+            raise ValueError(
+                f"Unknown setting: {name} "
+                f"(available: {', '.join(self.tunables)})"
+            )
+        kind, getter, setter = self.tunables[name]
+        parsed = kind(value)
+        if parsed < 0 or (name.endswith("sample_rate") and parsed > 1):
+            raise ValueError(f"Value out of range for {name}: {value}")
+        previous = getter()
+        setter(parsed)
+        return {"setting": name, "previous": previous, "value": parsed}
+
+    async def command_reload(self) -> dict:
+        await self.server.load_file_content()
+        return {"index_generation": self.server.index_generation}
+
+    def command_profile(
+        self, action: str, seconds: Optional[str] = None
+    ) -> dict:
+        profiler = self.server.profiler
+        if action == "start":
+            started = profiler.start(float(seconds) if seconds else None)
+            return {"started": started, "output": profiler.output_path}
+        if action == "stop":
+            return {"stopped": profiler.stop(), "output": profiler.output_path}
+        raise ValueError(f"Unknown profile action: {action}")
+
+
+def send_command(path: str, command: str, timeout: float = 30.0) -> dict:
+    # Sends one command to a running server's admin socket.
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(path)
+        sock.sendall(command.encode("utf-8") + b"\n")
+        reply = b""
+        while not reply.endswith(b"\n"):
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            reply += chunk
+    return json.loads(reply)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Send a command to the server's admin socket."
+    )
+    parser.add_argument(
+        "--socket", type=str,
+        default=os.environ.get("ADMIN_SOCKET", "/tmp/tcpserver-admin.sock"),
+        help="Admin socket path"
+    )
+    parser.add_argument("command", nargs="+", help="Command, e.g. stats")
+    args = parser.parse_args()
+    print(json.dumps(send_command(args.socket, " ".join(args.command)),
+                     indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+import asyncio
+import collections
+import ssl
+import time
+from typing import Deque, Iterable, List, Optional
+
+# Longest query the server accepts, in bytes
+MAX_QUERY_BYTES = 1024
+
+
+class QueryError(Exception):
+    # The server answered with an error message (rate limit, invalid
+    # query, internal error) instead of a lookup result.
+    def __init__(self, reply: str) -> None:
+        super().__init__(reply)
+        self.reply = reply
+
+
+def parse_reply(reply: str) -> bool:
+    # Maps a reply line from query_in_file to whether the query was found.
+    if reply.startswith("Query '"):
+        if reply.endswith("' EXISTS"):
+            return True
+        if reply.endswith("' NOT FOUND"):
+            return False
+    raise QueryError(reply)
+
+
+class Connection:
+    # One keep-alive connection to AsyncTCPServer. Queries are written
+    # newline-terminated and their futures queued in order; a reader task
+    # resolves them as reply lines arrive, so several queries can be in
+    # flight (pipelined) at once. Any read or write failure closes the
+    # connection and fails every query still waiting on it.
+    def __init__(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self.reader = reader
+        self.writer = writer
+        self.pending: Deque[asyncio.Future] = collections.deque()
+        self.replies = 0
+        self.last_used = time.monotonic()
+        self.closed = False
+        self.reader_task = asyncio.create_task(self.read_replies())
+
+    @property
+    def in_flight(self) -> int:
+        return len(self.pending)
+
+    async def read_replies(self) -> None:
+        error: Exception = ConnectionError("Server closed the connection")
+        try:
+            while self.pending or not self.closed:
+                line = await self.reader.readline()
+                if not line.endswith(b"\n"):
+                    break  # EOF, possibly in the middle of a reply
+                if not self.pending:
+                    error = ConnectionError(f"Unexpected reply: {line!r}")
+                    break
+                future = self.pending.popleft()
+                self.replies += 1
+                self.last_used = time.monotonic()
+                if not future.done():
+                    future.set_result(line[:-1].decode("utf-8"))
+        except asyncio.CancelledError:
+            error = ConnectionError("Connection closed")
+        except Exception as e:
+            error = e
+        self.fail(error)
+
+    def send(self, data: bytes) -> asyncio.Future:
+        # Writes one framed query and returns the future of its reply.
+        # The future is queued before anything is awaited, so replies
+        # always match the order queries were written in.
+        if self.closed:
+            raise ConnectionError("Connection closed")
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append(future)
+        self.last_used = time.monotonic()
+        self.writer.write(data + b"\n")
+        return future
+
+    def fail(self, error: Exception) -> None:
+        self.closed = True
+        while self.pending:
+            future = self.pending.popleft()
+            if not future.done():
+                future.set_exception(error)
+        self.writer.close()
+
+    async def close(self) -> None:
+        if not self.closed:
+            self.fail(ConnectionError("Connection closed"))
+        self.reader_task.cancel()
+        try:
+            await self.reader_task
+        except asyncio.CancelledError:
+            pass
+        try:
+            await self.writer.wait_closed()
+        except (OSError, ssl.SSLError):
+            pass  # Already reset by the peer
+
+
+class AsyncSearchClient:
+    # Importable asyncio client for the search daemon.
+    #
+    # Keeps up to `max_connections` keep-alive connections open (TCP,
+    # TLS or a Unix socket) and reuses them across lookups. A lookup
+    # takes an idle connection if there is one, opens a new one while
+    # under the limit, and otherwise is pipelined onto the least busy
+    # connection, up to `pipeline_depth` queries deep (1 disables
+    # pipelining). The TLS context is built once and shared by every
+    # connection. Connections idle longer than `idle_timeout` are
+    # dropped before the server's own read deadline closes them, and a
+    # lookup that still loses its connection is retried `retries` times.
+    #
+    #     async with AsyncSearchClient("127.0.0.1", 44445) as client:
+    #         found = await client.contains("example search")
+    def __init__(
+            self,
+            host: str = "127.0.0.1",
+            port: int = 44445,
+            use_ssl: bool = False,
+            cert_path: Optional[str] = None,
+            ssl_context: Optional[ssl.SSLContext] = None,
+            unix_socket: Optional[str] = None,
+            max_connections: int = 10,
+            pipeline_depth: int = 16,
+            connect_timeout: float = 10.0,
+            request_timeout: float = 10.0,
+            idle_timeout: float = 5.0,
+            retries: int = 1
+    ) -> None:
+        if max_connections < 1 or pipeline_depth < 1:
+            raise ValueError(
+                "max_connections and pipeline_depth must be at least 1"
+            )
+        self.host = host
+        self.port = port
+        self.unix_socket = unix_socket
+        self.ssl_context = ssl_context
+        if self.ssl_context is None and use_ssl:
+            # Verify against `cert_path` (e.g. the self-signed cert.pem)
+            # if given, otherwise against the system CAs
+            self.ssl_context = ssl.create_default_context(cafile=cert_path)
+            if cert_path:
+                # A pinned certificate; the bundled one has no SAN entry
+                self.ssl_context.check_hostname = False
+        self.max_connections = max_connections
+        self.pipeline_depth = pipeline_depth
+        self.connect_timeout = connect_timeout
+        self.request_timeout = request_timeout
+        self.idle_timeout = idle_timeout
+        self.retries = retries
+
+        self.connections: List[Connection] = []
+        self.opening = 0  # Connections being established
+        self.connects = 0  # Connections opened over the client's life
+        self.condition = asyncio.Condition()
+        self.closed = False
+
+    async def __aenter__(self) -> "AsyncSearchClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    def stats(self) -> dict:
+        # Pool state, e.g. to check that lookups reuse connections.
+        return {
+            "connections": len(self.connections),
+            "in_flight": sum(c.in_flight for c in self.connections),
+            "connects": self.connects,
+        }
+
+    async def lookup(self, query: str) -> str:
+        # Sends one query and returns the server's reply line, without
+        # its newline.
+        data = query.encode("utf-8")
+        if b"\n" in data or b"\r" in data:
+            raise ValueError("Queries cannot contain line breaks")
+        if len(data) > MAX_QUERY_BYTES:
+            raise ValueError(
+                f"Query is {len(data)} bytes; the server accepts at most "
+                f"{MAX_QUERY_BYTES}"
+            )
+
+        attempt = 0
+        while True:
+            connection, future = await self.send(data)
+            try:
+                return await asyncio.wait_for(future, self.request_timeout)
+            except asyncio.TimeoutError:
+                # A late reply would be matched to the wrong query
+                await self.discard(connection)
+                raise
+            except (ConnectionError, asyncio.IncompleteReadError):
+                await self.discard(connection)
+                if attempt >= self.retries:
+                    raise
+                attempt += 1  # Lookups are read-only, so safe to resend
+            finally:
+                async with self.condition:
+                    self.condition.notify()
+
+    async def contains(self, query: str) -> bool:
+        # Whether the query is a line of the served file. Raises
+        # QueryError if the server answered with an error message.
+        return parse_reply(await self.lookup(query))
+
+    async def contains_many(self, queries: Iterable[str]) -> List[bool]:
+        # Looks up many queries concurrently over the pool; results are
+        # in the order of `queries`.
+        return list(await asyncio.gather(
+            *(self.contains(query) for query in queries)
+        ))
+
+    async def send(self, data: bytes):
+        # Picks a connection and writes the query to it, opening a new
+        # connection when no open one is idle and the pool has room.
+        async with self.condition:
+            while True:
+                if self.closed:
+                    raise ConnectionError("Client is closed")
+                await self.prune()
+                connection = min(
+                    self.connections, key=lambda c: c.in_flight, default=None
+                )
+                if connection is not None and connection.in_flight == 0:
+                    return connection, connection.send(data)
+                if len(self.connections) + self.opening < self.max_connections:
+                    self.opening += 1
+                    break
+                if connection is not None and \
+                        connection.in_flight < self.pipeline_depth:
+                    return connection, connection.send(data)
+                await self.condition.wait()
+
+        try:
+            connection = await asyncio.wait_for(
+                self.connect(), self.connect_timeout
+            )
+        finally:
+            async with self.condition:
+                self.opening -= 1
+                self.condition.notify()
+        self.connects += 1
+        if self.closed:
+            await connection.close()
+            raise ConnectionError("Client is closed")
+        self.connections.append(connection)
+        return connection, connection.send(data)
+
+    async def connect(self) -> Connection:
+        if self.unix_socket:
+            reader, writer = await asyncio.open_unix_connection(
+                self.unix_socket
+            )
+        else:
+            reader, writer = await asyncio.open_connection(
+                self.host, self.port, ssl=self.ssl_context
+            )
+        return Connection(reader, writer)
+
+    async def prune(self) -> None:
+        # Drops closed connections and those idle past `idle_timeout`.
+        now = time.monotonic()
+        for connection in list(self.connections):
+            if connection.closed or (
+                connection.in_flight == 0
+                and now - connection.last_used > self.idle_timeout
+            ):
+                self.connections.remove(connection)
+                await connection.close()
+
+    async def discard(self, connection: Connection) -> None:
+        if connection in self.connections:
+            self.connections.remove(connection)
+        await connection.close()
+
+    async def close(self) -> None:
+        # Closes every connection; queries still in flight fail.
+        self.closed = True
+        connections, self.connections = self.connections, []
+        for connection in connections:
+            await connection.close()
+        async with self.condition:
+            self.condition.notify_all()
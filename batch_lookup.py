@@ -0,0 +1,83 @@
+import hashlib
+import sys
+from typing import Iterable, Iterator, List, Union
+
+import numpy as np
+
+
+def line_hash(line: Union[str, bytes]) -> int:
+    # Stable 64-bit digest of a line (str lines are hashed as UTF-8).
+    # Unlike hash(), it is the same in every process, so an index stays
+    # valid in executor workers. benchmark_memory uses it too.
+    if isinstance(line, str):
+        line = line.encode("utf-8")
+    return int.from_bytes(
+        hashlib.blake2b(line, digest_size=8).digest(), "little"
+    )
+
+
+def hash_lines(lines: Iterable[str], count: int = -1) -> np.ndarray:
+    # Digests of `lines` as a uint64 array.
+    return np.fromiter(map(line_hash, lines), dtype=np.uint64, count=count)
+
+
+# Sorted uint64 digests of the distinct lines, answered in batches
+class HashIndex:
+    # Lines are kept in digest order next to the sorted digests. A batch
+    # of queries is hashed, located with one np.searchsorted, and every
+    # digest match is verified against the stored line, so a collision
+    # can never produce a false hit. Drop-in for the set used by
+    # query_in_file: supports `in`, len() and iteration.
+    def __init__(self, lines: Iterable[str]) -> None:
+        distinct = list(set(lines))
+        hashes = hash_lines(distinct, len(distinct))
+        order = np.argsort(hashes, kind="stable")
+        self.hashes = hashes[order]
+        self.lines: List[str] = [distinct[i] for i in order]
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.lines)
+
+    def __contains__(self, query: str) -> bool:
+        return bool(self.contains_batch([query])[0])
+
+    def __sizeof__(self) -> int:
+        # Digest array plus the list of lines (strings counted separately)
+        return object.__sizeof__(self) + self.hashes.nbytes + \
+            sys.getsizeof(self.lines)
+
+    def contains_batch(self, queries: List[str]) -> np.ndarray:
+        # Returns a bool array: whether each query is a stored line.
+        wanted = hash_lines(queries, len(queries))
+        positions = np.searchsorted(self.hashes, wanted)
+        found = np.zeros(len(queries), dtype=bool)
+        size = len(self.lines)
+        in_range = positions < size
+        candidates = np.flatnonzero(in_range)
+        candidates = candidates[
+            self.hashes[positions[candidates]] == wanted[candidates]
+        ]
+        lines = self.lines
+        hashes = self.hashes
+        for i in candidates.tolist():
+            position = int(positions[i])
+            query = queries[i]
+            # Equal digests are adjacent; check each one's line
+            while position < size and hashes[position] == wanted[i]:
+                if lines[position] == query:
+                    found[i] = True
+                    break
+                position += 1
+        return found
+
+
+def query_batch(queries: List[str], index: HashIndex) -> List[str]:
+    # Batch counterpart of server.query_in_file, with the same replies.
+    stripped = [query.strip() for query in queries]
+    return [
+        f"Query '{query}' EXISTS" if hit else f"Query '{query}' NOT FOUND"
+        for query, hit in zip(queries, index.contains_batch(stripped))
+    ]
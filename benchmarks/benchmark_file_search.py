@@ -1,11 +1,29 @@
+"""Benchmark build cost, query latency and memory of line-search algorithms"""
+import argparse
+import json
 import os
 import tempfile
 import random
+import statistics
+import sys
+import tracemalloc
 import pandas as pd
 import matplotlib.pyplot as plt
+from collections import defaultdict
 from fpdf import FPDF
 import time
 
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)  # For batch_lookup
+
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000, 10_000_000)
+DEFAULT_BATCH_SIZES = (1, 16, 256, 4096)
+TRIE_END = "\0"  # Marks a complete line inside the trie
+# A dict per trie node costs kilobytes per line, so the trie is skipped
+# for files larger than this many bytes instead of exhausting memory
+MAX_TRIE_BYTES = 2_000_000
+
 
 def generate_file(file_path: str, num_lines: int) -> None:
     """Generate a test file with random data lines"""
@@ -35,23 +53,38 @@ def binary_search(lines, query):
 
 def hash_based_search(lines, query):
     """Hash table-based search implementation"""
-    return query in set(lines)
+    return hash_lookup(set(lines), query)
 
 
-def trie_search(lines, query):
-    """Trie-based search implementation"""
-    from collections import defaultdict
-    trie = defaultdict(dict)
+def hash_lookup(index, query):
+    """Membership test against a prebuilt set"""
+    return query in index
+
+
+def build_trie(lines):
+    """Build a nested-dict trie in which complete lines end in TRIE_END"""
+    trie = {}
     for line in lines:
         current = trie
         for char in line.strip():
             current = current.setdefault(char, {})
+        current[TRIE_END] = True
+    return trie
+
+
+def trie_lookup(trie, query):
+    """Exact-match lookup in a trie built by build_trie"""
     current = trie
     for char in query:
         if char not in current:
             return False
         current = current[char]
-    return True
+    return TRIE_END in current
+
+
+def trie_search(lines, query):
+    """Trie-based search implementation"""
+    return trie_lookup(build_trie(lines), query)
 
 
 def regex_search(lines, query):
@@ -61,6 +94,35 @@ def regex_search(lines, query):
     return any(pattern.search(line) for line in lines)
 
 
+def regex_lookup(lines, query):
+    """Whole-line regex match against a plain list of lines"""
+    import re
+    pattern = re.compile(re.escape(query))
+    return any(pattern.fullmatch(line) for line in lines)
+
+
+def build_hash_index(lines):
+    """Sorted NumPy digest index from batch_lookup"""
+    from batch_lookup import HashIndex
+    return HashIndex(lines)
+
+
+def hash_index_lookup(index, query):
+    """Single-query lookup in a HashIndex (a batch of one)"""
+    return query in index
+
+
+# name: (build, lookup, scans every line per query)
+ALGORITHMS = {
+    "Linear": (list, linear_search, True),
+    "Binary": (sorted, binary_search, False),
+    "Hash": (set, hash_lookup, False),
+    "Trie": (build_trie, trie_lookup, False),
+    "Regex": (list, regex_lookup, True),
+    "NumPy": (build_hash_index, hash_index_lookup, False),
+}
+
+
 def benchmark_search(method, lines, query):
     """Benchmark a search method's performance"""
     start_time = time.perf_counter()
@@ -68,19 +130,227 @@ def benchmark_search(method, lines, query):
     return (time.perf_counter() - start_time) * 1000
 
 
-import pandas as pd
-from collections import defaultdict
+def load_lines(file_path):
+    """Read a generated file into a list of lines without newlines"""
+    with open(file_path, "r") as f:
+        return f.read().splitlines()
 
 
-def run_benchmarks():
-    # ... existing code ...
+def make_queries(lines, count, hit_ratio=0.5, seed=0):
+    """Return (query, expected) pairs mixing present and absent lines"""
+    rng = random.Random(seed)
+    queries = []
+    for i in range(count):
+        if rng.random() < hit_ratio:
+            queries.append((rng.choice(lines), True))
+        else:
+            # generate_file only writes "line-N", so these always miss
+            queries.append((f"absent-{i}", False))
+    return queries
+
+
+def measure_build(build, lines):
+    """Return (structure, build time in ms, peak traced memory in bytes).
+
+    The build is run twice: once untraced for the timing and once under
+    tracemalloc for the memory peak, since tracing slows allocation. The
+    peak covers what the build allocates; the line strings are shared."""
+    start_time = time.perf_counter()
+    structure = build(lines)
+    build_ms = (time.perf_counter() - start_time) * 1000
+    del structure
+
+    tracemalloc.start()
+    try:
+        structure = build(lines)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return structure, build_ms, peak
+
+
+def measure_queries(lookup, structure, queries, warmup=100, repeat=5):
+    """Time each query against a prebuilt structure.
+
+    Every query is run `repeat` times back to back and the mean is kept,
+    which keeps timer overhead out of sub-microsecond lookups. Returns
+    {True: [...], False: [...]} per-query latencies in microseconds,
+    split by hit and miss."""
+    for query, _ in queries[:warmup]:
+        lookup(structure, query)
+
+    samples = {True: [], False: []}
+    clock = time.perf_counter_ns
+    for query, expected in queries:
+        start_time = clock()
+        for _ in range(repeat):
+            found = lookup(structure, query)
+        elapsed = clock() - start_time
+        if found != expected:
+            raise AssertionError(f"Wrong answer for {query!r}")
+        samples[expected].append(elapsed / repeat / 1000)
+    return samples
+
+
+def make_dataset(file_path, size, num_queries, hit_ratio, seed,
+                 length="uniform:8:64", unicode_ratio=0.0,
+                 duplicate_rate=0.0, zipf_s=1.0):
+    """Write a datasets.py file and return (lines, queries) for it"""
+    from datasets import generate_dataset, generate_queries
+    lines = generate_dataset(
+        file_path, size, length, unicode_ratio, duplicate_rate, seed
+    )
+    queries = generate_queries(
+        lines, num_queries, hit_ratio, zipf_s, length, unicode_ratio, seed
+    )
+    return lines, queries
+
+
+def run_batch_benchmarks(
+    sizes=DEFAULT_SIZES,
+    batch_sizes=DEFAULT_BATCH_SIZES,
+    num_queries=100_000,
+    hit_ratio=0.5,
+    seed=0
+):
+    """Compare batch throughput of the NumPy engine with per-query set
+    membership over the same queries, one row per (size, batch size)"""
+    from batch_lookup import HashIndex
+    random.seed(seed)
+    data = defaultdict(list)
 
-    # Use a dictionary to store results
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for size in sizes:
+            file_path = os.path.join(tmpdir, f"lines_{size}.txt")
+            generate_file(file_path, size)
+            lines = load_lines(file_path)
+            queries = [
+                q for q, _ in make_queries(lines, num_queries, hit_ratio,
+                                           seed)
+            ]
+            index = set(lines)
+            hash_index = HashIndex(lines)
+            expected = [q in index for q in queries]
+
+            for batch_size in batch_sizes:
+                batches = [
+                    queries[i:i + batch_size]
+                    for i in range(0, len(queries), batch_size)
+                ]
+                start_time = time.perf_counter()
+                for batch in batches:
+                    [q in index for q in batch]
+                set_seconds = time.perf_counter() - start_time
+
+                start_time = time.perf_counter()
+                found = [hash_index.contains_batch(b) for b in batches]
+                numpy_seconds = time.perf_counter() - start_time
+                if [bool(x) for f in found for x in f] != expected:
+                    raise AssertionError("NumPy engine disagrees with set")
+
+                data["File Size"].append(size)
+                data["Batch Size"].append(batch_size)
+                data["Set (queries/s)"].append(len(queries) / set_seconds)
+                data["NumPy (queries/s)"].append(
+                    len(queries) / numpy_seconds
+                )
+                print(
+                    f"{size:>10} lines  batch={batch_size:<5} "
+                    f"set={len(queries) / set_seconds:12.0f} q/s  "
+                    f"numpy={len(queries) / numpy_seconds:12.0f} q/s"
+                )
+            del lines, index, hash_index
+
+    return pd.DataFrame(data)
+
+
+def percentile(ordered, q):
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q / 100))]
+
+
+def run_benchmarks(
+    sizes=DEFAULT_SIZES,
+    num_queries=1000,
+    hit_ratio=0.5,
+    warmup=100,
+    repeat=5,
+    scan_limit=1_000_000,
+    algorithms=None,
+    seed=0,
+    dataset=None,
+    max_trie_bytes=MAX_TRIE_BYTES
+):
+    """Benchmark build cost, query latency and memory for each algorithm
+    and file size, returning one DataFrame row per (algorithm, size).
+
+    `dataset` switches from generate_file to datasets.py: a dict with
+    any of length, unicode_ratio, duplicate_rate and zipf_s. The trie is
+    skipped for files larger than `max_trie_bytes`."""
+    random.seed(seed)
     data = defaultdict(list)
-    for name, size, time_taken in results:
-        data["Algorithm"].append(name)
-        data["File Size"].append(size)
-        data["Time (ms)"].append(time_taken)
+    names = algorithms or list(ALGORITHMS)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for size in sizes:
+            file_path = os.path.join(tmpdir, f"lines_{size}.txt")
+            if dataset is None:
+                generate_file(file_path, size)
+                lines = load_lines(file_path)
+                queries = make_queries(lines, num_queries, hit_ratio, seed)
+            else:
+                lines, queries = make_dataset(
+                    file_path, size, num_queries, hit_ratio, seed, **dataset
+                )
+
+            file_bytes = os.path.getsize(file_path)
+
+            for name in names:
+                if name == "Trie" and file_bytes > max_trie_bytes:
+                    print(f"{name:<7} {size:>10} lines  skipped (file over "
+                          f"{max_trie_bytes} bytes)")
+                    continue
+                build, lookup, scans = ALGORITHMS[name]
+                # Full scans over huge files take seconds per query
+                scan_queries = queries
+                if scans and size > scan_limit:
+                    scan_queries = queries[:max(10, num_queries // 100)]
+
+                structure, build_ms, peak = measure_build(build, lines)
+                samples = measure_queries(
+                    lookup, structure, scan_queries,
+                    warmup=min(warmup, len(scan_queries)),
+                    repeat=1 if scans else repeat
+                )
+                del structure
+
+                combined = sorted(samples[True] + samples[False])
+                hits = sorted(samples[True])
+                misses = sorted(samples[False])
+                data["Algorithm"].append(name)
+                data["File Size"].append(size)
+                data["Build (ms)"].append(build_ms)
+                data["Time (ms)"].append(statistics.median(combined) / 1000)
+                data["Mean (us)"].append(statistics.mean(combined))
+                data["Stdev (us)"].append(
+                    statistics.stdev(combined) if len(combined) > 1 else 0.0
+                )
+                data["p50 (us)"].append(percentile(combined, 50))
+                data["p99 (us)"].append(percentile(combined, 99))
+                data["Hit p50 (us)"].append(percentile(hits, 50))
+                data["Miss p50 (us)"].append(percentile(misses, 50))
+                data["Peak Memory (MB)"].append(peak / 2**20)
+                data["Queries"].append(len(combined))
+                print(
+                    f"{name:<7} {size:>10} lines  "
+                    f"build={build_ms:10.1f} ms  "
+                    f"p50={percentile(combined, 50):10.2f} us  "
+                    f"p99={percentile(combined, 99):10.2f} us  "
+                    f"peak={peak / 2**20:8.1f} MB"
+                )
+            del lines
 
     # Create DataFrame from dictionary
     df = pd.DataFrame(data)
@@ -94,32 +364,204 @@ def run_benchmarks():
 
 def plot_results(df):
     """Plot benchmark results and save as image"""
-    plt.figure(figsize=(12, 7))
-
-    for algo in df["Algorithm"].unique():
-        subset = df[df["Algorithm"] == algo]
-        plt.plot(
-            subset["File Size"],
-            subset["Time (ms)"],
-            label=algo,
-            marker="o",
-            linestyle="--"
-        )
-
-    plt.title("Search Algorithm Performance Comparison", fontsize=14)
-    plt.xlabel("File Size (number of lines)", fontsize=12)
-    plt.ylabel("Execution Time (milliseconds)", fontsize=12)
-    plt.legend()
-    plt.grid(True)
-    plt.tight_layout()
+    fig, axes = plt.subplots(1, 3, figsize=(18, 6))
+    panels = (
+        ("Build (ms)", "Build time (milliseconds)"),
+        ("p50 (us)", "Median query latency (microseconds)"),
+        ("Peak Memory (MB)", "Peak build memory (MB)"),
+    )
+
+    for axis, (column, label) in zip(axes, panels):
+        for algo in df["Algorithm"].unique():
+            subset = df[df["Algorithm"] == algo]
+            axis.plot(
+                subset["File Size"],
+                subset[column],
+                label=algo,
+                marker="o",
+                linestyle="--"
+            )
+        axis.set_xscale("log")
+        axis.set_yscale("log")
+        axis.set_xlabel("File Size (number of lines)", fontsize=12)
+        axis.set_ylabel(label, fontsize=12)
+        axis.grid(True)
+    axes[0].legend()
+
+    fig.suptitle("Search Algorithm Performance Comparison", fontsize=14)
+    fig.tight_layout()
 
     graph_path = os.path.join(tempfile.gettempdir(), "performance_graph.png")
     plt.savefig(graph_path, dpi=300)
     plt.close()
 
 
-def generate_pdf(df):
-    """Generate PDF report from benchmark results"""
+def plot_memory(memory_df):
+    """Plot heap bytes per line of each index structure and save it next
+    to the latency graph"""
+    distributions = list(memory_df["Line Lengths"].unique())
+    fig, axes = plt.subplots(
+        1, len(distributions), figsize=(6 * len(distributions), 6),
+        squeeze=False
+    )
+
+    for axis, distribution in zip(axes[0], distributions):
+        rows = memory_df[memory_df["Line Lengths"] == distribution]
+        for index in rows["Index"].unique():
+            subset = rows[rows["Index"] == index]
+            axis.plot(
+                subset["File Size"],
+                subset["Bytes/Line"],
+                label=index,
+                marker="o",
+                linestyle="--"
+            )
+        axis.set_xscale("log")
+        axis.set_yscale("log")
+        axis.set_title(f"{distribution} lines", fontsize=12)
+        axis.set_xlabel("File Size (number of lines)", fontsize=12)
+        axis.set_ylabel("Heap bytes per line", fontsize=12)
+        axis.grid(True)
+    axes[0][0].legend()
+
+    fig.suptitle("Index Memory Footprint", fontsize=14)
+    fig.tight_layout()
+
+    graph_path = os.path.join(tempfile.gettempdir(), "memory_graph.png")
+    plt.savefig(graph_path, dpi=300)
+    plt.close()
+
+
+def add_memory_section(pdf, memory_df):
+    """Append the index memory table and bytes-per-line graph"""
+    pdf.add_page()
+    pdf.set_font("Arial", "B", 14)
+    pdf.cell(0, 10, "Index Memory Footprint", 0, 1, "C")
+
+    columns = (
+        ("Index", 28, "{}"),
+        ("Line Lengths", 24, "{}"),
+        ("File Size", 22, "{}"),
+        ("Bytes/Line", 22, "{:.1f}"),
+        ("Peak (MB)", 22, "{:.1f}"),
+        ("RSS Delta (MB)", 28, "{:.1f}"),
+        ("Mapped (MB)", 24, "{:.1f}"),
+        ("Lookup (us)", 22, "{:.2f}"),
+    )
+    pdf.set_font("Arial", "B", 8)
+    for title, width, _ in columns:
+        pdf.cell(width, 8, title, 1, 0, "C")
+    pdf.ln()
+
+    pdf.set_font("Arial", "", 8)
+    for _, row in memory_df.iterrows():
+        for title, width, fmt in columns:
+            pdf.cell(width, 8, fmt.format(row[title]), 1, 0, "C")
+        pdf.ln()
+
+    graph_path = os.path.join(tempfile.gettempdir(), "memory_graph.png")
+    pdf.ln(10)
+    pdf.image(graph_path, x=10, w=180)
+
+
+def add_batch_section(pdf, batch_df):
+    """Append batch throughput of the NumPy engine against a set"""
+    pdf.add_page()
+    pdf.set_font("Arial", "B", 14)
+    pdf.cell(0, 10, "Batch Lookups: NumPy Engine vs Set Membership",
+             0, 1, "C")
+
+    columns = (
+        ("File Size", 35, "{}"),
+        ("Batch Size", 30, "{}"),
+        ("Set (queries/s)", 45, "{:,.0f}"),
+        ("NumPy (queries/s)", 45, "{:,.0f}"),
+    )
+    pdf.set_font("Arial", "B", 10)
+    for title, width, _ in columns:
+        pdf.cell(width, 10, title, 1, 0, "C")
+    pdf.ln()
+
+    pdf.set_font("Arial", "", 10)
+    for _, row in batch_df.iterrows():
+        for title, width, fmt in columns:
+            pdf.cell(width, 10, fmt.format(row[title]), 1, 0, "C")
+        pdf.ln()
+
+
+def add_startup_section(pdf, startup_df):
+    """Append the fresh-process startup and reload timings"""
+    pdf.add_page()
+    pdf.set_font("Arial", "B", 14)
+    pdf.cell(0, 10, "Startup and Reload (median ms, fresh processes)",
+             0, 1, "C")
+
+    columns = (
+        ("File Size", "File Size", 22),
+        ("Interpreter (ms)", "Interpreter", 21),
+        ("Import (ms)", "Import", 19),
+        ("Load (ms)", "Load", 19),
+        ("Ready (ms)", "Ready", 19),
+        ("First Request (ms)", "1st Request", 22),
+        ("Second Request (ms)", "2nd Request", 22),
+        ("Reload (ms)", "Reload", 19),
+        ("Time to First Answer (ms)", "1st Answer", 22),
+    )
+    pdf.set_font("Arial", "B", 9)
+    for _, title, width in columns:
+        pdf.cell(width, 10, title, 1, 0, "C")
+    pdf.ln()
+
+    pdf.set_font("Arial", "", 9)
+    for _, row in startup_df.iterrows():
+        for column, _, width in columns:
+            value = row[column]
+            text = str(int(value)) if column == "File Size" \
+                else f"{value:.1f}"
+            pdf.cell(width, 10, text, 1, 0, "C")
+        pdf.ln()
+
+
+def add_load_section(pdf, load_results):
+    """Append a table of load_generator.py results to the report"""
+    pdf.add_page()
+    pdf.set_font("Arial", "B", 14)
+    pdf.cell(0, 10, "End-to-end Load Tests", 0, 1, "C")
+
+    headers = (
+        ("Mode", 22), ("Load", 26), ("TLS", 16), ("Reread", 18),
+        ("Req/s", 26), ("Errors", 20), ("p50 (ms)", 22), ("p99 (ms)", 22),
+        ("p99.9 (ms)", 22),
+    )
+    pdf.set_font("Arial", "B", 10)
+    for title, width in headers:
+        pdf.cell(width, 10, title, 1, 0, "C")
+    pdf.ln()
+
+    pdf.set_font("Arial", "", 10)
+    for result in load_results:
+        latency = result["latency_ms"]
+        if result["mode"] == "open":
+            load = f"{result['rate']:g} req/s"
+        else:
+            load = f"{result['concurrency']} workers"
+        values = (
+            result["mode"], load, "on" if result["tls"] else "off",
+            "on" if result["reread_on_query"] else "off",
+            f"{result['throughput_rps']:.1f}", str(result["errors"]),
+            f"{latency['p50']:.2f}", f"{latency['p99']:.2f}",
+            f"{latency['p99.9']:.2f}",
+        )
+        for (_, width), value in zip(headers, values):
+            pdf.cell(width, 10, value, 1, 0, "C")
+        pdf.ln()
+
+
+def generate_pdf(df, load_results=None, memory_df=None, startup_df=None,
+                 batch_df=None):
+    """Generate PDF report from benchmark results, optionally followed by
+    the index memory footprint (plot_memory must have run), startup
+    timings and the end-to-end results written by load_generator.py"""
     pdf = FPDF()
     pdf.add_page()
 
@@ -128,31 +570,161 @@ def generate_pdf(df):
     pdf.cell(0, 10, "Speed Testing Report", 0, 1, "C")
 
     # Results table
-    pdf.set_font("Arial", "B", 12)
-    pdf.cell(60, 10, "Algorithm", 1, 0, "C")
-    pdf.cell(40, 10, "File Size", 1, 0, "C")
-    pdf.cell(40, 10, "Time (ms)", 1, 1, "C")
+    columns = (
+        ("Algorithm", 30, "{}"),
+        ("File Size", 28, "{}"),
+        ("Build (ms)", 28, "{:.1f}"),
+        ("Time (ms)", 28, "{:.4f}"),
+        ("p99 (us)", 28, "{:.2f}"),
+        ("Peak Memory (MB)", 38, "{:.1f}"),
+    )
+    pdf.set_font("Arial", "B", 10)
+    for title, width, _ in columns:
+        pdf.cell(width, 10, title, 1, 0, "C")
+    pdf.ln()
 
     pdf.set_font("Arial", "", 10)
     for _, row in df.iterrows():
-        pdf.cell(60, 10, row["Algorithm"], 1)
-        pdf.cell(40, 10, str(row["File Size"]), 1, 0, "C")
-        pdf.cell(40, 10, f"{row['Time (ms)']:.2f}", 1, 1, "C")
+        for title, width, fmt in columns:
+            pdf.cell(width, 10, fmt.format(row[title]), 1, 0, "C")
+        pdf.ln()
 
     # Add performance graph
     graph_path = os.path.join(tempfile.gettempdir(), "performance_graph.png")
     pdf.ln(10)
     pdf.image(graph_path, x=10, w=180)
 
-    output_path = os.path.join(tempfile.gettempdir(), "speed_testing_report.pdf")
+    if memory_df is not None:
+        add_memory_section(pdf, memory_df)
+    if batch_df is not None:
+        add_batch_section(pdf, batch_df)
+    if startup_df is not None:
+        add_startup_section(pdf, startup_df)
+    if load_results:
+        add_load_section(pdf, load_results)
+
+    output_path = os.path.join(
+        tempfile.gettempdir(), "speed_testing_report.pdf"
+    )
     pdf.output(output_path)
 
 
+def history_records(df):
+    """Convert benchmark rows for the benchmark history; throughput is
+    lookups per second on one core"""
+    from history import record
+    return [
+        record(
+            f"{row['Algorithm']} {row['File Size']}",
+            row["Mean (us)"], row["Stdev (us)"], int(row["Queries"]),
+            row["p99 (us)"],
+            1e6 / row["Mean (us)"] if row["Mean (us)"] else 0.0,
+            unit="us"
+        )
+        for _, row in df.iterrows()
+    ]
+
+
 def main():
     """Main function to execute benchmarking and reporting"""
-    df = run_benchmarks()
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES)
+    )
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--hit-ratio", type=float, default=0.5)
+    parser.add_argument("--warmup", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--scan-limit", type=int, default=1_000_000,
+        help="Above this many lines, full-scan algorithms run 1%% of "
+             "the queries"
+    )
+    parser.add_argument(
+        "--max-trie-bytes", type=int, default=MAX_TRIE_BYTES,
+        help="Skip the trie for data files larger than this"
+    )
+    parser.add_argument(
+        "--algorithms", nargs="+", choices=list(ALGORITHMS), default=None
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--length", default=None,
+        help="Use datasets.py lines with this length distribution, e.g. "
+             "lognormal:3.5:0.6, instead of 'line-N' strings"
+    )
+    parser.add_argument("--unicode", type=float, default=0.0)
+    parser.add_argument("--duplicates", type=float, default=0.0)
+    parser.add_argument("--zipf", type=float, default=1.0)
+    parser.add_argument(
+        "--history", nargs="?", const="", default=None,
+        help="Also save a versioned run for history.py compare (default "
+             "directory: benchmarks/results)"
+    )
+    parser.add_argument(
+        "--memory", action="store_true",
+        help="Also measure the memory footprint of the index structures "
+             "in benchmark_memory.py at the same sizes"
+    )
+    parser.add_argument(
+        "--batch", action="store_true",
+        help="Also compare batch throughput of the NumPy engine with "
+             "per-query set membership at the same sizes"
+    )
+    parser.add_argument(
+        "--startup", action="store_true",
+        help="Also time startup, first answer and reload in fresh "
+             "processes (benchmark_startup.py) at the same sizes"
+    )
+    parser.add_argument(
+        "--load-results", default=None,
+        help="JSON written by load_generator.py to include in the report"
+    )
+    args = parser.parse_args()
+    df = run_benchmarks(
+        sizes=args.sizes,
+        num_queries=args.queries,
+        hit_ratio=args.hit_ratio,
+        warmup=args.warmup,
+        repeat=args.repeat,
+        scan_limit=args.scan_limit,
+        max_trie_bytes=args.max_trie_bytes,
+        algorithms=args.algorithms,
+        seed=args.seed,
+        dataset=None if args.length is None else {
+            "length": args.length,
+            "unicode_ratio": args.unicode,
+            "duplicate_rate": args.duplicates,
+            "zipf_s": args.zipf,
+        }
+    )
+    load_results = None
+    if args.load_results:
+        with open(args.load_results) as f:
+            load_results = json.load(f)
+    if args.history is not None:
+        from history import DEFAULT_DIR, save_run
+        path = save_run(
+            "file_search", vars(args), history_records(df),
+            args.history or DEFAULT_DIR
+        )
+        print(f"History saved to {path}")
+    memory_df = None
+    if args.memory:
+        from benchmark_memory import run_memory_benchmarks
+        memory_df = run_memory_benchmarks(sizes=args.sizes, seed=args.seed)
+        plot_memory(memory_df)
+    batch_df = None
+    if args.batch:
+        batch_df = run_batch_benchmarks(
+            sizes=args.sizes, hit_ratio=args.hit_ratio, seed=args.seed
+        )
+    startup_df = None
+    if args.startup:
+        from benchmark_startup import run_startup_benchmarks
+        startup_df = run_startup_benchmarks(sizes=args.sizes)
     plot_results(df)
-    generate_pdf(df)
+    generate_pdf(df, load_results, memory_df, startup_df, batch_df)
     print("Report generated: speed_testing_report.pdf")
 
 
@@ -0,0 +1,276 @@
+"""Memory footprint of candidate index structures for the search daemon"""
+import argparse
+import gc
+import mmap
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+
+import pandas as pd
+import psutil
+
+from benchmark_file_search import MAX_TRIE_BYTES, build_trie, trie_lookup
+# The server's numpy engine digest; imported after benchmark_file_search,
+# which puts the repository root on sys.path
+from batch_lookup import line_hash
+
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+# name: (min, max) characters per line, drawn uniformly
+LINE_LENGTHS = {
+    "short": (8, 16),
+    "medium": (32, 96),
+    "long": (128, 512),
+}
+ALPHABET = "abcdefghijklmnopqrstuvwxyz0123456789-_"
+
+
+def generate_lengths_file(file_path, num_lines, distribution, seed=0):
+    """Write `num_lines` random lines whose lengths follow `distribution`"""
+    rng = random.Random(seed)
+    low, high = LINE_LENGTHS[distribution]
+    with open(file_path, "w") as f:
+        for _ in range(num_lines):
+            length = rng.randint(low, high)
+            f.write("".join(rng.choices(ALPHABET, k=length)) + "\n")
+
+
+class SortedIndex:
+    """Sorted list of distinct lines searched with bisect"""
+
+    def __init__(self, lines):
+        self.lines = sorted(set(lines))
+
+    def __contains__(self, query):
+        i = bisect_left(self.lines, query)
+        return i < len(self.lines) and self.lines[i] == query
+
+
+class CompactHashIndex:
+    """Sorted array of 64-bit line digests: 8 bytes per distinct line.
+
+    A miss can collide with a stored digest, with odds around n / 2**64."""
+
+    def __init__(self, raw_lines):
+        self.hashes = array(
+            "Q", sorted({line_hash(line) for line in raw_lines})
+        )
+
+    def __contains__(self, query):
+        value = line_hash(query)
+        i = bisect_left(self.hashes, value)
+        return i < len(self.hashes) and self.hashes[i] == value
+
+
+class MmapIndex:
+    """Sorted, deduplicated copy of the file, memory-mapped, plus an
+    array of line offsets. Only the offsets live on the Python heap; the
+    lines stay in reclaimable page cache."""
+
+    def __init__(self, file_path, raw_lines):
+        self.path = file_path + ".sorted"
+        with open(self.path, "wb") as f:
+            for line in sorted(set(raw_lines)):
+                f.write(line + b"\n")
+        with open(self.path, "rb") as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.offsets = array("Q", [0])
+        position = self.map.find(b"\n")
+        while position != -1:
+            self.offsets.append(position + 1)
+            position = self.map.find(b"\n", position + 1)
+
+    def line(self, i):
+        return self.map[self.offsets[i]:self.offsets[i + 1] - 1]
+
+    def __contains__(self, query):
+        target = query.encode("utf-8")
+        low, high = 0, len(self.offsets) - 2
+        while low <= high:
+            mid = (low + high) // 2
+            line = self.line(mid)
+            if line == target:
+                return True
+            if line < target:
+                low = mid + 1
+            else:
+                high = mid - 1
+        return False
+
+    @property
+    def mapped_bytes(self):
+        return len(self.map)
+
+    def close(self):
+        self.map.close()
+        os.remove(self.path)
+
+
+class TrieIndex:
+    """Nested-dict trie from benchmark_file_search"""
+
+    def __init__(self, lines):
+        self.trie = build_trie(lines)
+
+    def __contains__(self, query):
+        return trie_lookup(self.trie, query)
+
+
+def _text_lines(file_path):
+    with open(file_path, "r", encoding="utf-8") as f:
+        return f.read().splitlines()
+
+
+def _raw_lines(file_path):
+    with open(file_path, "rb") as f:
+        return f.read().splitlines()
+
+
+# name: builder taking the data file path, reading it the way the index
+# would in production so the strings it keeps are counted against it
+INDEXES = {
+    "set": lambda path: set(_text_lines(path)),
+    "sorted+bisect": lambda path: SortedIndex(_text_lines(path)),
+    "trie": lambda path: TrieIndex(_text_lines(path)),
+    "compact hash": lambda path: CompactHashIndex(_raw_lines(path)),
+    "mmap": lambda path: MmapIndex(path, _raw_lines(path)),
+}
+
+
+def measure_index(build, file_path, queries):
+    """Build one index and measure it.
+
+    Returns (index, build ms, traced peak bytes, traced steady-state
+    bytes, RSS delta bytes, mean lookup microseconds). Build time, RSS
+    and lookups come from an untraced build, since tracemalloc slows
+    allocation and its own bookkeeping inflates RSS; a second, traced
+    build gives the peak and the steady state, which is what is still
+    allocated once the build's temporaries are freed."""
+    process = psutil.Process()
+    gc.collect()
+    rss_before = process.memory_info().rss
+    start_time = time.perf_counter()
+    index = build(file_path)
+    build_ms = (time.perf_counter() - start_time) * 1000
+    gc.collect()
+    rss_delta = process.memory_info().rss - rss_before
+
+    start_time = time.perf_counter()
+    for query in queries:
+        query in index
+    lookup_us = (time.perf_counter() - start_time) * 1e6 / len(queries)
+    if hasattr(index, "close"):
+        index.close()
+    del index
+    gc.collect()
+
+    tracemalloc.start()
+    try:
+        index = build(file_path)
+        gc.collect()
+        steady, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return index, build_ms, peak, steady, rss_delta, lookup_us
+
+
+def run_memory_benchmarks(
+    sizes=DEFAULT_SIZES,
+    distributions=tuple(LINE_LENGTHS),
+    indexes=None,
+    num_queries=1000,
+    max_trie_bytes=MAX_TRIE_BYTES,
+    seed=0
+):
+    """Measure every index for each file size and line-length
+    distribution, returning one DataFrame row per combination. The trie
+    is skipped for files larger than `max_trie_bytes`."""
+    data = defaultdict(list)
+    names = indexes or list(INDEXES)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for distribution in distributions:
+            for size in sizes:
+                file_path = os.path.join(tmpdir, f"{distribution}_{size}.txt")
+                generate_lengths_file(file_path, size, distribution, seed)
+                lines = _text_lines(file_path)
+                rng = random.Random(seed)
+                queries = [rng.choice(lines) for _ in range(num_queries)]
+                del lines
+
+                file_bytes = os.path.getsize(file_path)
+
+                for name in names:
+                    if name == "trie" and file_bytes > max_trie_bytes:
+                        print(f"{name:<13} {distribution:<6} {size:>9} "
+                              f"lines  skipped (file over {max_trie_bytes} "
+                              f"bytes)")
+                        continue
+                    index, build_ms, peak, steady, rss_delta, lookup_us = \
+                        measure_index(INDEXES[name], file_path, queries)
+                    mapped = getattr(index, "mapped_bytes", 0)
+                    if hasattr(index, "close"):
+                        index.close()
+                    del index
+
+                    data["Index"].append(name)
+                    data["Line Lengths"].append(distribution)
+                    data["File Size"].append(size)
+                    data["File (MB)"].append(file_bytes / 2**20)
+                    data["Build (ms)"].append(build_ms)
+                    data["Peak (MB)"].append(peak / 2**20)
+                    data["Steady (MB)"].append(steady / 2**20)
+                    data["RSS Delta (MB)"].append(rss_delta / 2**20)
+                    data["Mapped (MB)"].append(mapped / 2**20)
+                    data["Bytes/Line"].append(steady / size)
+                    data["Lookup (us)"].append(lookup_us)
+                    print(
+                        f"{name:<13} {distribution:<6} {size:>9} lines  "
+                        f"steady={steady / size:8.1f} B/line  "
+                        f"peak={peak / 2**20:8.1f} MB  "
+                        f"rss={rss_delta / 2**20:8.1f} MB  "
+                        f"lookup={lookup_us:7.2f} us"
+                    )
+
+    return pd.DataFrame(data)
+
+
+def main():
+    """Run the memory benchmark and print or save its table; use
+    benchmark_file_search.py --memory to add it to the PDF report"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES)
+    )
+    parser.add_argument(
+        "--line-lengths", nargs="+", choices=list(LINE_LENGTHS),
+        default=list(LINE_LENGTHS)
+    )
+    parser.add_argument(
+        "--indexes", nargs="+", choices=list(INDEXES), default=None
+    )
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--max-trie-bytes", type=int, default=MAX_TRIE_BYTES)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--csv", default=None, help="Save the table here")
+    args = parser.parse_args()
+
+    df = run_memory_benchmarks(
+        sizes=args.sizes,
+        distributions=args.line_lengths,
+        indexes=args.indexes,
+        num_queries=args.queries,
+        max_trie_bytes=args.max_trie_bytes,
+        seed=args.seed
+    )
+    if args.csv:
+        df.to_csv(args.csv, index=False)
+        print(f"Results written to {args.csv}")
+
+
+if __name__ == "__main__":
+    main()
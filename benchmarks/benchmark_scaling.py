@@ -0,0 +1,191 @@
+"""Throughput and p99 of the daemon across worker counts and executors"""
+import argparse
+import contextlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import matplotlib.pyplot as plt
+
+from benchmark_file_search import generate_file
+from harness import running_server, use_bundled_certificates
+from load_generator import print_result, run_load
+from server import EXECUTOR_TYPES, AsyncTCPServer
+
+
+def default_worker_counts():
+    """Powers of two up to the CPU count, plus the CPU count itself"""
+    cpus = os.cpu_count() or 1
+    counts = {cpus}
+    count = 1
+    while count < cpus:
+        counts.add(count)
+        count *= 2
+    return sorted(counts)
+
+
+def serve(file_path, executor_type, workers, use_ssl=False):
+    """Runs inside the daemon process: serve `file_path`, print the
+    address as JSON and keep serving until stdin is closed"""
+    if use_ssl:
+        use_bundled_certificates()
+    server = AsyncTCPServer(
+        host="127.0.0.1",
+        port=0,
+        file_path=file_path,
+        reread_on_query=False,
+        use_ssl=use_ssl,
+        executor_type=executor_type,
+        workers=workers or None,
+    )
+    server.rate_limit = float("inf")
+    with running_server(server, timeout=300) as (host, port):
+        print(json.dumps({"host": host, "port": port}), flush=True)
+        sys.stdin.read()
+
+
+@contextlib.contextmanager
+def daemon_process(file_path, executor_type, workers, use_ssl=False):
+    """Run the daemon in its own interpreter for the duration of a
+    with-block and yield its (host, port). An in-process server would
+    share the GIL with the load generator and measure client contention
+    rather than executor scaling."""
+    command = [
+        sys.executable, os.path.abspath(__file__), "--serve", file_path,
+        "--executors", executor_type, "--workers", str(workers),
+    ]
+    if use_ssl:
+        command.append("--tls")
+    with tempfile.TemporaryDirectory() as workdir:
+        process = subprocess.Popen(
+            command,
+            cwd=workdir,  # Keeps the daemon's log file out of the tree
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        try:
+            line = process.stdout.readline()
+            while line and not line.startswith("{"):
+                line = process.stdout.readline()
+            if not line:
+                raise RuntimeError("Daemon process exited before listening")
+            address = json.loads(line)
+            yield address["host"], address["port"]
+        finally:
+            process.stdin.close()
+            process.wait(timeout=60)
+
+
+def run_scaling_benchmark(worker_counts, executor_types=EXECUTOR_TYPES,
+                          concurrency=32, duration=5.0, num_lines=100000,
+                          use_ssl=False):
+    """Closed-loop load at a fixed concurrency for every executor type and
+    worker count, against a daemon in a separate process. Inline
+    execution has no workers (reported as 0) and runs once."""
+    results = []
+    with tempfile.TemporaryDirectory() as tmpdir:
+        data_path = os.path.join(tmpdir, "data.txt")
+        generate_file(data_path, num_lines)
+        for executor_type in executor_types:
+            counts = [0] if executor_type == "inline" else worker_counts
+            for workers in counts:
+                with daemon_process(
+                    data_path, executor_type, workers, use_ssl
+                ) as (host, port):
+                    result = run_load(
+                        mode="closed",
+                        use_ssl=use_ssl,
+                        concurrency=concurrency,
+                        duration=duration,
+                        num_lines=num_lines,
+                        host=host,
+                        port=port,
+                        data_path=data_path,
+                    )
+                result["executor"] = executor_type
+                result["workers"] = workers
+                print(f"{executor_type:<8} workers={workers:<3}", end=" ")
+                print_result(result)
+                results.append(result)
+    return results
+
+
+def plot_scaling(results, graph_path=None):
+    """Plot throughput and p99 against worker count per executor type"""
+    graph_path = graph_path or os.path.join(
+        tempfile.gettempdir(), "scaling_graph.png"
+    )
+    worker_counts = sorted(
+        {r["workers"] for r in results if r["executor"] != "inline"}
+    ) or [1]
+    fig, (throughput_axis, p99_axis) = plt.subplots(1, 2, figsize=(14, 6))
+
+    for executor_type in dict.fromkeys(r["executor"] for r in results):
+        subset = [r for r in results if r["executor"] == executor_type]
+        if executor_type == "inline":
+            # One event-loop thread regardless of the worker count
+            subset = subset * len(worker_counts)
+            workers = worker_counts
+        else:
+            workers = [r["workers"] for r in subset]
+        throughput_axis.plot(
+            workers, [r["throughput_rps"] for r in subset],
+            label=executor_type, marker="o", linestyle="--"
+        )
+        p99_axis.plot(
+            workers, [r["latency_ms"]["p99"] for r in subset],
+            label=executor_type, marker="o", linestyle="--"
+        )
+
+    throughput_axis.set_ylabel("Throughput (requests/s)", fontsize=12)
+    p99_axis.set_ylabel("p99 latency (ms)", fontsize=12)
+    for axis in (throughput_axis, p99_axis):
+        axis.set_xlabel("Workers (cores)", fontsize=12)
+        axis.set_xticks(worker_counts)
+        axis.grid(True)
+        axis.legend()
+    fig.suptitle("Executor Scaling", fontsize=14)
+    fig.tight_layout()
+    plt.savefig(graph_path, dpi=300)
+    plt.close()
+    return graph_path
+
+
+def main():
+    """Parse arguments, run the scaling matrix and plot it"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--serve", metavar="FILE", help=argparse.SUPPRESS)
+    parser.add_argument(
+        "--workers", type=int, nargs="+", default=default_worker_counts()
+    )
+    parser.add_argument(
+        "--executors", nargs="+", choices=EXECUTOR_TYPES,
+        default=list(EXECUTOR_TYPES)
+    )
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--lines", type=int, default=100000)
+    parser.add_argument("--tls", action="store_true")
+    parser.add_argument("--output", default=None,
+                        help="Write the results to this JSON file")
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.executors[0], args.workers[0], args.tls)
+        return
+    results = run_scaling_benchmark(
+        args.workers, args.executors, args.concurrency, args.duration,
+        args.lines, args.tls
+    )
+    print(f"Graph saved to {plot_scaling(results)}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""Startup, first-answer and reload times of the daemon in fresh processes"""
+import time
+
+PROCESS_STARTED = time.time()  # Taken before anything else is imported
+
+import argparse  # noqa: E402
+import json  # noqa: E402
+import os  # noqa: E402
+import socket  # noqa: E402
+import statistics  # noqa: E402
+import subprocess  # noqa: E402
+import sys  # noqa: E402
+import tempfile  # noqa: E402
+from collections import defaultdict  # noqa: E402
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+SPAWNED_AT = "STARTUP_BENCHMARK_SPAWNED_AT"
+# Probe result key: report column
+COLUMNS = {
+    "interpreter_s": "Interpreter (ms)",
+    "import_s": "Import (ms)",
+    "load_s": "Load (ms)",
+    "ready_s": "Ready (ms)",
+    "first_request_s": "First Request (ms)",
+    "second_request_s": "Second Request (ms)",
+    "reload_s": "Reload (ms)",
+    "first_answer_s": "Time to First Answer (ms)",
+}
+
+
+def query(host, port, text):
+    """Send one query the way client.py does and return the answer"""
+    with socket.create_connection((host, port), timeout=60) as sock:
+        sock.sendall(text.encode("utf-8"))
+        return sock.recv(1024)
+
+
+def probe(file_path):
+    """Runs inside the fresh process: import the server, start it, answer
+    two queries and reload the index, printing the timings as JSON"""
+    spawned = float(os.environ[SPAWNED_AT])
+    result = {"interpreter_s": PROCESS_STARTED - spawned}
+
+    sys.path.insert(0, ROOT_DIR)
+    start = time.perf_counter()
+    import server
+    result["import_s"] = time.perf_counter() - start
+
+    import asyncio
+    from harness import running_server
+
+    start = time.perf_counter()
+    daemon = server.AsyncTCPServer(
+        host="127.0.0.1",
+        port=0,
+        file_path=file_path,
+        reread_on_query=False,
+        use_ssl=False,
+    )
+    with running_server(daemon, timeout=300) as (host, port):
+        result["ready_s"] = time.perf_counter() - start
+        result["load_s"] = daemon.index_stats["load_seconds"]
+
+        start = time.perf_counter()
+        query(host, port, "line-1")
+        result["first_request_s"] = time.perf_counter() - start
+        result["first_answer_s"] = time.time() - spawned
+
+        start = time.perf_counter()
+        query(host, port, "line-2")
+        result["second_request_s"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        asyncio.run_coroutine_threadsafe(
+            daemon.load_file_content(), daemon.server.get_loop()
+        ).result()
+        result["reload_s"] = time.perf_counter() - start
+
+    print(json.dumps(result))
+
+
+def run_probe(file_path, cold_bytecode=False):
+    """Start one fresh interpreter running probe() and return its timings.
+
+    With `cold_bytecode`, the child compiles every module from source
+    into an empty cache directory instead of reusing __pycache__."""
+    env = dict(os.environ)
+    with tempfile.TemporaryDirectory() as workdir:
+        if cold_bytecode:
+            env["PYTHONPYCACHEPREFIX"] = os.path.join(workdir, "pycache")
+        env[SPAWNED_AT] = repr(time.time())
+        completed = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--probe", file_path],
+            cwd=workdir,  # Keeps the daemon's log file out of the tree
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def run_startup_benchmarks(sizes=DEFAULT_SIZES, repeat=5,
+                           cold_bytecode=False):
+    """Probe each file size `repeat` times in fresh processes and return
+    a DataFrame of median timings, one row per size"""
+    import pandas as pd
+    from benchmark_file_search import generate_file
+
+    data = defaultdict(list)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for size in sizes:
+            file_path = os.path.join(tmpdir, f"lines_{size}.txt")
+            generate_file(file_path, size)
+            runs = [
+                run_probe(file_path, cold_bytecode) for _ in range(repeat)
+            ]
+            data["File Size"].append(size)
+            for key, column in COLUMNS.items():
+                data[column].append(
+                    statistics.median(run[key] for run in runs) * 1000
+                )
+            print(
+                f"{size:>10} lines  "
+                + "  ".join(
+                    f"{key[:-2]}={data[column][-1]:.1f}ms"
+                    for key, column in COLUMNS.items()
+                )
+            )
+    return pd.DataFrame(data)
+
+
+def main():
+    """Parse arguments and run the benchmark, or a single probe"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--probe", metavar="FILE", help=argparse.SUPPRESS)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES)
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--cold-bytecode", action="store_true",
+        help="Recompile modules in every run instead of using __pycache__"
+    )
+    args = parser.parse_args()
+
+    if args.probe:
+        probe(args.probe)
+        return
+    run_startup_benchmarks(args.sizes, args.repeat, args.cold_bytecode)
+    print("Add --startup to benchmark_file_search.py to include these "
+          "timings in the PDF report")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Benchmark full versus resumed TLS handshakes against the daemon"""
+import argparse
+import os
+import socket
+import ssl
+import tempfile
+import time
+
+from benchmark_file_search import generate_file
+from harness import running_server, summarize, use_bundled_certificates
+from server import AsyncTCPServer
+
+
+def client_context() -> ssl.SSLContext:
+    """Client context matching client.py (no certificate verification)"""
+    context = ssl.create_default_context()
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE
+    return context
+
+
+def timed_query(host, port, context, query, session=None):
+    """Connect, handshake and send one query.
+
+    Returns (handshake ms, round-trip ms, session, reused flag).
+    """
+    start = time.perf_counter()
+    with socket.create_connection((host, port)) as sock:
+        with context.wrap_socket(
+            sock, server_hostname=host, session=session
+        ) as tls:
+            handshake_ms = (time.perf_counter() - start) * 1000
+            tls.sendall(query.encode("utf-8"))
+            tls.recv(1024)
+            total_ms = (time.perf_counter() - start) * 1000
+            # TLS 1.3 tickets arrive after the handshake, so the session
+            # is only complete once the response has been read.
+            return handshake_ms, total_ms, tls.session, tls.session_reused
+
+
+def run_handshake_benchmark(iterations, tls_options, query="line-1"):
+    """Measure full and resumed handshakes against an in-process server"""
+    use_bundled_certificates()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        data_path = os.path.join(tmpdir, "data.txt")
+        generate_file(data_path, 10000)
+        server = AsyncTCPServer(
+            host="127.0.0.1",
+            port=0,
+            file_path=data_path,
+            reread_on_query=False,
+            use_ssl=True,
+            tls_options=tls_options,
+        )
+        server.rate_limit = float("inf")
+
+        with running_server(server) as (host, port):
+            context = client_context()
+            full, resumed = [], []
+            full_total, resumed_total = [], []
+            reused_count = 0
+
+            for _ in range(iterations):
+                handshake_ms, total_ms, session, _ = timed_query(
+                    host, port, context, query
+                )
+                full.append(handshake_ms)
+                full_total.append(total_ms)
+
+                handshake_ms, total_ms, _, reused = timed_query(
+                    host, port, context, query, session=session
+                )
+                resumed.append(handshake_ms)
+                resumed_total.append(total_ms)
+                reused_count += reused
+
+    summarize("full handshake", full)
+    summarize("resumed handshake", resumed)
+    summarize("full round-trip", full_total)
+    summarize("resumed round-trip", resumed_total)
+    print(f"sessions reused: {reused_count}/{iterations}")
+    return full, resumed
+
+
+def main():
+    """Parse arguments and run the handshake benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument(
+        "--no-tickets", action="store_true",
+        help="Resume from the server-side session cache instead of tickets",
+    )
+    parser.add_argument("--ecdh-curve", default=None)
+    parser.add_argument("--ciphers", default=None)
+    args = parser.parse_args()
+
+    tls_options = {
+        "session_resumption": True,
+        "session_tickets": not args.no_tickets,
+        "ecdh_curve": args.ecdh_curve,
+        "ciphers": args.ciphers,
+    }
+    run_handshake_benchmark(args.iterations, tls_options)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Benchmark single-datagram UDP queries against the TCP path"""
+import argparse
+import os
+import socket
+import tempfile
+import time
+
+from benchmark_file_search import generate_file
+from harness import running_server, summarize
+from server import AsyncTCPServer
+
+
+def tcp_query(host, port, query):
+    """One-shot TCP query; returns (round-trip ms, response)"""
+    start = time.perf_counter()
+    with socket.create_connection((host, port)) as sock:
+        sock.sendall(query.encode("utf-8"))
+        response = sock.recv(1024).decode("utf-8").strip()
+    return (time.perf_counter() - start) * 1000, response
+
+
+def udp_queries(host, port, queries, timeout=1.0):
+    """Send queries as datagrams one at a time, matching answers by id.
+
+    Returns (round-trip ms samples, number of lost datagrams).
+    """
+    samples, lost = [], 0
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.settimeout(timeout)
+        for request_id, query in enumerate(queries):
+            start = time.perf_counter()
+            sock.sendto(f"{request_id} {query}".encode("utf-8"), (host, port))
+            try:
+                while True:
+                    data, _ = sock.recvfrom(2048)
+                    answer_id, _, _ = data.partition(b" ")
+                    if int(answer_id) == request_id:
+                        break  # Ignore late answers to earlier requests
+            except socket.timeout:
+                lost += 1
+                continue
+            samples.append((time.perf_counter() - start) * 1000)
+    return samples, lost
+
+
+def run_udp_benchmark(num_queries, num_lines=100000):
+    """Compare TCP and UDP round trips against an in-process server"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        data_path = os.path.join(tmpdir, "data.txt")
+        generate_file(data_path, num_lines)
+        queries = [
+            f"line-{i % num_lines + 1}" for i in range(num_queries)
+        ]
+        server = AsyncTCPServer(
+            host="127.0.0.1",
+            port=0,
+            file_path=data_path,
+            reread_on_query=False,
+            use_ssl=False,
+            udp_port=0,
+        )
+        server.rate_limit = float("inf")
+
+        with running_server(server) as (host, port):
+            udp_port = server.udp_transport.get_extra_info("sockname")[1]
+
+            start = time.perf_counter()
+            tcp_samples = [tcp_query(host, port, q)[0] for q in queries]
+            tcp_elapsed = time.perf_counter() - start
+
+            start = time.perf_counter()
+            udp_samples, lost = udp_queries(host, udp_port, queries)
+            udp_elapsed = time.perf_counter() - start
+
+    summarize("TCP round-trip", tcp_samples)
+    summarize("UDP round-trip", udp_samples)
+    print(f"TCP throughput: {len(tcp_samples) / tcp_elapsed:10.1f} q/s")
+    print(f"UDP throughput: {len(udp_samples) / udp_elapsed:10.1f} q/s")
+    print(f"UDP datagrams lost: {lost}/{num_queries}")
+    return tcp_samples, udp_samples
+
+
+def main():
+    """Parse arguments and run the UDP benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--lines", type=int, default=100000)
+    args = parser.parse_args()
+    run_udp_benchmark(args.queries, args.lines)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""Seeded synthetic datasets and query workloads shared by the benchmarks"""
+import argparse
+import itertools
+import json
+import math
+import random
+
+# Longest line in characters; 4-byte UTF-8 characters still fit the
+# server's 1024-byte request limit
+MAX_LINE_CHARS = 255
+ASCII_CHARS = (
+    "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-_.:/ "
+)
+# Latin accents, Greek, Cyrillic, CJK and emoji; none are stripped by the
+# server's query sanitizer
+UNICODE_CHARS = (
+    "áéíóúñüçøåßÆŒ"
+    "αβγδεζηθλμπσω"
+    "абвгдежзийклм"
+    "日本語中文字漢検索"
+    "🙂🚀📦🔍"
+)
+
+
+def parse_length(spec):
+    """Parse a line-length distribution spec into a sampler.
+
+    Specs are 'fixed:N', 'uniform:MIN:MAX', 'normal:MEAN:STDEV' or
+    'lognormal:MU:SIGMA' (of the natural log of the length). Samples are
+    clamped to 1..MAX_LINE_CHARS."""
+    name, *params = spec.split(":")
+    try:
+        values = [float(p) for p in params]
+        if name == "fixed":
+            (length,) = values
+            draw = lambda rng: length  # noqa: E731
+        elif name == "uniform":
+            low, high = values
+            draw = lambda rng: rng.uniform(low, high)  # noqa: E731
+        elif name == "normal":
+            mean, stdev = values
+            draw = lambda rng: rng.gauss(mean, stdev)  # noqa: E731
+        elif name == "lognormal":
+            mu, sigma = values
+            draw = lambda rng: rng.lognormvariate(mu, sigma)  # noqa: E731
+        else:
+            raise ValueError(f"unknown distribution {name!r}")
+    except ValueError as e:
+        raise ValueError(f"Bad line-length spec {spec!r}: {e}") from None
+    return lambda rng: min(MAX_LINE_CHARS, max(1, round(draw(rng))))
+
+
+def random_line(rng, length, unicode_ratio=0.0):
+    """One line of `length` characters; with probability `unicode_ratio`
+    about a quarter of its characters are non-ASCII"""
+    chars = rng.choices(ASCII_CHARS, k=length)
+    if rng.random() < unicode_ratio:
+        for i in rng.sample(range(length), max(1, length // 4)):
+            chars[i] = rng.choice(UNICODE_CHARS)
+    # The server strips queries, so lines must not start or end in blanks
+    chars[0] = chars[0] if chars[0] != " " else "_"
+    chars[-1] = chars[-1] if chars[-1] != " " else "_"
+    return "".join(chars)
+
+
+def generate_lines(num_lines, length="uniform:8:64", unicode_ratio=0.0,
+                   duplicate_rate=0.0, seed=0):
+    """Return `num_lines` lines. With probability `duplicate_rate` a line
+    repeats an earlier one instead of being new."""
+    rng = random.Random(seed)
+    draw_length = parse_length(length)
+    lines = []
+    for _ in range(num_lines):
+        if lines and rng.random() < duplicate_rate:
+            lines.append(rng.choice(lines))
+        else:
+            lines.append(random_line(rng, draw_length(rng), unicode_ratio))
+    return lines
+
+
+def generate_dataset(file_path, num_lines, length="uniform:8:64",
+                     unicode_ratio=0.0, duplicate_rate=0.0, seed=0):
+    """Write a seeded dataset file and return its lines"""
+    lines = generate_lines(
+        num_lines, length, unicode_ratio, duplicate_rate, seed
+    )
+    with open(file_path, "w", encoding="utf-8") as f:
+        for line in lines:
+            f.write(line + "\n")
+    return lines
+
+
+def generate_queries(lines, count, hit_ratio=0.5, zipf_s=1.0,
+                     length="uniform:8:64", unicode_ratio=0.0, seed=0):
+    """Return `count` (query, expected hit) pairs.
+
+    Hits follow a Zipf distribution with exponent `zipf_s` over the
+    distinct lines, ranked in a seeded random order (0 gives uniform
+    popularity). Misses are fresh lines checked to be absent."""
+    rng = random.Random(seed)
+    present = set(lines)
+    ranked = sorted(present)
+    rng.shuffle(ranked)
+    cumulative = list(itertools.accumulate(
+        1.0 / math.pow(rank, zipf_s) for rank in range(1, len(ranked) + 1)
+    ))
+    draw_length = parse_length(length)
+
+    queries = []
+    for _ in range(count):
+        if ranked and rng.random() < hit_ratio:
+            query = rng.choices(ranked, cum_weights=cumulative)[0]
+            queries.append((query, True))
+        else:
+            query = random_line(rng, draw_length(rng), unicode_ratio)
+            while query in present:
+                query = random_line(rng, draw_length(rng), unicode_ratio)
+            queries.append((query, False))
+    return queries
+
+
+def write_queries(file_path, queries):
+    """Save queries as JSON lines with 'query' and 'hit' fields"""
+    with open(file_path, "w", encoding="utf-8") as f:
+        for query, hit in queries:
+            f.write(json.dumps({"query": query, "hit": hit},
+                               ensure_ascii=False) + "\n")
+
+
+def read_queries(file_path):
+    """Load (query, expected hit) pairs written by write_queries"""
+    queries = []
+    with open(file_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                queries.append((entry["query"], entry["hit"]))
+    return queries
+
+
+def main():
+    """Write a dataset and a matching query workload"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("data", help="Dataset file to write")
+    parser.add_argument("queries", help="Query JSON-lines file to write")
+    parser.add_argument("--lines", type=int, default=100000)
+    parser.add_argument(
+        "--length", default="uniform:8:64",
+        help="fixed:N, uniform:MIN:MAX, normal:MEAN:STDEV or "
+             "lognormal:MU:SIGMA"
+    )
+    parser.add_argument("--unicode", type=float, default=0.0,
+                        help="Share of lines with non-ASCII characters")
+    parser.add_argument("--duplicates", type=float, default=0.0,
+                        help="Share of lines repeating an earlier line")
+    parser.add_argument("--query-count", type=int, default=100000)
+    parser.add_argument("--hit-ratio", type=float, default=0.5)
+    parser.add_argument("--zipf", type=float, default=1.0,
+                        help="Zipf exponent of hit popularity (0: uniform)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    lines = generate_dataset(
+        args.data, args.lines, args.length, args.unicode, args.duplicates,
+        args.seed
+    )
+    queries = generate_queries(
+        lines, args.query_count, args.hit_ratio, args.zipf, args.length,
+        args.unicode, args.seed
+    )
+    write_queries(args.queries, queries)
+    print(f"Wrote {len(lines)} lines ({len(set(lines))} distinct) to "
+          f"{args.data} and {len(queries)} queries to {args.queries}")
+
+
+if __name__ == "__main__":
+    main()
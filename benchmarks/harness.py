@@ -0,0 +1,81 @@
+"""Helpers for running the daemon in-process while benchmarking it"""
+import asyncio
+import contextlib
+import os
+import statistics
+import sys
+import threading
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from server import AsyncTCPServer  # noqa: E402
+
+CERT_PATH = os.path.join(ROOT_DIR, "cert.pem")
+KEY_PATH = os.path.join(ROOT_DIR, "key.pem")
+
+
+def use_bundled_certificates() -> None:
+    """Point CERT_PATH/KEY_PATH at the bundled cert.pem/key.pem if unset"""
+    os.environ.setdefault("CERT_PATH", CERT_PATH)
+    os.environ.setdefault("KEY_PATH", KEY_PATH)
+
+
+def summarize(label, samples):
+    """Print mean/p50/p99 of a list of millisecond samples"""
+    ordered = sorted(samples)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    print(
+        f"{label:<22} n={len(samples):<5} "
+        f"mean={statistics.mean(samples):8.3f} ms  "
+        f"p50={statistics.median(samples):8.3f} ms  "
+        f"p99={p99:8.3f} ms"
+    )
+
+
+def make_server(file_path: str = "unused.txt", **options) -> AsyncTCPServer:
+    """Build a plain-TCP server on an ephemeral localhost port with rate
+    limiting lifted. Keyword options are passed on to AsyncTCPServer and
+    override these defaults."""
+    settings = {
+        "host": "127.0.0.1",
+        "port": 0,
+        "file_path": str(file_path),
+        "reread_on_query": False,
+        "use_ssl": False,
+    }
+    settings.update(options)
+    server = AsyncTCPServer(**settings)
+    server.rate_limit = float("inf")
+    return server
+
+
+@contextlib.contextmanager
+def running_server(server: AsyncTCPServer, timeout: float = 10.0):
+    """Run the server on a background event loop for the duration of a
+    with-block and yield the (host, port) it is listening on. Waits for
+    the server's ready event, so the Unix socket, UDP endpoint and other
+    listeners are up too, not just TCP."""
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    asyncio.run_coroutine_threadsafe(server.start(), loop)
+
+    deadline = time.monotonic() + timeout
+    while not server.ready.is_set():
+        if time.monotonic() > deadline:
+            raise RuntimeError("Server did not start in time.")
+        time.sleep(0.01)
+    host, port = server.server.sockets[0].getsockname()[:2]
+
+    try:
+        yield host, port
+    finally:
+        asyncio.run_coroutine_threadsafe(
+            server.shutdown(), loop
+        ).result(timeout)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout)
+        loop.close()
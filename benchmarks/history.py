@@ -0,0 +1,298 @@
+"""Versioned benchmark result history and a regression gate"""
+import argparse
+import datetime
+import json
+import math
+import os
+import platform
+import socket
+import subprocess
+import sys
+import uuid
+
+SCHEMA_VERSION = 1
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_DIR = os.path.join(ROOT_DIR, "benchmarks", "results")
+
+
+def git_revision():
+    """Return (commit hash, dirty flag) of the checkout, or (None, None)"""
+    try:
+        revision = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=ROOT_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+        status = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=ROOT_DIR, capture_output=True, text=True, check=True
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+    return revision, bool(status.strip())
+
+
+def environment():
+    """Describe the machine, interpreter and code a run was taken on"""
+    revision, dirty = git_revision()
+    return {
+        "host": socket.gethostname(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "git_revision": revision,
+        "git_dirty": dirty,
+    }
+
+
+def record(name, mean, stdev, count, p99, throughput, unit="ms"):
+    """One comparable result: latency summary plus throughput"""
+    return {
+        "name": name,
+        "unit": unit,
+        "mean": mean,
+        "stdev": stdev,
+        "count": count,
+        "p99": p99,
+        "throughput": throughput,
+    }
+
+
+def save_run(kind, config, records, directory=DEFAULT_DIR):
+    """Write one run as versioned JSON and return the file path. Names
+    carry a microsecond timestamp and a random suffix, so runs saved in
+    the same second at the same revision do not overwrite each other."""
+    os.makedirs(directory, exist_ok=True)
+    env = environment()
+    created = datetime.datetime.now(datetime.timezone.utc)
+    revision = (env["git_revision"] or "norev")[:10]
+    path = os.path.join(
+        directory,
+        f"{kind}-{created.strftime('%Y%m%dT%H%M%S%fZ')}-{revision}-"
+        f"{uuid.uuid4().hex[:8]}.json"
+    )
+    run = {
+        "schema_version": SCHEMA_VERSION,
+        "kind": kind,
+        "created": created.isoformat(),
+        "environment": env,
+        "config": config,
+        "results": records,
+    }
+    with open(path, "x") as f:
+        json.dump(run, f, indent=2)
+    return path
+
+
+def load_run(path):
+    """Read a saved run, rejecting unknown schema versions"""
+    with open(path) as f:
+        run = json.load(f)
+    version = run.get("schema_version")
+    if version != SCHEMA_VERSION:
+        raise ValueError(
+            f"{path}: unsupported schema version {version!r}"
+        )
+    return run
+
+
+def _incomplete_beta(a, b, x):
+    """Regularised incomplete beta I_x(a, b) by continued fraction"""
+    if x <= 0.0:
+        return 0.0
+    if x >= 1.0:
+        return 1.0
+    if x > (a + 1) / (a + b + 2):
+        return 1.0 - _incomplete_beta(b, a, 1.0 - x)
+    front = math.exp(
+        math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b)
+        + a * math.log(x) + b * math.log(1.0 - x)
+    ) / a
+    # Lentz's method
+    tiny = 1e-300
+    c, d = 1.0, 1.0 - (a + b) * x / (a + 1)
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    result = d
+    for m in range(1, 300):
+        for numerator in (
+            m * (b - m) * x / ((a + 2 * m - 1) * (a + 2 * m)),
+            -(a + m) * (a + b + m) * x / ((a + 2 * m) * (a + 2 * m + 1)),
+        ):
+            d = 1.0 + numerator * d
+            d = 1.0 / (d if abs(d) > tiny else tiny)
+            c = 1.0 + numerator / c
+            c = c if abs(c) > tiny else tiny
+            result *= c * d
+        if abs(c * d - 1.0) < 1e-12:
+            break
+    return front * result
+
+
+def welch_test(base, new):
+    """Two-sided Welch's t-test on the means of two result records.
+
+    Only the summary statistics are needed, so runs do not have to keep
+    their raw samples. Returns (t statistic, p-value)."""
+    n1, n2 = base["count"], new["count"]
+    if n1 < 2 or n2 < 2:
+        return 0.0, 1.0
+    v1 = base["stdev"] ** 2 / n1
+    v2 = new["stdev"] ** 2 / n2
+    if v1 + v2 == 0:
+        return 0.0, (1.0 if base["mean"] == new["mean"] else 0.0)
+    t = (new["mean"] - base["mean"]) / math.sqrt(v1 + v2)
+    dof = (v1 + v2) ** 2 / (v1 ** 2 / (n1 - 1) + v2 ** 2 / (n2 - 1))
+    p = _incomplete_beta(dof / 2, 0.5, dof / (dof + t * t))
+    return t, p
+
+
+def compare_runs(base, new, threshold=0.1, alpha=0.05,
+                 require_significance=False):
+    """Compare matching results of two runs.
+
+    A result regresses when throughput falls, or p99 rises, by more than
+    `threshold` (a fraction). With `require_significance`, the mean
+    latency difference must also be significant at `alpha`. Returns a
+    list of per-result dicts."""
+    new_results = {r["name"]: r for r in new["results"]}
+    rows = []
+    for old in base["results"]:
+        current = new_results.get(old["name"])
+        if current is None:
+            continue
+        _, p = welch_test(old, current)
+        throughput_change = _change(old["throughput"], current["throughput"])
+        p99_change = _change(old["p99"], current["p99"])
+        regressed = (
+            throughput_change < -threshold or p99_change > threshold
+        )
+        if require_significance and p >= alpha:
+            regressed = False
+        rows.append({
+            "name": old["name"],
+            "throughput_change": throughput_change,
+            "p99_change": p99_change,
+            "mean_change": _change(old["mean"], current["mean"]),
+            "p_value": p,
+            "significant": p < alpha,
+            "regressed": regressed,
+        })
+    return rows
+
+
+def _change(before, after):
+    """Relative change from before to after (0.1 = 10% higher)"""
+    if not before:
+        return 0.0
+    return (after - before) / before
+
+
+def print_comparison(base, new, rows):
+    """Print a comparison table of two runs"""
+    for label, run in (("base", base), ("new", new)):
+        env = run["environment"]
+        print(
+            f"{label:<5} {run['created']}  rev={env['git_revision']}"
+            f"{'+dirty' if env['git_dirty'] else ''}  host={env['host']}  "
+            f"python={env['python']}"
+        )
+    print(
+        f"{'result':<40} {'throughput':>11} {'p99':>9} {'mean':>9} "
+        f"{'p-value':>9}"
+    )
+    for row in rows:
+        flag = "  REGRESSION" if row["regressed"] else ""
+        print(
+            f"{row['name']:<40} {row['throughput_change']:>+10.1%} "
+            f"{row['p99_change']:>+8.1%} {row['mean_change']:>+8.1%} "
+            f"{row['p_value']:>9.4f}"
+            f"{'*' if row['significant'] else ' '}{flag}"
+        )
+
+
+def latest_runs(directory, kind=None):
+    """Saved run paths in a directory, oldest first by their recorded
+    creation time, optionally only those of one kind"""
+    if not os.path.isdir(directory):
+        return []
+    runs = []
+    for name in os.listdir(directory):
+        if not name.endswith(".json"):
+            continue
+        path = os.path.join(directory, name)
+        with open(path) as f:
+            run = json.load(f)
+        if kind is None or run.get("kind") == kind:
+            runs.append((run.get("created", ""), path))
+    return [path for _, path in sorted(runs)]
+
+
+def main(argv=None):
+    """Parse arguments and list or compare saved runs"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    listing = commands.add_parser("list", help="List saved runs")
+    listing.add_argument("--dir", default=DEFAULT_DIR)
+    listing.add_argument("--kind", default=None)
+
+    compare = commands.add_parser(
+        "compare", help="Compare two runs; exits 1 on a regression"
+    )
+    compare.add_argument(
+        "runs", nargs="*",
+        help="BASE NEW files; defaults to the two latest runs in --dir "
+             "of --kind, or of the newest run's kind"
+    )
+    compare.add_argument("--dir", default=DEFAULT_DIR)
+    compare.add_argument("--kind", default=None)
+    compare.add_argument(
+        "--threshold", type=float, default=0.1,
+        help="Allowed relative throughput drop or p99 rise"
+    )
+    compare.add_argument("--alpha", type=float, default=0.05)
+    compare.add_argument(
+        "--require-significance", action="store_true",
+        help="Only flag regressions whose mean change is significant"
+    )
+    args = parser.parse_args(argv)
+
+    if args.command == "list":
+        for path in latest_runs(args.dir, args.kind):
+            run = load_run(path)
+            env = run["environment"]
+            print(
+                f"{os.path.basename(path)}  {run['kind']}  "
+                f"rev={env['git_revision']}  results={len(run['results'])}"
+            )
+        return 0
+
+    paths = args.runs
+    if not paths:
+        # Without --kind, compare the newest run with the previous run
+        # of the same kind
+        kind = args.kind
+        newest = latest_runs(args.dir)[-1:]
+        if kind is None and newest:
+            kind = load_run(newest[0])["kind"]
+        paths = latest_runs(args.dir, kind)[-2:]
+    if len(paths) != 2:
+        parser.error("compare needs exactly two runs")
+    base, new = load_run(paths[0]), load_run(paths[1])
+    if base["kind"] != new["kind"]:
+        parser.error(f"cannot compare {base['kind']} with {new['kind']}")
+    rows = compare_runs(
+        base, new, args.threshold, args.alpha, args.require_significance
+    )
+    print_comparison(base, new, rows)
+    regressions = [row["name"] for row in rows if row["regressed"]]
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond "
+              f"{args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,335 @@
+"""Open- and closed-loop load generator for the search daemon"""
+import argparse
+import asyncio
+import json
+import os
+import ssl
+import statistics
+import tempfile
+import time
+
+from benchmark_file_search import (
+    generate_file, load_lines, make_queries, percentile
+)
+# Root-level module; benchmark_file_search puts the root on sys.path
+from async_client import QueryError, parse_reply
+from datasets import read_queries
+from harness import running_server, use_bundled_certificates
+from history import DEFAULT_DIR, record, save_run
+from server import AsyncTCPServer
+
+QUANTILES = (50, 90, 99, 99.9)
+
+
+def client_context() -> ssl.SSLContext:
+    """Client context matching client.py (no certificate verification)"""
+    context = ssl.create_default_context()
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE
+    return context
+
+
+async def send_query(host, port, context, query, timeout):
+    """Send one query over a fresh connection, as the daemon expects.
+
+    Returns True if a lookup answer (EXISTS or NOT FOUND) arrived, and
+    False on a rate-limit or error reply, a connection error or a
+    timeout, so those are counted as errors rather than fast requests."""
+    try:
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(host, port, ssl=context), timeout
+        )
+    except (OSError, asyncio.TimeoutError):
+        return False
+    try:
+        writer.write(query.encode("utf-8"))
+        response = await asyncio.wait_for(reader.readline(), timeout)
+        parse_reply(response.decode("utf-8").rstrip("\n"))
+        return True
+    except (OSError, asyncio.TimeoutError, UnicodeDecodeError, QueryError):
+        return False
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except (OSError, ssl.SSLError):
+            pass
+
+
+def latency_summary(samples):
+    """Mean, max and percentiles of a list of millisecond samples"""
+    ordered = sorted(samples)
+    summary = {f"p{q:g}": percentile(ordered, q) for q in QUANTILES}
+    summary["mean"] = statistics.mean(ordered) if ordered else 0.0
+    summary["stdev"] = statistics.stdev(ordered) if len(ordered) > 1 else 0.0
+    summary["max"] = ordered[-1] if ordered else 0.0
+    summary["count"] = len(ordered)
+    return summary
+
+
+async def open_loop(host, port, context, queries, rate, duration,
+                    timeout=5.0, max_in_flight=1000):
+    """Issue requests at a fixed arrival rate regardless of responses.
+
+    Latency is measured from each request's intended start time, so time
+    spent waiting behind a stalled generator or the in-flight cap counts
+    against the server (coordinated-omission correction). The service
+    latency from the actual send is reported alongside it."""
+    total = int(rate * duration)
+    slots = asyncio.Semaphore(max_in_flight)
+    corrected, service = [], []
+    errors = 0
+
+    async def fire(index, intended):
+        nonlocal errors
+        async with slots:
+            sent = time.perf_counter()
+            ok = await send_query(
+                host, port, context,
+                queries[index % len(queries)][0], timeout
+            )
+            done = time.perf_counter()
+        if ok:
+            corrected.append((done - intended) * 1000)
+            service.append((done - sent) * 1000)
+        else:
+            errors += 1
+
+    tasks = []
+    started = time.perf_counter()
+    for index in range(total):
+        intended = started + index / rate
+        delay = intended - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(fire(index, intended)))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+
+    return {
+        "requests": total,
+        "errors": errors,
+        "elapsed_s": elapsed,
+        "throughput_rps": len(corrected) / elapsed,
+        "latency_ms": latency_summary(corrected),
+        "service_latency_ms": latency_summary(service),
+    }
+
+
+async def closed_loop(host, port, context, queries, concurrency, duration,
+                      timeout=5.0):
+    """Run `concurrency` workers that each send a query, wait for the
+    answer and immediately send the next one until `duration` elapses"""
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker(offset):
+        nonlocal errors
+        index = offset
+        while time.perf_counter() < deadline:
+            sent = time.perf_counter()
+            ok = await send_query(
+                host, port, context,
+                queries[index % len(queries)][0], timeout
+            )
+            if ok:
+                latencies.append((time.perf_counter() - sent) * 1000)
+            else:
+                errors += 1
+            index += concurrency
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "requests": len(latencies) + errors,
+        "errors": errors,
+        "elapsed_s": elapsed,
+        "throughput_rps": len(latencies) / elapsed,
+        "latency_ms": latency_summary(latencies),
+    }
+
+
+def run_load(mode="closed", use_ssl=False, reread_on_query=False,
+             rate=200.0, concurrency=16, duration=10.0, num_lines=100000,
+             hit_ratio=0.5, host=None, port=None, timeout=5.0, warmup=20,
+             seed=0, server_options=None, data_path=None,
+             queries_path=None):
+    """Run one load scenario and return its result as a dict.
+
+    Without `host`, an in-process server is started with the requested
+    TLS and REREAD_ON_QUERY settings and its rate limit lifted. With
+    `host`, load goes to an already running daemon; its own settings
+    (and per-IP rate limit) then apply. `warmup` sequential queries are
+    sent first so worker-process start-up is not measured.
+    `server_options` are extra AsyncTCPServer arguments, such as the
+    executor type and worker count. `data_path` and `queries_path` use a
+    dataset and query workload written by datasets.py instead of
+    generating 'line-N' data."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        if data_path is None:
+            data_path = os.path.join(tmpdir, "data.txt")
+            generate_file(data_path, num_lines)
+        if queries_path is not None:
+            queries = read_queries(queries_path)
+        else:
+            queries = make_queries(
+                load_lines(data_path), 10000, hit_ratio, seed
+            )
+        context = client_context() if use_ssl else None
+
+        async def drive(target_host, target_port):
+            for query, _ in queries[:warmup]:
+                await send_query(
+                    target_host, target_port, context, query, timeout
+                )
+            if mode == "open":
+                return await open_loop(
+                    target_host, target_port, context, queries,
+                    rate, duration, timeout
+                )
+            return await closed_loop(
+                target_host, target_port, context, queries,
+                concurrency, duration, timeout
+            )
+
+        if host is not None:
+            result = asyncio.run(drive(host, port))
+        else:
+            if use_ssl:
+                use_bundled_certificates()
+            server = AsyncTCPServer(
+                host="127.0.0.1",
+                port=0,
+                file_path=data_path,
+                reread_on_query=reread_on_query,
+                use_ssl=use_ssl,
+                **(server_options or {})
+            )
+            server.rate_limit = float("inf")
+            with running_server(server) as (server_host, server_port):
+                result = asyncio.run(drive(server_host, server_port))
+
+    result.update({
+        "mode": mode,
+        "tls": use_ssl,
+        "reread_on_query": reread_on_query,
+        "rate": rate if mode == "open" else None,
+        "concurrency": concurrency if mode == "closed" else None,
+        "duration_s": duration,
+        "lines": num_lines,
+        "hit_ratio": hit_ratio,
+    })
+    return result
+
+
+def history_record(result):
+    """Convert a scenario result for the benchmark history"""
+    load = (f"rate={result['rate']:g}" if result["mode"] == "open"
+            else f"concurrency={result['concurrency']}")
+    latency = result["latency_ms"]
+    return record(
+        f"{result['mode']} {load} tls={result['tls']} "
+        f"reread={result['reread_on_query']}",
+        latency["mean"], latency["stdev"], latency["count"],
+        latency["p99"], result["throughput_rps"]
+    )
+
+
+def print_result(result):
+    """One-line summary of a scenario result"""
+    latency = result["latency_ms"]
+    print(
+        f"{result['mode']:<6} tls={result['tls']!s:<5} "
+        f"reread={result['reread_on_query']!s:<5} "
+        f"rps={result['throughput_rps']:9.1f}  "
+        f"errors={result['errors']:<5} "
+        f"p50={latency['p50']:8.2f} ms  p99={latency['p99']:8.2f} ms  "
+        f"p99.9={latency['p99.9']:8.2f} ms"
+    )
+
+
+def main():
+    """Parse arguments, run the scenarios and write the JSON results"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mode", choices=("open", "closed"),
+                        default="closed")
+    parser.add_argument("--rate", type=float, default=200.0,
+                        help="Arrivals per second in open-loop mode")
+    parser.add_argument("--concurrency", type=int, default=16,
+                        help="Workers in closed-loop mode")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--lines", type=int, default=100000)
+    parser.add_argument("--hit-ratio", type=float, default=0.5)
+    parser.add_argument("--data", default=None,
+                        help="Dataset file from datasets.py to serve")
+    parser.add_argument("--queries-file", default=None,
+                        help="Query workload from datasets.py")
+    parser.add_argument("--timeout", type=float, default=5.0)
+    parser.add_argument("--warmup", type=int, default=20,
+                        help="Unmeasured queries sent before the run")
+    parser.add_argument("--tls", action="store_true")
+    parser.add_argument("--reread", action="store_true",
+                        help="Start the in-process server with "
+                             "REREAD_ON_QUERY=True")
+    parser.add_argument("--matrix", action="store_true",
+                        help="Run every TLS x REREAD_ON_QUERY combination")
+    parser.add_argument("--host", default=None,
+                        help="Target a running daemon instead of starting "
+                             "one in-process")
+    parser.add_argument("--port", type=int, default=44445)
+    parser.add_argument("--output", default=None,
+                        help="Write the results to this JSON file")
+    parser.add_argument("--history", nargs="?", const=DEFAULT_DIR,
+                        default=None,
+                        help="Also save a versioned run for history.py "
+                             "compare (default directory: "
+                             "benchmarks/results)")
+    args = parser.parse_args()
+
+    if args.matrix:
+        scenarios = [(tls, reread) for tls in (False, True)
+                     for reread in (False, True)]
+    else:
+        scenarios = [(args.tls, args.reread)]
+
+    results = []
+    for use_ssl, reread in scenarios:
+        result = run_load(
+            mode=args.mode,
+            use_ssl=use_ssl,
+            reread_on_query=reread,
+            rate=args.rate,
+            concurrency=args.concurrency,
+            duration=args.duration,
+            num_lines=args.lines,
+            hit_ratio=args.hit_ratio,
+            host=args.host,
+            port=args.port,
+            timeout=args.timeout,
+            warmup=args.warmup,
+            data_path=args.data,
+            queries_path=args.queries_file,
+        )
+        print_result(result)
+        results.append(result)
+
+    if args.history:
+        path = save_run(
+            "load", vars(args), [history_record(r) for r in results],
+            args.history
+        )
+        print(f"History saved to {path}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+    else:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -21,6 +21,10 @@ def parse_arguments() -> argparse.Namespace:
     parser.add_argument(
         "--use_ssl", action="store_true", help="Use SSL for secure connection"
     )
+    parser.add_argument(
+        "--unix_socket", type=str, default=None,
+        help="Connect through a local Unix socket path instead of TCP"
+    )
     parser.add_argument(
         "--query", type=str, required=True, help="Query string to search for"
     )
@@ -32,19 +36,35 @@ def parse_arguments() -> argparse.Namespace:
     return parser.parse_args()
 
 
+def query_unix_socket(args: argparse.Namespace) -> str:
+    # Sends the query over a Unix domain socket and returns the response.
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client_socket:
+        client_socket.connect(args.unix_socket)
+        client_socket.sendall(args.query.encode("utf-8"))
+        return client_socket.recv(1024).decode("utf-8")
+
+
 def main() -> None:
     # Main function to connect to the server and send the query.
     args = parse_arguments()
 
     # Display connection details
-    print(
-        f"[*] Connecting to server at "
-        f"{args.server_address}:{args.server_port} "
-        f"with SSL={'Yes' if args.use_ssl else 'No'}"
-    )
+    if args.unix_socket:
+        print(f"[*] Connecting to server at {args.unix_socket}")
+    else:
+        print(
+            f"[*] Connecting to server at "
+            f"{args.server_address}:{args.server_port} "
+            f"with SSL={'Yes' if args.use_ssl else 'No'}"
+        )
     print(f"[*] Sending query: {args.query}")
 
     try:
+        if args.unix_socket:
+            # Local connections skip TCP and TLS entirely
+            print(f"[*] Server response: {query_unix_socket(args)}")
+            return
+
         # Create an SSL context for secure connections
         context = ssl.create_default_context()
 
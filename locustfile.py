@@ -1,17 +1,199 @@
-from locust import HttpUser, TaskSet, task, between
+import json
+import random
+import socket
+import ssl
+import time
+import uuid
+from typing import List, Optional
 
+from locust import User, between, events, task
 
-class MyTaskSet(TaskSet):
-    # Define a set of tasks to be executed by the user.
-    host = "http://127.0.0.1:8089"
+from async_client import parse_reply
 
-    @task(1)
-    def get_example(self):
-        # Sends a GET request to the /example endpoint.
-        self.client.get("/example")
 
+@events.init_command_line_parser.add_listener
+def add_arguments(parser) -> None:
+    # Registers the search-daemon options on Locust's command line.
+    parser.add_argument(
+        "--queries-file", default="200k.txt",
+        help="Lines present in the served file (plain text, or JSON lines "
+             "with a 'query' field); hits are drawn from here"
+    )
+    parser.add_argument(
+        "--hit-ratio", type=float, default=0.5,
+        help="Share of queries expected to be found"
+    )
+    parser.add_argument(
+        "--tls", action="store_true", help="Connect with TLS"
+    )
+    parser.add_argument(
+        "--one-shot", action="store_true",
+        help="Open a new connection per query instead of keeping one open"
+    )
+    parser.add_argument(
+        "--query-timeout", type=float, default=10.0,
+        help="Socket timeout in seconds"
+    )
 
-class MyUser(HttpUser):
-    # Defines a user that will execute tasks defined in MyTaskSet.
-    tasks = [MyTaskSet]
-    wait_time = between(1, 3)
+
+def load_queries(path: str) -> List[str]:
+    # Reads queries from a plain-text file or JSON lines with a 'query';
+    # entries marked "hit": false (as datasets.py writes) are skipped.
+    queries = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if line.startswith("{"):
+                entry = json.loads(line)
+                if not entry.get("hit", True):
+                    continue
+                line = entry.get("query", "")
+            if line.strip():
+                queries.append(line)
+    if not queries:
+        raise ValueError(f"No queries found in {path}")
+    return queries
+
+
+class SearchClient:
+    # TCP/TLS client for AsyncTCPServer that reports every query to
+    # Locust. Persistent connections use the server's keep-alive mode
+    # (newline-terminated queries); one-shot connections send a bare
+    # query and read until the server closes, as client.py does.
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        request_event,
+        use_ssl: bool = False,
+        persistent: bool = True,
+        timeout: float = 10.0
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.request_event = request_event
+        self.persistent = persistent
+        self.timeout = timeout
+        self.context: Optional[ssl.SSLContext] = None
+        if use_ssl:
+            self.context = ssl.create_default_context()
+            self.context.check_hostname = False
+            self.context.verify_mode = ssl.CERT_NONE
+        self.session: Optional[ssl.SSLSession] = None
+        self.sock: Optional[socket.socket] = None
+        self.buffer = b""
+
+    @property
+    def request_type(self) -> str:
+        return "TLS" if self.context else "TCP"
+
+    def connect(self) -> socket.socket:
+        # Opens a connection, resuming the previous TLS session if any.
+        sock = socket.create_connection(
+            (self.host, self.port), timeout=self.timeout
+        )
+        if self.context:
+            sock = self.context.wrap_socket(
+                sock, server_hostname=self.host, session=self.session
+            )
+        return sock
+
+    def close(self) -> None:
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+            self.buffer = b""
+
+    def query(self, query: str, name: str, expect_hit: bool) -> str:
+        # Sends one query and fires a Locust request event for it.
+        start = time.perf_counter()
+        response = ""
+        exception = None
+        try:
+            if self.persistent:
+                response = self.query_persistent(query)
+            else:
+                response = self.query_one_shot(query)
+            if not response:
+                raise ConnectionError("Connection closed without a response")
+            # Rate-limit and error replies raise QueryError
+            found = parse_reply(response.rstrip())
+            if found != expect_hit:
+                raise AssertionError(f"Unexpected response: {response!r}")
+        except Exception as e:
+            exception = e
+            self.close()
+        self.request_event.fire(
+            request_type=self.request_type,
+            name=name,
+            response_time=(time.perf_counter() - start) * 1000,
+            response_length=len(response),
+            exception=exception,
+            context={"query": query},
+        )
+        return response
+
+    def query_persistent(self, query: str) -> str:
+        if self.sock is None:
+            self.sock = self.connect()
+        self.sock.sendall(query.encode("utf-8") + b"\n")
+        while b"\n" not in self.buffer:
+            chunk = self.sock.recv(4096)
+            if not chunk:
+                raise ConnectionError("Server closed the connection")
+            self.buffer += chunk
+        line, _, self.buffer = self.buffer.partition(b"\n")
+        if self.context:
+            # Tickets arrive after the handshake; keep one so a reconnect
+            # after an error resumes instead of doing a full handshake
+            self.session = self.sock.session
+        return line.decode("utf-8")
+
+    def query_one_shot(self, query: str) -> str:
+        with self.connect() as sock:
+            sock.sendall(query.encode("utf-8"))
+            chunks = []
+            while True:
+                chunk = sock.recv(4096)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+            if self.context:
+                # Tickets arrive after the handshake; keep one for resumption
+                self.session = sock.session
+        return b"".join(chunks).decode("utf-8").rstrip("\n")
+
+
+class SearchUser(User):
+    # Sends a mix of hit and miss queries to the search daemon. Run with
+    # e.g. `locust -H 127.0.0.1:44445 --queries-file 200k.txt --tls`.
+    wait_time = between(0, 0.1)
+    host = "127.0.0.1:44445"
+    queries: List[str] = []
+
+    def on_start(self) -> None:
+        options = self.environment.parsed_options
+        if not SearchUser.queries:
+            SearchUser.queries = load_queries(options.queries_file)
+        self.hit_ratio = options.hit_ratio
+        host, _, port = self.host.rpartition(":")
+        self.client = SearchClient(
+            host,
+            int(port),
+            self.environment.events.request,
+            use_ssl=options.tls,
+            persistent=not options.one_shot,
+            timeout=options.query_timeout,
+        )
+
+    def on_stop(self) -> None:
+        self.client.close()
+
+    @task
+    def search(self) -> None:
+        if random.random() < self.hit_ratio:
+            self.client.query(random.choice(self.queries), "hit", True)
+        else:
+            # Random suffix keeps misses out of the served file
+            query = f"{random.choice(self.queries)}-{uuid.uuid4().hex}"
+            self.client.query(query, "miss", False)
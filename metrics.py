@@ -0,0 +1,276 @@
+import asyncio
+import bisect
+import logging
+from typing import Callable, Optional
+
+logger = logging.getLogger()
+
+# Latency buckets in seconds, from 50us to 10s
+DEFAULT_BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+def escape_label(value) -> str:
+    # Escapes a label value as required by the text exposition format.
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace('"', '\\"')
+        .replace("\n", "\\n")
+    )
+
+
+def format_labels(labels: dict, extra: Optional[dict] = None) -> str:
+    # Renders {"a": "b"} as '{a="b"}' (empty string for no labels).
+    merged = dict(labels, **(extra or {}))
+    if not merged:
+        return ""
+    pairs = ",".join(
+        f'{key}="{escape_label(value)}"' for key, value in merged.items()
+    )
+    return "{" + pairs + "}"
+
+
+# Value read from the application when the endpoint is scraped
+class CallbackMetric:
+    # Counters and gauges the server already tracks as plain attributes
+    # are exported through a callback, so the hot path pays nothing.
+    def __init__(self, getter: Callable[[], float], labels: dict) -> None:
+        self.getter = getter
+        self.labels = labels
+
+    def samples(self, name: str) -> list:
+        return [(name + format_labels(self.labels), self.getter())]
+
+
+# Cumulative histogram with fixed bucket bounds
+class Histogram:
+    __slots__ = ("bounds", "counts", "sum", "count", "labels")
+
+    def __init__(self, bounds: tuple, labels: dict) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.labels = labels
+
+    def observe(self, value: float) -> None:
+        # O(log buckets) and allocation free.
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def samples(self, name: str) -> list:
+        result = []
+        cumulative = 0
+        for bound, count in zip(self.bounds, self.counts):
+            cumulative += count
+            result.append((
+                name + "_bucket"
+                + format_labels(self.labels, {"le": repr(bound)}),
+                cumulative,
+            ))
+        result.append((
+            name + "_bucket" + format_labels(self.labels, {"le": "+Inf"}),
+            self.count,
+        ))
+        result.append((name + "_sum" + format_labels(self.labels), self.sum))
+        result.append(
+            (name + "_count" + format_labels(self.labels), self.count)
+        )
+        return result
+
+
+# Collection of metrics rendered in the Prometheus text format
+class MetricsRegistry:
+    def __init__(self, prefix: str = "") -> None:
+        self.prefix = prefix
+        self.families = {}  # name -> (type, help, [metrics])
+
+    def _add(self, kind: str, name: str, help_text: str, metric):
+        family = self.families.setdefault(
+            self.prefix + name, (kind, help_text, [])
+        )
+        family[2].append(metric)
+        return metric
+
+    def counter(
+        self,
+        name: str,
+        help_text: str,
+        getter: Callable[[], float],
+        labels: Optional[dict] = None
+    ) -> CallbackMetric:
+        return self._add(
+            "counter", name, help_text, CallbackMetric(getter, labels or {})
+        )
+
+    def gauge(
+        self,
+        name: str,
+        help_text: str,
+        getter: Callable[[], float],
+        labels: Optional[dict] = None
+    ) -> CallbackMetric:
+        return self._add(
+            "gauge", name, help_text, CallbackMetric(getter, labels or {})
+        )
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labels: Optional[dict] = None,
+        buckets: tuple = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._add(
+            "histogram", name, help_text, Histogram(buckets, labels or {})
+        )
+
+    def render(self) -> str:
+        # Renders every metric family in the Prometheus text format.
+        lines = []
+        for name, (kind, help_text, metrics) in self.families.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for metric in metrics:
+                try:
+                    samples = metric.samples(name)
+                except Exception as e:
+                    logger.error(f"Failed to collect metric {name}: {e}")
+                    continue
+                for sample_name, value in samples:
+                    lines.append(f"{sample_name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+async def handle_metrics_request(
+    registry: MetricsRegistry,
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter
+) -> None:
+    # Minimal HTTP/1.0 responder: GET /metrics returns the registry,
+    # anything else is a 404.
+    try:
+        request_line = await asyncio.wait_for(reader.readline(), 5)
+        while True:  # Discard headers up to the blank line
+            header = await asyncio.wait_for(reader.readline(), 5)
+            if header in (b"\r\n", b"\n", b""):
+                break
+        parts = request_line.decode("latin-1").split()
+        if len(parts) >= 2 and parts[0] == "GET" and \
+                parts[1].split("?")[0] == "/metrics":
+            status = "200 OK"
+            body = registry.render().encode("utf-8")
+        else:
+            status = "404 Not Found"
+            body = b"Not Found\n"
+        writer.write(
+            f"HTTP/1.0 {status}\r\n"
+            "Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: close\r\n\r\n".encode("latin-1") + body
+        )
+        await writer.drain()
+    except (asyncio.TimeoutError, ConnectionError) as e:
+        logger.debug("Metrics request failed: %s", e)
+    finally:
+        writer.close()
+
+
+# Log-linear latency histogram in the style of HdrHistogram
+class LatencyHistogram:
+    # Values are integer nanoseconds. Below 2**sub_bucket_bits they are
+    # counted exactly; above, every power-of-two range is split into
+    # 2**(sub_bucket_bits - 1) linear sub-buckets, so the relative error
+    # stays under 2**-(sub_bucket_bits - 1) (1.6% by default) while the
+    # memory is a fixed list of counts. Recording is a bit_length, a shift
+    # and an increment.
+    __slots__ = (
+        "sub_bucket_bits", "half", "max_value", "counts",
+        "count", "total", "min", "max",
+    )
+
+    def __init__(
+        self, sub_bucket_bits: int = 7, max_value: int = 60 * 10 ** 9
+    ) -> None:
+        self.sub_bucket_bits = sub_bucket_bits
+        self.half = 1 << (sub_bucket_bits - 1)
+        self.max_value = max_value
+        self.counts = [0] * (self.index_of(max_value) + 1)
+        self.count = 0
+        self.total = 0
+        self.min = max_value
+        self.max = 0
+
+    def index_of(self, value: int) -> int:
+        exponent = value.bit_length() - self.sub_bucket_bits
+        if exponent <= 0:
+            return value
+        return exponent * self.half + (value >> exponent)
+
+    def value_at(self, index: int) -> int:
+        # Midpoint of the range of values counted in bucket `index`.
+        if index < 2 * self.half:
+            return index
+        exponent = (index >> (self.sub_bucket_bits - 1)) - 1
+        mantissa = index - exponent * self.half
+        return (mantissa << exponent) + (1 << exponent) // 2
+
+    def record(self, value: int) -> None:
+        # Hot path: index_of() is inlined to save a method call.
+        if value > self.max_value:
+            value = self.max_value
+        elif value < 0:
+            value = 0
+        exponent = value.bit_length() - self.sub_bucket_bits
+        if exponent > 0:
+            self.counts[exponent * self.half + (value >> exponent)] += 1
+        else:
+            self.counts[value] += 1
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def snapshot(self) -> list:
+        # Copy of the bucket counts, used to report a single interval.
+        return list(self.counts)
+
+    def percentiles(
+        self, quantiles: tuple, since: Optional[list] = None
+    ) -> dict:
+        # Returns {quantile: value in ns}. With `since` (an earlier
+        # snapshot), only values recorded after that snapshot count.
+        counts = self.counts
+        if since is not None:
+            counts = [now - then for now, then in zip(counts, since)]
+        count = sum(counts)
+        result = {}
+        if not count:
+            return {q: 0 for q in quantiles}
+        targets = sorted(quantiles)
+        position = 0
+        seen = 0
+        for index, bucket_count in enumerate(counts):
+            if not bucket_count:
+                continue
+            seen += bucket_count
+            while position < len(targets) and \
+                    seen >= targets[position] / 100.0 * count:
+                result[targets[position]] = self.value_at(index)
+                position += 1
+            if position == len(targets):
+                break
+        return result
+
+    def reset(self) -> None:
+        self.counts = [0] * len(self.counts)
+        self.count = 0
+        self.total = 0
+        self.min = self.max_value
+        self.max = 0
@@ -0,0 +1,226 @@
+import asyncio
+import collections
+import logging
+import sys
+import threading
+import time
+import traceback
+from typing import Callable, Optional
+
+import psutil
+
+from metrics import LatencyHistogram
+
+logger = logging.getLogger()
+
+
+# Periodic process resource sampler
+class ResourceSampler:
+    # One task wakes up every `interval` seconds and records process RSS,
+    # CPU, open file descriptors, event-loop lag and executor queue depth
+    # into a ring buffer. Monitoring costs O(1) per interval instead of a
+    # psutil call per request.
+    def __init__(
+        self,
+        interval: float = 5.0,
+        history: int = 120,
+        queue_depth: Optional[Callable[[], int]] = None
+    ) -> None:
+        self.interval = interval
+        self.samples = collections.deque(maxlen=history)
+        self.queue_depth = queue_depth or (lambda: 0)
+        self.process = psutil.Process()
+        self.task: Optional[asyncio.Task] = None
+        # Prime cpu_percent() so the first real sample is meaningful
+        self.process.cpu_percent(interval=None)
+
+    @property
+    def latest(self) -> dict:
+        return self.samples[-1] if self.samples else {}
+
+    def start(self) -> None:
+        if self.task is None:
+            self.task = asyncio.create_task(self.run())
+
+    def stop(self) -> None:
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    def sample(self, loop_lag: float = 0.0) -> dict:
+        # Takes one sample and appends it to the ring buffer.
+        with self.process.oneshot():
+            entry = {
+                "time": time.time(),
+                "rss_bytes": self.process.memory_info().rss,
+                "cpu_percent": self.process.cpu_percent(interval=None),
+                "open_fds": (
+                    self.process.num_fds()
+                    if hasattr(self.process, "num_fds") else None
+                ),
+                "loop_lag": loop_lag,
+                "executor_queue": self.queue_depth(),
+            }
+        self.samples.append(entry)
+        return entry
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            # How late the loop woke us up is its scheduling lag.
+            lag = max(0.0, loop.time() - expected)
+            try:
+                self.sample(lag)
+            except psutil.Error as e:
+                logger.warning("Resource sample failed: %s", e)
+
+
+def measure_index(entries: set, line_count: int) -> dict:
+    # Process memory held by an index set, split into the string objects
+    # themselves (payload) and the set's hash table (structure). Both are
+    # C-level passes, so this stays cheap next to building the set.
+    payload = sum(map(sys.getsizeof, entries))
+    structure = sys.getsizeof(entries)
+    count = len(entries)
+    return {
+        "entries": count,
+        "lines": line_count,
+        "payload_bytes": payload,
+        "structure_bytes": structure,
+        "total_bytes": payload + structure,
+        "bytes_per_entry": (
+            round((payload + structure) / count, 2) if count else 0.0
+        ),
+    }
+
+
+# Bounded log of requests slower than a threshold
+class SlowLog:
+    # Keeps the most recent `size` slow requests with enough context to
+    # explain them. Fast requests cost a single float comparison.
+    def __init__(self, threshold: float = 0.1, size: int = 128) -> None:
+        self.threshold = threshold  # Seconds; 0 disables the log
+        self.entries = collections.deque(maxlen=size)
+        self.recorded = 0  # Slow requests seen, including evicted ones
+
+    def maybe_record(
+        self,
+        elapsed: float,
+        stages: dict,
+        query: Optional[str],
+        peer,
+        status: str,
+        index_generation: int
+    ) -> bool:
+        if not self.threshold or elapsed < self.threshold:
+            return False
+        self.recorded += 1
+        self.entries.append({
+            "time": time.time(),
+            "total_ms": round(elapsed * 1000, 3),
+            "stages_ms": {
+                stage: round(seconds * 1000, 3)
+                for stage, seconds in stages.items()
+            },
+            "query": query,
+            "peer": str(peer),
+            "status": status,
+            "index_generation": index_generation,
+            "reloaded": "reload" in stages,
+        })
+        return True
+
+    def recent(self, count: int) -> list:
+        # Newest last, at most `count` entries.
+        entries = list(self.entries)
+        return entries[-count:] if count > 0 else []
+
+
+# Detects callbacks that block the event loop and captures their stack
+class LoopWatchdog:
+    # A heartbeat callback on the loop runs every `interval` seconds and
+    # records how late it ran into a lag histogram. A watchdog thread
+    # checks the heartbeat; if it is older than `threshold`, the loop is
+    # stuck in some callback, so the loop thread's stack is captured while
+    # the offending call is still running. One capture per stall.
+    def __init__(
+        self,
+        interval: float = 0.05,
+        threshold: float = 0.1,
+        history: int = 32
+    ) -> None:
+        self.interval = interval
+        self.threshold = threshold
+        self.lag = LatencyHistogram()
+        self.max_lag = 0.0
+        self.stalls = collections.deque(maxlen=history)
+        self.stall_count = 0
+        self.last_beat = time.monotonic()
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.loop_thread_id: Optional[int] = None
+        self.handle: Optional[asyncio.TimerHandle] = None
+        self.thread: Optional[threading.Thread] = None
+        self.stop_event = threading.Event()
+
+    def start(self) -> None:
+        # Must be called from the event loop thread.
+        if self.thread is not None:
+            return
+        self.loop = asyncio.get_running_loop()
+        self.loop_thread_id = threading.get_ident()
+        self.last_beat = time.monotonic()
+        self.stop_event.clear()
+        self.handle = self.loop.call_later(self.interval, self._beat)
+        self.thread = threading.Thread(
+            target=self._watch, name="loop-watchdog", daemon=True
+        )
+        self.thread.start()
+
+    def stop(self) -> None:
+        if self.handle is not None:
+            self.handle.cancel()
+            self.handle = None
+        if self.thread is not None:
+            self.stop_event.set()
+            self.thread.join(1.0)
+            self.thread = None
+
+    def _beat(self) -> None:
+        now = time.monotonic()
+        lag = max(0.0, now - self.last_beat - self.interval)
+        self.lag.record(int(lag * 1e9))
+        if lag > self.max_lag:
+            self.max_lag = lag
+        self.last_beat = now
+        self.handle = self.loop.call_later(self.interval, self._beat)
+
+    def _watch(self) -> None:
+        reported_beat = None
+        while not self.stop_event.wait(self.interval / 2):
+            beat = self.last_beat
+            blocked = time.monotonic() - beat - self.interval
+            if blocked < self.threshold or beat == reported_beat:
+                continue
+            reported_beat = beat
+            frame = sys._current_frames().get(self.loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame else ""
+            self.stall_count += 1
+            self.stalls.append({
+                "time": time.time(),
+                "blocked_ms": round(blocked * 1000, 3),
+                "stack": stack,
+            })
+            logger.warning(
+                "Event loop blocked for at least %.1f ms in:\n%s",
+                blocked * 1000, stack
+            )
+
+    def summary(self) -> dict:
+        values = self.lag.percentiles((50, 99, 99.9))
+        return {
+            "lag_us": {f"p{q:g}": ns / 1000 for q, ns in values.items()},
+            "max_lag_ms": round(self.max_lag * 1000, 3),
+            "stalls": self.stall_count,
+        }
@@ -0,0 +1,136 @@
+import collections
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Optional
+
+logger = logging.getLogger()
+
+
+# Statistical profiler for the event loop thread
+class SamplingProfiler:
+    # Samples the target thread's stack every `interval` seconds from a
+    # background thread and aggregates identical stacks. Nothing runs in
+    # the request path, and when no window is active there is no thread
+    # at all, so the disabled cost is zero.
+    def __init__(
+        self,
+        output_path: str,
+        interval: float = 0.005,
+        duration: float = 30.0
+    ) -> None:
+        self.output_path = output_path
+        self.interval = interval
+        self.duration = duration
+        self.stacks: collections.Counter = collections.Counter()
+        self.samples = 0
+        self.thread: Optional[threading.Thread] = None
+        self.stop_event = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(
+        self,
+        duration: Optional[float] = None,
+        thread_id: Optional[int] = None
+    ) -> bool:
+        # Starts a profiling window on thread_id (default: the caller's
+        # thread). Returns False if a window is already running.
+        if self.running:
+            return False
+        self.stacks = collections.Counter()
+        self.samples = 0
+        self.stop_event.clear()
+        self.thread = threading.Thread(
+            target=self._run,
+            args=(
+                thread_id or threading.get_ident(),
+                duration or self.duration,
+            ),
+            name="sampling-profiler",
+            daemon=True,
+        )
+        self.thread.start()
+        logger.info(
+            f"Profiling started for {duration or self.duration}s, "
+            f"writing to {self.output_path}"
+        )
+        return True
+
+    def stop(self) -> bool:
+        # Ends the current window early; results are still written.
+        if not self.running:
+            return False
+        self.stop_event.set()
+        return True
+
+    def toggle(self) -> None:
+        # Starts a window if none is running, otherwise stops it.
+        if not self.stop():
+            self.start()
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        if self.thread is not None:
+            self.thread.join(timeout)
+
+    def _run(self, thread_id: int, duration: float) -> None:
+        deadline = time.monotonic() + duration
+        while not self.stop_event.wait(self.interval):
+            frame = sys._current_frames().get(thread_id)
+            if frame is None:
+                break  # Target thread has exited
+            self.stacks[self.collapse(frame)] += 1
+            self.samples += 1
+            if time.monotonic() >= deadline:
+                break
+        try:
+            self.write()
+        except OSError as e:
+            logger.error(f"Failed to write profile: {e}")
+
+    @staticmethod
+    def collapse(frame) -> str:
+        # Renders a stack root-first as "a;b;c", the collapsed format
+        # understood by flamegraph.pl and speedscope.
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(
+                f"{code.co_name} "
+                f"({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            )
+            frame = frame.f_back
+        return ";".join(reversed(names))
+
+    def write(self) -> None:
+        # Writes collapsed stacks to output_path and a per-function
+        # summary of self and total samples to output_path + ".stats".
+        with open(self.output_path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+        own = collections.Counter()
+        total = collections.Counter()
+        for stack, count in self.stacks.items():
+            names = stack.split(";")
+            own[names[-1]] += count
+            for name in set(names):
+                total[name] += count
+
+        with open(self.output_path + ".stats", "w") as f:
+            f.write(f"samples: {self.samples}\n")
+            f.write(f"interval: {self.interval}s\n\n")
+            f.write(f"{'self':>8} {'self%':>7} {'total':>8}  function\n")
+            for name, count in own.most_common(40):
+                share = 100.0 * count / max(self.samples, 1)
+                f.write(
+                    f"{count:>8} {share:>6.1f}% {total[name]:>8}  {name}\n"
+                )
+        logger.info(
+            f"Profile written to {self.output_path} "
+            f"({self.samples} samples)"
+        )
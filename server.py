@@ -2,29 +2,91 @@
 import asyncio
 import ssl
 import configparser
+import functools
 import logging
+import logging.handlers
+import json
+import queue
+import random
 import os
 import sys
 import time
 import signal
+import socket
+import struct
 import re
 from typing import Optional
-from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import (
+    Executor, ProcessPoolExecutor, ThreadPoolExecutor
+)
 from loguru import logger
-import cProfile
-import pstats
 import multiprocessing
-import psutil
 import atexit
 import mmap
+from profiler import SamplingProfiler
+from admin import AdminControl
+from monitoring import LoopWatchdog, ResourceSampler, SlowLog, measure_index
+from tracing import STAGES, RequestTimings, TraceWriter
+from metrics import (
+    LatencyHistogram,
+    MetricsRegistry,
+    handle_metrics_request,
+)
 
 
-# Configure logging to output messages with timestamps and severity levels
-logging.basicConfig(
-    filename="service_debug.log",
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-)
+# Formats every log record as a single JSON object per line
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "message": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", {}))
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+# Hands records to the logging thread without formatting them first
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The queue never leaves the process, so the record can be passed
+        # as-is and formatted by the listener thread instead of the loop.
+        return record
+
+
+def setup_logging(filename: str, level: int = logging.INFO):
+    # Routes the root logger through a queue to a background thread that
+    # formats records as JSON and writes them to `filename`. Like
+    # logging.basicConfig, does nothing if the root logger is configured.
+    root = logging.getLogger()
+    if root.handlers:
+        return None
+    log_queue = queue.SimpleQueue()
+    file_handler = logging.FileHandler(filename)
+    file_handler.setFormatter(JsonFormatter())
+    listener = logging.handlers.QueueListener(log_queue, file_handler)
+    listener.start()
+    atexit.register(listener.stop)
+    queue_handler = DeferredQueueHandler(log_queue)
+
+    def restart_in_child() -> None:
+        # The writer thread does not survive fork() (the daemon forks
+        # twice after import), so the child gets a fresh queue and thread
+        listener.queue = queue_handler.queue = queue.SimpleQueue()
+        listener._thread = None
+        listener.start()
+
+    os.register_at_fork(after_in_child=restart_in_child)
+
+    root.setLevel(level)
+    root.addHandler(queue_handler)
+    return listener
+
+
+# Configure logging to output structured messages from a background writer
+log_listener = setup_logging("service_debug.log")
 logger = logging.getLogger()
 
 
@@ -49,28 +111,227 @@ def query_in_file(query: str, file_content: set) -> str:
     return f"Query '{query}' NOT FOUND"
 
 
+EXECUTOR_TYPES = ("inline", "thread", "process")
+# Index structures query_in_file can search: a set, or batch_lookup's
+# sorted NumPy digest array (imported only when selected)
+LOOKUP_ENGINES = ("set", "numpy")
+
+
+def create_executor(
+    executor_type: str, workers: Optional[int] = None
+) -> Optional[Executor]:
+    # Builds the executor lookups run on; None means inline on the loop.
+    if executor_type not in EXECUTOR_TYPES:
+        raise ValueError(
+            f"Unknown executor type {executor_type!r}, "
+            f"expected one of {', '.join(EXECUTOR_TYPES)}"
+        )
+    workers = workers or multiprocessing.cpu_count()
+    if executor_type == "thread":
+        return ThreadPoolExecutor(max_workers=workers)
+    if executor_type == "process":
+        return ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return None
+
+
+# Shared timer used to enforce per-connection deadlines
+class TimerWheel:
+    # Hashed timer wheel: deadlines are bucketed into slots of
+    # `resolution` seconds and a single periodic tick expires a whole slot.
+    # Scheduling and cancelling are O(1) dict operations, which is much
+    # cheaper than arming an asyncio timeout around every read and write.
+    def __init__(self, resolution: float = 0.1, slots: int = 512) -> None:
+        self.resolution = resolution
+        self.slots = [{} for _ in range(slots)]
+        self.ticks = 0
+        self.started_at = 0.0
+        self.handle: Optional[asyncio.TimerHandle] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def schedule(self, timeout: float, callback) -> Optional[tuple]:
+        # Runs callback after roughly `timeout` seconds; returns a key
+        # for cancel(). A falsy timeout disables the deadline.
+        if not timeout:
+            return None
+        if self.handle is None:
+            self.start()
+        target = self.ticks + max(1, int(timeout / self.resolution + 0.5))
+        slot = target % len(self.slots)
+        token = object()
+        self.slots[slot][token] = (target, callback)
+        return slot, token
+
+    def cancel(self, key: Optional[tuple]) -> None:
+        # Removes a pending deadline; unknown or expired keys are ignored.
+        if key is not None:
+            self.slots[key[0]].pop(key[1], None)
+
+    def start(self) -> None:
+        # Starts ticking on the running event loop. Ticks count from this
+        # start, since _tick schedules against started_at.
+        self.loop = asyncio.get_running_loop()
+        self.ticks = 0
+        self.started_at = self.loop.time()
+        self.handle = self.loop.call_at(
+            self.started_at + self.resolution, self._tick
+        )
+
+    def stop(self) -> None:
+        # Stops ticking; pending deadlines are dropped.
+        if self.handle is not None:
+            self.handle.cancel()
+            self.handle = None
+        for slot in self.slots:
+            slot.clear()
+
+    def _tick(self) -> None:
+        # Expires every deadline that has come due in the current slot.
+        self.ticks += 1
+        slot = self.slots[self.ticks % len(self.slots)]
+        if slot:
+            expired = [
+                token for token, (target, _) in slot.items()
+                if target <= self.ticks
+            ]
+            for token in expired:
+                _, callback = slot.pop(token)
+                try:
+                    callback()
+                except Exception as e:
+                    logger.error(f"Deadline callback failed: {e}")
+        # Schedule against the start time so ticks do not drift.
+        self.handle = self.loop.call_at(
+            self.started_at + (self.ticks + 1) * self.resolution, self._tick
+        )
+
+
+# Datagram protocol answering one query per packet
+class QueryDatagramProtocol(asyncio.DatagramProtocol):
+    # Each datagram is "<request id> <query>" and each answer is
+    # "<request id> <response>", so clients can match answers to queries
+    # without any connection state.
+    def __init__(self, server: "AsyncTCPServer") -> None:
+        self.server = server
+        self.transport: Optional[asyncio.DatagramTransport] = None
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self.transport = transport
+
+    def datagram_received(self, data: bytes, addr: tuple) -> None:
+        request_id, _, query = data.partition(b" ")
+        if self.server.reread_on_query:
+            asyncio.ensure_future(
+                self.reply_after_reload(request_id, query, addr)
+            )
+            return
+        self.reply(request_id, query, addr)
+
+    def reply(self, request_id: bytes, query: bytes, addr: tuple) -> None:
+        response = self.server.answer_datagram(query, addr[0])
+        self.transport.sendto(request_id + b" " + response.encode(), addr)
+
+    async def reply_after_reload(
+        self, request_id: bytes, query: bytes, addr: tuple
+    ) -> None:
+        # Honours REREAD_ON_QUERY like the stream listeners do.
+        try:
+            await self.server.load_file_content()
+        except Exception as e:
+            logger.error(f"Failed to reload file for UDP query: {e}")
+        self.reply(request_id, query, addr)
+
+    def error_received(self, exc: Exception) -> None:
+        logger.warning(f"UDP endpoint error: {exc}")
+
+
 # Class to handle server configuration
 class ServerConfig:
     def __init__(self, config_path: str) -> None:
         try:
             # Read configuration from the specified path
+            config = configparser.ConfigParser()
+            config.read(config_path)
             (
                 self.file_path,
                 self.reread_on_query,
                 self.use_ssl,
                 self.logfile
-            ) = self._read_config(config_path)
+            ) = self._read_config(config)
+            # Optional Unix socket path for co-located clients
+            self.unix_socket = config.get(
+                "SERVER", "unix_socket", fallback=None
+            )
+            # Optional UDP port for single-datagram queries
+            self.udp_port = config.getint(
+                "SERVER", "udp_port", fallback=None
+            )
+            # Where lookups run and how many workers (0: one per CPU)
+            self.executor_type = config.get(
+                "SERVER", "executor", fallback="process"
+            )
+            self.workers = config.getint(
+                "SERVER", "workers", fallback=0
+            ) or None
+            self.lookup_engine = config.get(
+                "SERVER", "lookup_engine", fallback="set"
+            )
+            self.tls_options = self._read_tls_options(config)
+            self.timeouts = self._read_timeouts(config)
+            self.profiling = self._read_profiling(config)
+            self.monitoring = {
+                "interval": config.getfloat(
+                    "MONITORING", "sample_interval", fallback=5.0
+                ),
+                "history": config.getint(
+                    "MONITORING", "history", fallback=120
+                ),
+                "slow_threshold": config.getfloat(
+                    "MONITORING", "slow_threshold_ms", fallback=100.0
+                ) / 1000,
+                "slow_log_size": config.getint(
+                    "MONITORING", "slow_log_size", fallback=128
+                ),
+                "watchdog_interval": config.getfloat(
+                    "MONITORING", "watchdog_interval", fallback=0.0
+                ),
+                "block_threshold": config.getfloat(
+                    "MONITORING", "block_threshold_ms", fallback=100.0
+                ) / 1000,
+            }
+            # Optional local control socket for live operation
+            self.admin_socket = config.get(
+                "ADMIN", "socket", fallback=None
+            )
+            # Fraction of requests written to the structured request log
+            self.log_sample_rate = config.getfloat(
+                "LOGGING", "sample_rate", fallback=1.0
+            )
+            self.metrics = {
+                "host": config.get("METRICS", "host", fallback="127.0.0.1"),
+                "port": config.getint("METRICS", "port", fallback=None),
+                "report_interval": config.getfloat(
+                    "METRICS", "report_interval", fallback=60.0
+                ),
+                "trace_path": config.get(
+                    "METRICS", "trace_path", fallback=None
+                ),
+                "trace_sample_rate": config.getfloat(
+                    "METRICS", "trace_sample_rate", fallback=0.0
+                ),
+            }
             print(f"DEBUG: file_path={self.file_path}, logfile={self.logfile}")
             # Validate the file path to ensure it exists and is a file
             self.validate_file_path(self.file_path)
         except configparser.Error as e:
             raise ConfigError(f"Failed to read configuration: {e}") from e
 
-    def _read_config(self, config_path: str) -> tuple[str, bool, bool, str]:
-        # Reads the server configuration from the file and extracts required parameters
-        config = configparser.ConfigParser()
-        config.read(config_path)
-
+    def _read_config(
+        self, config: configparser.ConfigParser
+    ) -> tuple[str, bool, bool, str]:
+        # Extracts the required parameters from the parsed configuration
         # Read the log file path with a fallback to /tmp/your_server.log
         try:
             logfile = config["LOGGING"]["logfile"]
@@ -91,6 +352,58 @@ class ServerConfig:
         except (configparser.NoSectionError, configparser.NoOptionError) as e:
             raise ConfigError(f"Configuration error: {e}") from e
 
+    @staticmethod
+    def _read_tls_options(config: configparser.ConfigParser) -> dict:
+        # Reads the optional [TLS] section controlling handshake cost.
+        # Session resumption lets repeat clients skip the full handshake,
+        # either through stateless tickets or the server-side session cache.
+        return {
+            "session_resumption": config.getboolean(
+                "TLS", "session_resumption", fallback=True
+            ),
+            "session_tickets": config.getboolean(
+                "TLS", "session_tickets", fallback=True
+            ),
+            "num_tickets": config.getint("TLS", "num_tickets", fallback=2),
+            "ecdh_curve": config.get("TLS", "ecdh_curve", fallback=None),
+            "ciphers": config.get("TLS", "ciphers", fallback=None),
+            "reload_interval": config.getfloat(
+                "TLS", "reload_interval", fallback=0.0
+            ),
+        }
+
+    @staticmethod
+    def _read_timeouts(config: configparser.ConfigParser) -> dict:
+        # Reads the optional [LIMITS] section with per-connection deadlines
+        # in seconds. A value of 0 disables that deadline.
+        return {
+            "read": config.getfloat("LIMITS", "read_timeout", fallback=10.0),
+            "write": config.getfloat(
+                "LIMITS", "write_timeout", fallback=10.0
+            ),
+            "request": config.getfloat(
+                "LIMITS", "request_timeout", fallback=30.0
+            ),
+            "resolution": config.getfloat(
+                "LIMITS", "timer_resolution", fallback=0.1
+            ),
+        }
+
+    @staticmethod
+    def _read_profiling(config: configparser.ConfigParser) -> dict:
+        # Reads the optional [PROFILING] section for on-demand sampling.
+        return {
+            "output": config.get(
+                "PROFILING", "output", fallback="/tmp/tcpserver.profile"
+            ),
+            "interval": config.getfloat(
+                "PROFILING", "interval", fallback=0.005
+            ),
+            "duration": config.getfloat(
+                "PROFILING", "duration", fallback=30.0
+            ),
+        }
+
     @staticmethod
     def validate_file_path(file_path: str) -> None:
         # Validates the configured file path.
@@ -112,49 +425,297 @@ class AsyncTCPServer:
             port: int,
             file_path: str,
             reread_on_query: bool,
-            use_ssl: bool
+            use_ssl: bool,
+            tls_options: Optional[dict] = None,
+            timeouts: Optional[dict] = None,
+            unix_socket: Optional[str] = None,
+            udp_port: Optional[int] = None,
+            profiling: Optional[dict] = None,
+            metrics: Optional[dict] = None,
+            log_sample_rate: float = 1.0,
+            admin_socket: Optional[str] = None,
+            monitoring: Optional[dict] = None,
+            executor_type: str = "process",
+            workers: Optional[int] = None,
+            lookup_engine: str = "set"
     ) -> None:
         self.host = host
         self.port = port
         self.file_path = file_path
         self.reread_on_query = reread_on_query
         self.use_ssl = use_ssl
+        self.tls_options = tls_options or {}
+        self.timeouts = {"read": 10.0, "write": 10.0, "request": 30.0}
+        self.timeouts.update(timeouts or {})
 
-        # Cache file content in a set
+        # Cache file content in a set (or a HashIndex, see lookup_engine)
         self.file_content: Optional[set] = None
+        if lookup_engine not in LOOKUP_ENGINES:
+            raise ValueError(
+                f"Unknown lookup engine {lookup_engine!r}, "
+                f"expected one of {', '.join(LOOKUP_ENGINES)}"
+            )
+        if lookup_engine == "numpy":
+            try:
+                import numpy  # noqa: F401
+            except ImportError:
+                raise ValueError(
+                    "lookup_engine = numpy needs the numpy package "
+                    "(pip install -r requirements.txt)"
+                ) from None
+        self.lookup_engine = lookup_engine
         self.mmapped_file = None  # Memory-mapped file
+        self.index_info: dict = {}  # Cheap facts about the current index
+        self.index_footprint: Optional[dict] = None  # See index_stats
         self.server = None
 
-        # Initialize a process pool executor for CPU-bound tasks
-        self.executor = ProcessPoolExecutor(
-            max_workers=multiprocessing.cpu_count(),
-            mp_context=multiprocessing.get_context("spawn"),
+        # Local listener that skips the TCP stack (and TLS) entirely
+        self.unix_socket = unix_socket
+        self.unix_server = None
+
+        # Connectionless endpoint answering one query per datagram
+        self.udp_port = udp_port
+        self.udp_transport: Optional[asyncio.DatagramTransport] = None
+
+        # Set by start() once every listener (TCP, Unix, UDP, admin,
+        # metrics) is accepting; cleared again by shutdown()
+        self.ready = asyncio.Event()
+
+        # Current TLS context; swapped in place when certificates rotate
+        self.ssl_context: Optional[ssl.SSLContext] = None
+        self.certificate_stamp = None
+        self.certificate_watcher: Optional[asyncio.Task] = None
+
+        # Executor for lookups (process pool by default; None is inline)
+        self.executor_type = executor_type
+        # Inline lookups run on the event loop, with no workers
+        self.workers = 0 if executor_type == "inline" else (
+            workers or multiprocessing.cpu_count()
         )
+        self.executor = create_executor(executor_type, self.workers)
 
         # Initialize request counters for performance metrics
         self.total_requests = 0
         self.successful_requests = 0
         self.failed_requests = 0
 
+        self.open_connections = 0
+        self.executor_pending = 0  # Lookups submitted but not finished
+        self.log_sample_rate = log_sample_rate  # Share of requests logged
+        self.index_generation = 0  # Incremented on every index load
+
         # Initialize Rate Limiting Attributes
         self.rate_limit = 10  # Requests per second limit per IP address
         self.ip_request_count = {}  # Track request counts per IP
 
+        # Read/write/request deadlines share one timer wheel
+        self.deadlines = TimerWheel(self.timeouts.get("resolution", 0.1))
+        self.deadline_cuts = {"read": 0, "write": 0, "request": 0}
+
+        # Sampling profiler, idle (no thread) until a window is started
+        profiling = profiling or {}
+        self.profiler = SamplingProfiler(
+            output_path=profiling.get("output", "/tmp/tcpserver.profile"),
+            interval=profiling.get("interval", 0.005),
+            duration=profiling.get("duration", 30.0),
+        )
+
+        # Background sampler for process resources and loop lag
+        monitoring = monitoring or {}
+        self.resources = ResourceSampler(
+            interval=monitoring.get("interval", 5.0),
+            history=monitoring.get("history", 120),
+            queue_depth=lambda: self.executor_pending,
+        )
+        self.slow_log = SlowLog(
+            threshold=monitoring.get("slow_threshold", 0.1),
+            size=monitoring.get("slow_log_size", 128),
+        )
+        # Optional blocking-call detector; off unless an interval is set
+        self.watchdog: Optional[LoopWatchdog] = None
+        if monitoring.get("watchdog_interval"):
+            self.watchdog = LoopWatchdog(
+                interval=monitoring["watchdog_interval"],
+                threshold=monitoring.get("block_threshold", 0.1),
+            )
+
+        # Prometheus-style metrics served on a separate HTTP port
+        self.metrics_options = metrics or {}
+        self.metrics_server = None
+        self.metrics = self.create_metrics_registry()
+
+        # Fixed-memory histograms for percentile reporting
+        self.latency = {
+            "end_to_end": LatencyHistogram(),
+            "lookup": LatencyHistogram(),
+        }
+        self.latency_reporter: Optional[asyncio.Task] = None
+
+        # Chrome trace events for a sampled subset of requests
+        self.trace_writer = TraceWriter(
+            self.metrics_options.get("trace_path"),
+            self.metrics_options.get("trace_sample_rate", 0.0),
+        )
+        self.request_sequence = 0
+
+        # Control socket for stats, reloads and live tuning
+        self.admin_socket = admin_socket
+        self.admin = AdminControl(self)
+
+    def create_metrics_registry(self) -> MetricsRegistry:
+        # Counters and gauges read the existing attributes at scrape time;
+        # only the latency histograms are updated per request.
+        registry = MetricsRegistry(prefix="tcpserver_")
+        registry.counter(
+            "requests_total", "Requests received.",
+            lambda: self.total_requests
+        )
+        registry.counter(
+            "requests_successful_total", "Requests answered successfully.",
+            lambda: self.successful_requests
+        )
+        registry.counter(
+            "requests_failed_total", "Requests that raised an error.",
+            lambda: self.failed_requests
+        )
+        for reason in self.deadline_cuts:
+            registry.counter(
+                "deadline_cuts_total", "Connections cut by a deadline.",
+                functools.partial(self.deadline_cuts.get, reason),
+                labels={"reason": reason}
+            )
+        registry.gauge(
+            "open_connections", "Stream connections currently open.",
+            lambda: self.open_connections
+        )
+        registry.gauge(
+            "index_entries", "Distinct lines in the loaded index.",
+            lambda: len(self.file_content) if self.file_content else 0
+        )
+        registry.gauge(
+            "index_generation", "Number of times the index was loaded.",
+            lambda: self.index_generation
+        )
+        for name, key, help_text in (
+            ("index_payload_bytes", "payload_bytes",
+             "Memory held by the index strings."),
+            ("index_structure_bytes", "structure_bytes",
+             "Memory held by the index hash table."),
+            ("index_load_seconds", "load_seconds",
+             "Time taken by the last index load."),
+        ):
+            registry.gauge(
+                name, help_text,
+                lambda key=key: self.index_stats.get(key, 0)
+            )
+        for name, key, help_text in (
+            ("process_rss_bytes", "rss_bytes", "Resident set size."),
+            ("process_cpu_percent", "cpu_percent", "Process CPU usage."),
+            ("process_open_fds", "open_fds", "Open file descriptors."),
+            ("event_loop_lag_seconds", "loop_lag", "Loop scheduling lag."),
+            (
+                "executor_queue_depth", "executor_queue",
+                "Lookups waiting on the executor.",
+            ),
+        ):
+            registry.gauge(
+                name, help_text + " Sampled periodically.",
+                lambda key=key: self.resources.latest.get(key) or 0
+            )
+        registry.counter(
+            "event_loop_stalls_total",
+            "Times the watchdog saw the loop blocked past its threshold.",
+            lambda: self.watchdog.stall_count if self.watchdog else 0
+        )
+        self.stage_latency = {
+            stage: registry.histogram(
+                "stage_latency_seconds", "Request latency by stage.",
+                labels={"stage": stage}
+            )
+            for stage in STAGES + ("total",)
+        }
+        return registry
+
+    def log_latency_report(
+        self, title: str, since: Optional[dict] = None
+    ) -> None:
+        # Logs p50/p90/p99/p99.9 per histogram, optionally only for the
+        # values recorded after the `since` snapshots.
+        for name, histogram in self.latency.items():
+            previous = since.get(name) if since else None
+            values = histogram.percentiles(
+                (50, 90, 99, 99.9), since=previous
+            )
+            count = histogram.count - (sum(previous) if previous else 0)
+            logger.info(
+                f"{title} latency [{name}] n={count} "
+                + " ".join(
+                    f"p{q:g}={ns / 1000:.1f}us" for q, ns in values.items()
+                )
+            )
+
+    async def report_latency_periodically(self, interval: float) -> None:
+        # Logs the percentiles of each interval; costs O(buckets) per
+        # interval and nothing per request.
+        snapshots = {
+            name: h.snapshot() for name, h in self.latency.items()
+        }
+        while True:
+            await asyncio.sleep(interval)
+            current = {
+                name: h.snapshot() for name, h in self.latency.items()
+            }
+            self.log_latency_report("Interval", since=snapshots)
+            snapshots = current
+
+    @property
+    def index_stats(self) -> dict:
+        # Footprint and load facts of the current index. The footprint is
+        # measured on first use after each load and then cached.
+        if not self.index_info:
+            return {}
+        if self.index_footprint is None or \
+                self.index_footprint["generation"] != self.index_generation:
+            self.index_footprint = dict(
+                measure_index(self.file_content, self.index_info["lines"]),
+                generation=self.index_generation,
+            )
+        return dict(self.index_footprint, **self.index_info)
+
     async def load_file_content(self) -> None:
         # Load the file content into memory using mmap.
         if not os.path.exists(self.file_path):
             raise FileError(f"File does not exist: {self.file_path}")
 
         try:
+            started = time.perf_counter()
             # Open the file and memory-map it
             with open(self.file_path, "r+b") as f:
+                stat = os.fstat(f.fileno())
                 self.mmapped_file = mmap.mmap(
                         f.fileno(), 0, access=mmap.ACCESS_READ
                     )
                 contents = self.mmapped_file.read().\
                     decode("utf-8").splitlines()
                 # Cache file content in a set
-                self.file_content = set(contents)
+                if self.lookup_engine == "numpy":
+                    from batch_lookup import HashIndex
+                    self.file_content = HashIndex(contents)
+                else:
+                    self.file_content = set(contents)
+                self.index_generation += 1
+            # Measuring the footprint walks every entry, so it is left to
+            # index_stats; reloads on every query would pay for it
+            self.index_footprint = None
+            self.index_info = dict(
+                lines=len(contents),
+                load_seconds=round(time.perf_counter() - started, 6),
+                mapped_bytes=len(self.mmapped_file),
+                file_size=stat.st_size,
+                file_mtime=stat.st_mtime,
+                generation=self.index_generation,
+            )
+            logger.debug("Index loaded", extra={"fields": self.index_info})
 
             if not self.file_content:
                 raise FileError(f"File is empty: {self.file_path}")
@@ -164,140 +725,322 @@ class AsyncTCPServer:
                 f"Failed to load file content from {self.file_path}: {e}")
             raise
 
-    def sanitize_query(self, query: str) -> str:
-        # Sanitizes the query to prevent command injection.
-        sanitized_query = re.sub(r"[;&|><`$\\]", "", query)
-        return sanitized_query
+    def cut_connection(
+        self, writer: asyncio.StreamWriter, reason: str
+    ) -> None:
+        # Aborts a connection whose read, write or request deadline expired.
+        if not writer.is_closing():
+            self.deadline_cuts[reason] += 1
+            logger.warning(
+                f"Closing {writer.get_extra_info('peername')}: "
+                f"{reason} deadline exceeded"
+            )
+            writer.transport.abort()
 
-    async def handle_client(
+    async def read_request(
         self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
-    ) -> None:
+    ) -> bytes:
+        # Reads one request, bounded by the read deadline.
+        key = self.deadlines.schedule(
+            self.timeouts["read"], lambda: self.cut_connection(writer, "read")
+        )
+        try:
+            return await reader.read(1024)
+        finally:
+            self.deadlines.cancel(key)
 
-        # Handles communication with a single client.
-        pr = cProfile.Profile()
-        pr.enable()
+    async def write_response(
+        self, writer: asyncio.StreamWriter, message: str
+    ) -> None:
+        # Writes a response, bounding drain() by the write deadline.
+        writer.write(message.encode("utf-8"))
+        if not writer.transport.get_write_buffer_size():
+            return  # Everything was sent, drain() would not block
+        key = self.deadlines.schedule(
+            self.timeouts["write"],
+            lambda: self.cut_connection(writer, "write")
+        )
+        try:
+            await writer.drain()
+        finally:
+            self.deadlines.cancel(key)
 
+    @staticmethod
+    def get_client_key(writer: asyncio.StreamWriter) -> str:
+        # Returns the key used for rate limiting: the peer IP for TCP, and
+        # the peer's uid (from SO_PEERCRED) for Unix socket clients, whose
+        # peername is empty.
         peername = writer.get_extra_info("peername")
-        client_ip = peername[0]
-        logger.info(f"Client connected: {peername}")
-        start_time = time.time()
-
-        # Implement rate limiting per client IP
-        if client_ip not in self.ip_request_count:
-            self.ip_request_count[client_ip] = []
+        if isinstance(peername, tuple):
+            return peername[0]
+        sock = writer.get_extra_info("socket")
+        try:
+            credentials = sock.getsockopt(
+                socket.SOL_SOCKET,
+                socket.SO_PEERCRED,
+                struct.calcsize("3i")
+            )
+        except (AttributeError, OSError):
+            return "unix"
+        _, uid, _ = struct.unpack("3i", credentials)
+        return f"uid:{uid}"
+
+    def is_rate_limited(self, client_key: str) -> bool:
+        # Sliding one-second window per client. Records the request and
+        # returns False when the client is still under the limit.
+        if client_key not in self.ip_request_count:
+            self.ip_request_count[client_key] = []
         now = time.time()
 
         # Remove timestamps older than one second from the list.
-        self.ip_request_count[client_ip] = [
-            t for t in self.ip_request_count[client_ip] if now - t < 1
+        self.ip_request_count[client_key] = [
+            t for t in self.ip_request_count[client_key] if now - t < 1
         ]
 
-        if len(self.ip_request_count[client_ip]) >= self.rate_limit:
-            logger.warning(f"Rate limit exceeded for IP: {client_ip}")
-            writer.write(
-                "Rate limit exceeded. Please try again later.\n".
-                encode("utf-8")
+        if len(self.ip_request_count[client_key]) >= self.rate_limit:
+            return True
+
+        # Record the current request timestamp for this client.
+        self.ip_request_count[client_key].append(now)
+        return False
+
+    def answer_datagram(self, data: bytes, client_ip: str) -> str:
+        # Answers a UDP query. The lookup runs inline: a set membership
+        # test is far cheaper than the executor hop for one short string.
+        if self.is_rate_limited(client_ip):
+            return "Rate limit exceeded. Please try again later."
+        self.total_requests += 1
+        if len(data) > 1024:
+            return "Request too large. Please limit your request size."
+        try:
+            sanitized_query = self.sanitize_query(
+                data.decode("utf-8").strip()
             )
-            await writer.drain()
+            if not sanitized_query:
+                return "Invalid query received."
+            if self.file_content is None:
+                raise ServerError("File content is not loaded.")
+            response = query_in_file(sanitized_query, self.file_content)
+        except Exception as e:
+            self.failed_requests += 1
+            logger.error(f"Unexpected error answering {client_ip}: {e}")
+            return "An internal server error occurred."
+        self.successful_requests += 1
+        return response
+
+    def sanitize_query(self, query: str) -> str:
+        # Sanitizes the query to prevent command injection.
+        sanitized_query = re.sub(r"[;&|><`$\\]", "", query)
+        return sanitized_query
+
+    async def handle_client(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+
+        # Handles communication with a single client. A query without a
+        # trailing newline is answered and the connection closed. A
+        # newline-terminated query switches the connection to keep-alive:
+        # every further line is answered in order until the client closes
+        # or stays idle past the read deadline.
+        self.open_connections += 1
+        peername = writer.get_extra_info("peername")
+        client_ip = self.get_client_key(writer)
+        try:
+            buffer = await self.serve_request(
+                reader, writer, peername, client_ip, None
+            )
+            while buffer is not None and not writer.is_closing():
+                # Wait for the next complete line outside request timings
+                while b"\n" not in buffer and len(buffer) <= 1024:
+                    chunk = await self.read_request(reader, writer)
+                    if not chunk:
+                        return  # Client closed or went idle
+                    buffer += chunk
+                buffer = await self.serve_request(
+                    reader, writer, peername, client_ip, buffer
+                )
+        finally:
+            self.open_connections -= 1
             writer.close()
             await writer.wait_closed()
-            return
 
-        # Record the current request timestamp for this IP address.
-        self.ip_request_count[client_ip].append(now)
+    async def serve_request(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        peername,
+        client_ip,
+        buffer: Optional[bytes]
+    ) -> Optional[bytes]:
+        # Answers one query, read from the client unless `buffer` already
+        # holds it. Returns the bytes following a newline-terminated query
+        # (keep the connection open) or None (close it).
+        timings = RequestTimings()
+        request_deadline = self.deadlines.schedule(
+            self.timeouts["request"],
+            lambda: self.cut_connection(writer, "request")
+        )
+        status = "ok"
+        sanitized_query = None
+        remaining = None
+
+        # Implement rate limiting per client IP
+        rate_limited = self.is_rate_limited(client_ip)
+        timings.mark("rate_limit")
+        if rate_limited:
+            try:
+                await self.write_response(
+                    writer, "Rate limit exceeded. Please try again later.\n"
+                )
+            finally:
+                self.deadlines.cancel(request_deadline)
+                self.log_request(
+                    peername, None, "rate_limited",
+                    time.perf_counter() - timings.started
+                )
+            return None
 
         # Read data from the client
         try:
             self.total_requests += 1  # Increment total request counter
 
-            data = await reader.read(1024)
+            if buffer is None:
+                data = await self.read_request(reader, writer)
+            else:
+                data = buffer
+            timings.mark("read")
+            if writer.is_closing():
+                status = "cut"
+                return None  # Cut by a deadline while waiting for the query
+            if b"\n" in data:
+                data, _, remaining = data.partition(b"\n")
             if len(data) > 1024:
-                writer.write(
-                    "Request too large. Please limit your request size.\n".
-                    encode("utf-8")
+                status = "too_large"
+                remaining = None
+                await self.write_response(
+                    writer,
+                    "Request too large. Please limit your request size.\n"
                 )
-                await writer.drain()
-                return
+                return None
 
             query = data.decode("utf-8").strip()
 
             # Sanitize the query input before processing it.
             sanitized_query = self.sanitize_query(query)
+            timings.mark("sanitize")
 
             if not sanitized_query:
-                writer.write("Invalid query received.\n".encode("utf-8"))
-                await writer.drain()
-                return
-
-            logger.info(f"Request from client {peername}: {sanitized_query}")
-
-            start_time_measurement = time.perf_counter()
+                status = "invalid"
+                await self.write_response(
+                    writer, "Invalid query received.\n"
+                )
+                return remaining
 
             if self.reread_on_query:
-                logger.debug(
-                    f"DEBUG: Rereading file content for {peername} "
-                    f"as reread_on_query is True."
-                )
                 await self.load_file_content()
-                file_set = self.file_content
-            else:
-                logger.debug(
-                    f"DEBUG: Using cached file content for {peername} "
-                    f"as reread_on_query is False."
-                )
-                file_set = self.file_content
+                timings.mark("reload")
+            file_set = self.file_content
 
-            response = await asyncio.get_event_loop().run_in_executor(
-                self.executor, query_in_file, sanitized_query, file_set
-            )
-
-            writer.write((response + "\n").encode("utf-8"))
-            await writer.drain()
+            if self.executor is None:
+                response = query_in_file(sanitized_query, file_set)
+            else:
+                self.executor_pending += 1
+                try:
+                    response = await asyncio.get_event_loop(
+                    ).run_in_executor(
+                        self.executor, query_in_file, sanitized_query,
+                        file_set
+                    )
+                finally:
+                    self.executor_pending -= 1
+            timings.mark("lookup")
 
-            end_time_measurement = time.perf_counter()
-            response_time_measurement = \
-                end_time_measurement - start_time_measurement
-            logger.info(
-                f"Response Time: {response_time_measurement:.4f} seconds"
-            )
+            await self.write_response(writer, response + "\n")
+            timings.mark("write")
             # Increment successful request counter
             self.successful_requests += 1
-            logger.info(f"Response sent to client: {peername}")
-            logger.info(f"Connection closed for client: {peername}")
-
-            execution_time_total = time.time() - start_time
-            logger.debug(
-                f"DEBUG: Client IP: {client_ip}, "
-                f"Total Execution Time: {execution_time_total:.4f} seconds"
-            )
 
         except Exception as e:
+            status = "error"
+            remaining = None
             self.failed_requests += 1  # Increment failed request counter
             logger.error(
-                f"Unexpected error handling client {peername}: {e}",
+                "Unexpected error handling client %s: %s", peername, e,
                 exc_info=True
             )
-            # Generic error message
-            writer.write(
-                "An internal server error occurred.\n".encode("utf-8")
-            )
-            await writer.drain()
+            # Generic error message, unless a deadline already cut it
+            if not writer.is_closing():
+                await self.write_response(
+                    writer, "An internal server error occurred.\n"
+                )
 
         finally:
-            writer.close()
-            await writer.wait_closed()
-            pr.disable()
-            stats = pstats.Stats(pr)
-            stats.sort_stats("tottime").print_stats(10)
-            memory_info = psutil.virtual_memory()
-            cpu_usage = psutil.cpu_percent(interval=1)
-            logger.info(f"Memory Usage: {memory_info.percent}%")
-            logger.info(f"CPU Usage: {cpu_usage}%")
-            logger.info(
-                f"Total Requests: {self.total_requests}, "
-                f"Successful Requests: {self.successful_requests}, "
-                f"Failed Requests: {self.failed_requests}"
+            self.deadlines.cancel(request_deadline)
+            elapsed = time.perf_counter() - timings.started
+            stages = self.record_timings(timings, elapsed, status)
+            self.slow_log.maybe_record(
+                elapsed, stages, sanitized_query, peername, status,
+                self.index_generation
+            )
+            self.log_request(
+                peername, sanitized_query, status, elapsed,
+                stages.get("lookup")
             )
+        return remaining
+
+    def record_timings(
+        self, timings: RequestTimings, elapsed: float, status: str
+    ) -> dict:
+        # Feeds one request's stage durations into the histograms and,
+        # for sampled requests, the trace. Returns {stage: seconds}.
+        stages = timings.durations()
+        for stage, duration in stages.items():
+            self.stage_latency[stage].observe(duration)
+        self.stage_latency["total"].observe(elapsed)
+        self.latency["end_to_end"].record(int(elapsed * 1e9))
+        if "lookup" in stages:
+            self.latency["lookup"].record(int(stages["lookup"] * 1e9))
+
+        self.request_sequence += 1
+        if self.trace_writer.sampled():
+            if self.trace_writer.add(
+                self.request_sequence, timings, status=status
+            ):
+                asyncio.get_running_loop().run_in_executor(
+                    None, self.trace_writer.flush
+                )
+        return stages
+
+    def log_request(
+        self,
+        peername,
+        query: Optional[str],
+        status: str,
+        elapsed: float,
+        lookup_time: Optional[float] = None
+    ) -> None:
+        # Emits one structured line per request for a sampled fraction of
+        # requests. Nothing is formatted for requests that are not sampled;
+        # formatting and file I/O happen on the logging thread.
+        if self.log_sample_rate < 1.0 and \
+                random.random() >= self.log_sample_rate:
+            return
+        fields = {
+            "event": "request",
+            "peer": str(peername),
+            "query": query,
+            "status": status,
+            "total_ms": round(elapsed * 1000, 3),
+            "lookup_ms": (
+                round(lookup_time * 1000, 3)
+                if lookup_time is not None else None
+            ),
+            "index_generation": self.index_generation,
+            "total_requests": self.total_requests,
+            "successful_requests": self.successful_requests,
+            "failed_requests": self.failed_requests,
+        }
+        logger.info("request", extra={"fields": fields})
 
     async def start(self) -> None:
         # Starts the asynchronous server.
@@ -308,7 +1051,15 @@ class AsyncTCPServer:
                 await self.load_file_content()
                 logger.info("File content loaded at startup.")
 
-            ssl_context = self.create_ssl_context() if self.use_ssl else None
+            if self.use_ssl:
+                self.ssl_context = self.create_ssl_context()
+                self.certificate_stamp = self.get_certificate_stamp()
+                reload_interval = self.tls_options.get("reload_interval", 0)
+                if reload_interval > 0:
+                    self.certificate_watcher = asyncio.create_task(
+                        self.watch_certificates(reload_interval)
+                    )
+            ssl_context = self.ssl_context
             logger.info(
                 "Creating SSL context..."
                 if self.use_ssl
@@ -320,10 +1071,59 @@ class AsyncTCPServer:
                 port=self.port,
                 reuse_address=True,
                 ssl=ssl_context,
+                ssl_handshake_timeout=(
+                    self.timeouts["read"] or None if ssl_context else None
+                ),
             )
 
             addr = self.server.sockets[0].getsockname()
             logger.info(f"Server started on {addr}")
+
+            if self.unix_socket:
+                # Remove a stale socket left behind by an unclean exit
+                if os.path.exists(self.unix_socket):
+                    os.remove(self.unix_socket)
+                self.unix_server = await asyncio.start_unix_server(
+                    self.handle_client, path=self.unix_socket
+                )
+                logger.info(f"Listening on Unix socket {self.unix_socket}")
+
+            if self.metrics_options.get("port") is not None:
+                self.metrics_server = await asyncio.start_server(
+                    functools.partial(handle_metrics_request, self.metrics),
+                    host=self.metrics_options.get("host", "127.0.0.1"),
+                    port=self.metrics_options["port"],
+                    reuse_address=True,
+                )
+                logger.info(
+                    "Metrics available on "
+                    f"{self.metrics_server.sockets[0].getsockname()}/metrics"
+                )
+
+            report_interval = self.metrics_options.get("report_interval", 0)
+            if report_interval and report_interval > 0:
+                self.latency_reporter = asyncio.create_task(
+                    self.report_latency_periodically(report_interval)
+                )
+
+            self.resources.start()
+            if self.watchdog:
+                self.watchdog.start()
+
+            if self.admin_socket:
+                await self.admin.start(self.admin_socket)
+
+            if self.udp_port is not None:
+                loop = asyncio.get_running_loop()
+                self.udp_transport, _ = await loop.create_datagram_endpoint(
+                    lambda: QueryDatagramProtocol(self),
+                    local_addr=(self.host, self.udp_port),
+                )
+                logger.info(
+                    "Listening for UDP queries on "
+                    f"{self.udp_transport.get_extra_info('sockname')}"
+                )
+            self.ready.set()
             async with self.server:
                 logger.info("Server is running...")
                 await self.server.serve_forever()
@@ -337,12 +1137,34 @@ class AsyncTCPServer:
     async def shutdown(self) -> None:
         # Gracefully shuts down the server.
         logger.info("Shutting down server...")
+        self.ready.clear()
+        if self.certificate_watcher:
+            self.certificate_watcher.cancel()
+        self.profiler.stop()
+        self.resources.stop()
+        if self.watchdog:
+            self.watchdog.stop()
+        if self.latency_reporter:
+            self.latency_reporter.cancel()
+        await self.admin.close()
+        if self.metrics_server:
+            self.metrics_server.close()
+            await self.metrics_server.wait_closed()
+        if self.udp_transport:
+            self.udp_transport.close()
+        if self.unix_server:
+            self.unix_server.close()
+            await self.unix_server.wait_closed()
+            if os.path.exists(self.unix_socket):
+                os.remove(self.unix_socket)
         if self.server:
             self.server.close()
             await self.server.wait_closed()
+        self.deadlines.stop()
         logger.info("Server connections closed.")
-        logger.info("Shutting down executor...")
-        self.executor.shutdown(wait=True)
+        if self.executor is not None:
+            logger.info("Shutting down executor...")
+            self.executor.shutdown(wait=True)
         logger.info("Executor shut down successfully.")
         logger.info("Server shut down successfully.")
 
@@ -355,6 +1177,9 @@ class AsyncTCPServer:
         logger.info(f"Final Total Requests: {self.total_requests}")
         logger.info(f"Final Successful Requests: {self.successful_requests}")
         logger.info(f"Final Failed Requests: {self.failed_requests}")
+        logger.info(f"Connections cut by deadlines: {self.deadline_cuts}")
+        self.log_latency_report("Final")
+        self.trace_writer.flush()
 
     async def my_async_function():
         # Your async code here
@@ -382,8 +1207,105 @@ class AsyncTCPServer:
 
         context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
         context.load_cert_chain(certfile=cert_path, keyfile=key_path)
+        self.apply_tls_options(context)
+        context.sni_callback = self.select_ssl_context
         return context
 
+    def select_ssl_context(
+        self,
+        ssl_object: ssl.SSLObject,
+        server_name: Optional[str],
+        context: ssl.SSLContext,
+    ) -> None:
+        # Runs on every ClientHello. The listener keeps the context it was
+        # started with, so new handshakes are moved onto the latest one.
+        if self.ssl_context is not None and context is not self.ssl_context:
+            ssl_object.context = self.ssl_context
+
+    def reload_ssl_context(self) -> bool:
+        # Rebuilds the SSL context from CERT_PATH/KEY_PATH. Only new
+        # connections use it; established sessions keep their context.
+        try:
+            context = self.create_ssl_context()
+        except (OSError, ValueError, ssl.SSLError) as e:
+            logger.error(f"Certificate reload failed, keeping old one: {e}")
+            return False
+        self.ssl_context = context
+        self.certificate_stamp = self.get_certificate_stamp()
+        logger.info("SSL context reloaded.")
+        return True
+
+    @staticmethod
+    def get_certificate_stamp() -> Optional[tuple]:
+        # Returns (mtime, size) of the certificate and key files.
+        try:
+            return tuple(
+                (st.st_mtime_ns, st.st_size)
+                for st in (
+                    os.stat(os.environ["CERT_PATH"]),
+                    os.stat(os.environ["KEY_PATH"]),
+                )
+            )
+        except (KeyError, OSError):
+            return None
+
+    async def watch_certificates(self, interval: float) -> None:
+        # Polls the certificate files and reloads them when they change.
+        while True:
+            await asyncio.sleep(interval)
+            stamp = self.get_certificate_stamp()
+            if stamp is not None and stamp != self.certificate_stamp:
+                logger.info("Certificate files changed, reloading...")
+                self.reload_ssl_context()
+
+    def apply_tls_options(self, context: ssl.SSLContext) -> None:
+        # Applies session resumption, curve and cipher preferences.
+        options = self.tls_options
+        if not options.get("session_resumption", True):
+            # No tickets and no cached sessions: every handshake is full.
+            # Python cannot switch off TLS 1.2's session-ID cache, so
+            # require TLS 1.3, where tickets are the only way to resume.
+            context.options |= ssl.OP_NO_TICKET
+            context.num_tickets = 0
+            context.minimum_version = ssl.TLSVersion.TLSv1_3
+        elif not options.get("session_tickets", True):
+            # Stateful resumption from the server-side session cache only.
+            context.options |= ssl.OP_NO_TICKET
+        else:
+            context.options &= ~ssl.OP_NO_TICKET
+            context.num_tickets = options.get("num_tickets", 2)
+
+        if options.get("ecdh_curve"):
+            context.set_ecdh_curve(options["ecdh_curve"])
+        if options.get("ciphers"):
+            # Only affects TLS 1.2 and below; TLS 1.3 suites are fixed.
+            context.set_ciphers(options["ciphers"])
+
+
+def create_server(
+    config: ServerConfig, host: str = "0.0.0.0", port: int = 44445
+) -> AsyncTCPServer:
+    # Builds an AsyncTCPServer from a loaded ServerConfig.
+    return AsyncTCPServer(
+        host=host,
+        port=port,
+        file_path=config.file_path,
+        reread_on_query=config.reread_on_query,
+        use_ssl=config.use_ssl,
+        tls_options=config.tls_options,
+        timeouts=config.timeouts,
+        unix_socket=config.unix_socket,
+        udp_port=config.udp_port,
+        profiling=config.profiling,
+        metrics=config.metrics,
+        log_sample_rate=config.log_sample_rate,
+        admin_socket=config.admin_socket,
+        monitoring=config.monitoring,
+        executor_type=config.executor_type,
+        workers=config.workers,
+        lookup_engine=config.lookup_engine,
+    )
+
 
 class Daemon:
     def __init__(self, pidfile, logfile=None):
@@ -502,13 +1424,7 @@ class ServerDaemon(Daemon):
                     "CONFIG_PATH environment variable must be set."
                 )
             config = ServerConfig(config_path)
-            self.server = AsyncTCPServer(
-                host="0.0.0.0",
-                port="44445",
-                file_path=config.file_path,
-                reread_on_query=config.reread_on_query,
-                use_ssl=config.use_ssl,
-            )
+            self.server = create_server(config)
 
             if not self.server.reread_on_query:
                 asyncio.run(self.server.load_file_content())
@@ -522,6 +1438,14 @@ class ServerDaemon(Daemon):
                 signal.SIGTERM,
                 lambda: asyncio.create_task(self.server.shutdown())
             )
+            # Certificate rotation without dropping connections or caches
+            loop.add_signal_handler(
+                signal.SIGHUP, self.server.reload_ssl_context
+            )
+            # Start or stop a sampling profiler window on the loop thread
+            loop.add_signal_handler(
+                signal.SIGUSR1, self.server.profiler.toggle
+            )
             loop.run_until_complete(self.server.start())
 
         except Exception as e:
@@ -569,13 +1493,7 @@ if __name__ == "__main__":
                     "CONFIG_PATH environment variable must be set."
                 )
             config = ServerConfig(config_path)
-            server = AsyncTCPServer(
-                host="0.0.0.0",
-                port="44445",
-                file_path=config.file_path,
-                reread_on_query=config.reread_on_query,
-                use_ssl=config.use_ssl,
-            )
+            server = create_server(config)
 
             if not server.reread_on_query:
                 asyncio.run(server.load_file_content())
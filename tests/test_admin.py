@@ -0,0 +1,84 @@
+import asyncio
+import socket
+from admin import send_command
+from harness import running_server
+from server import AsyncTCPServer
+
+
+def test_admin_commands(tmp_path) -> None:
+    # Tests stats, live tuning and reload through the admin socket.
+    data_file = tmp_path / "test_file.txt"
+    data_file.write_text("line1\n")
+    admin_path = str(tmp_path / "admin.sock")
+    server = AsyncTCPServer(
+        host="127.0.0.1",
+        port=0,
+        file_path=str(data_file),
+        reread_on_query=False,
+        use_ssl=False,
+        admin_socket=admin_path,
+    )
+    with running_server(server) as (host, port):
+        with socket.create_connection((host, port), timeout=30) as sock:
+            sock.sendall(b"line1")
+            sock.recv(1024)
+
+        stats = send_command(admin_path, "stats")
+        assert stats["ok"]
+        assert stats["successful_requests"] == 1
+        assert stats["index_entries"] == 1
+
+        index = send_command(admin_path, "index")
+        assert index["entries"] == 1
+        assert index["file_size"] == len("line1\n")
+        assert index["total_bytes"] == (
+            index["payload_bytes"] + index["structure_bytes"]
+        )
+        assert index["generation"] == server.index_generation
+
+        reply = send_command(admin_path, "set rate_limit 50")
+        assert reply == {
+            "ok": True, "setting": "rate_limit", "previous": 10, "value": 50
+        }
+        assert server.rate_limit == 50
+        assert send_command(admin_path, "set read_timeout 2.5")["ok"]
+        assert server.timeouts["read"] == 2.5
+        assert send_command(admin_path, "settings")["log_sample_rate"] == 1.0
+
+        assert not send_command(admin_path, "set log_sample_rate 2")["ok"]
+        assert not send_command(admin_path, "set nothing 1")["ok"]
+        assert not send_command(admin_path, "bogus")["ok"]
+
+        assert send_command(admin_path, "set slow_threshold_ms 0.001")["ok"]
+        with socket.create_connection((host, port), timeout=30) as sock:
+            sock.sendall(b"line1")
+            sock.recv(1024)
+        slowlog = send_command(admin_path, "slowlog 5")
+        assert slowlog["recorded"] >= 1
+        assert slowlog["entries"][-1]["query"] == "line1"
+        assert "lookup" in slowlog["entries"][-1]["stages_ms"]
+
+        data_file.write_text("line1\nline2\n")
+        assert send_command(admin_path, "reload")["index_generation"] == 2
+        assert "line2" in server.file_content
+
+
+def test_index_footprint_is_measured_on_demand(tmp_path) -> None:
+    # Tests that loads skip the footprint pass until stats are requested.
+    data_file = tmp_path / "test_file.txt"
+    data_file.write_text("line1\nline2\n")
+    server = AsyncTCPServer(
+        host="127.0.0.1",
+        port=0,
+        file_path=str(data_file),
+        reread_on_query=False,
+        use_ssl=False,
+    )
+    asyncio.run(server.load_file_content())
+    assert server.index_footprint is None
+    assert server.index_stats["entries"] == 2
+    assert server.index_footprint is not None
+
+    asyncio.run(server.load_file_content())
+    assert server.index_footprint is None
+    assert server.index_stats["generation"] == 2
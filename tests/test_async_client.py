@@ -0,0 +1,105 @@
+import asyncio
+import ssl
+import pytest
+from async_client import AsyncSearchClient, QueryError, parse_reply
+from harness import make_server, running_server, use_bundled_certificates
+
+
+def test_pipelined_lookups_share_one_connection(tmp_path) -> None:
+    # Tests that concurrent lookups are pipelined in order on one socket.
+    queries = ["line1", "missing", "line2"] * 20
+
+    async def run(host, port):
+        async with AsyncSearchClient(
+            host, port, max_connections=1, pipeline_depth=8
+        ) as client:
+            found = await client.contains_many(queries)
+            assert await client.lookup("line2") == "Query 'line2' EXISTS"
+            return found, client.stats()
+
+    data_file = tmp_path / "test_file.txt"
+    data_file.write_text("line1\nline2\n")
+    server = make_server(data_file, executor_type="inline")
+    with running_server(server) as (host, port):
+        found, stats = asyncio.run(run(host, port))
+    assert found == [True, False, True] * 20
+    assert stats == {"connections": 1, "in_flight": 0, "connects": 1}
+    assert server.successful_requests == 61
+
+
+def test_pool_reconnects_after_idle_close(tmp_path) -> None:
+    # Tests that a connection closed by the server's read deadline is
+    # replaced transparently.
+    async def run(host, port):
+        async with AsyncSearchClient(host, port, idle_timeout=60) as client:
+            assert await client.contains("line1")
+            await asyncio.sleep(0.5)
+            assert not await client.contains("line3")
+            return client.connects
+
+    data_file = tmp_path / "test_file.txt"
+    data_file.write_text("line1\nline2\n")
+    server = make_server(data_file, executor_type="inline")
+    server.timeouts["read"] = 0.1
+    with running_server(server) as (host, port):
+        assert asyncio.run(run(host, port)) == 2
+
+
+def test_tls_lookups(tmp_path) -> None:
+    # Tests lookups over TLS connections sharing one context.
+    use_bundled_certificates()
+    # The bundled certificate is self-signed and expired
+    context = ssl.create_default_context()
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE
+
+    async def run(host, port):
+        async with AsyncSearchClient(
+            host, port, ssl_context=context, max_connections=2
+        ) as client:
+            found = await client.contains_many(["line1", "nope"] * 5)
+            return found, client.stats()["connects"]
+
+    data_file = tmp_path / "test_file.txt"
+    data_file.write_text("line1\nline2\n")
+    server = make_server(
+        data_file, use_ssl=True, executor_type="inline"
+    )
+    with running_server(server) as (host, port):
+        found, connects = asyncio.run(run(host, port))
+    assert found == [True, False] * 5
+    assert connects == 2
+
+
+def test_request_timeout_discards_connection() -> None:
+    # Tests that an unanswered query times out and drops its connection.
+    async def run():
+        silent = await asyncio.start_server(
+            lambda reader, writer: None, "127.0.0.1", 0
+        )
+        host, port = silent.sockets[0].getsockname()[:2]
+        async with AsyncSearchClient(
+            host, port, request_timeout=0.2
+        ) as client:
+            with pytest.raises(asyncio.TimeoutError):
+                await client.lookup("line1")
+            assert client.stats()["connections"] == 0
+        silent.close()
+
+    asyncio.run(run())
+
+
+def test_query_validation_and_replies() -> None:
+    # Tests framing checks and reply parsing.
+    async def run():
+        client = AsyncSearchClient()
+        with pytest.raises(ValueError):
+            await client.lookup("two\nlines")
+        with pytest.raises(ValueError):
+            await client.lookup("x" * 1025)
+
+    asyncio.run(run())
+    assert parse_reply("Query 'a' EXISTS") is True
+    assert parse_reply("Query 'a' NOT FOUND") is False
+    with pytest.raises(QueryError):
+        parse_reply("Invalid query received.")
@@ -0,0 +1,74 @@
+import socket
+import sys
+import numpy as np
+import pytest
+import batch_lookup
+from batch_lookup import HashIndex, query_batch
+from harness import running_server
+from server import AsyncTCPServer
+
+
+def test_contains_batch() -> None:
+    # Tests batch membership for hits, misses and duplicate lines.
+    index = HashIndex(["alpha", "beta", "gamma", "beta", "日本語"])
+    found = index.contains_batch(["beta", "delta", "日本語", "", "alpha"])
+    assert found.dtype == bool
+    assert found.tolist() == [True, False, True, False, True]
+    assert len(index) == 4
+    assert sorted(index) == ["alpha", "beta", "gamma", "日本語"]
+    assert "gamma" in index and "omega" not in index
+    assert index.contains_batch([]).tolist() == []
+
+
+def test_digest_collisions_are_verified(monkeypatch) -> None:
+    # Tests that lines sharing a digest are told apart by the stored text.
+    monkeypatch.setattr(batch_lookup, "line_hash", lambda line: len(line))
+    index = HashIndex(["aa", "bb", "cc", "d"])
+    assert np.all(np.diff(index.hashes.astype(np.int64)) >= 0)
+    found = index.contains_batch(["cc", "zz", "d", "e", "aaa"])
+    assert found.tolist() == [True, False, True, False, False]
+
+
+def test_query_batch_replies() -> None:
+    # Tests that replies match query_in_file's format.
+    index = HashIndex(["line1"])
+    assert query_batch(["line1 ", "line2"], index) == [
+        "Query 'line1 ' EXISTS",
+        "Query 'line2' NOT FOUND",
+    ]
+
+
+def test_server_numpy_engine(tmp_path) -> None:
+    # Tests that the server answers queries from a HashIndex.
+    data_file = tmp_path / "test_file.txt"
+    data_file.write_text("line1\nline2\n")
+    server = AsyncTCPServer(
+        host="127.0.0.1",
+        port=0,
+        file_path=str(data_file),
+        reread_on_query=False,
+        use_ssl=False,
+        executor_type="inline",
+        lookup_engine="numpy",
+    )
+    with running_server(server) as (host, port):
+        assert isinstance(server.file_content, HashIndex)
+        for query, reply in ((b"line2", b"EXISTS"), (b"line3", b"NOT FOUND")):
+            with socket.create_connection((host, port), timeout=30) as sock:
+                sock.sendall(query)
+                assert sock.recv(1024).rstrip().endswith(reply)
+    with pytest.raises(ValueError):
+        AsyncTCPServer(
+            host="127.0.0.1", port=0, file_path=str(data_file),
+            reread_on_query=False, use_ssl=False, lookup_engine="bloom",
+        )
+
+
+def test_numpy_engine_requires_numpy(tmp_path, monkeypatch) -> None:
+    # Tests that a missing numpy is reported when the server is created.
+    monkeypatch.setitem(sys.modules, "numpy", None)
+    with pytest.raises(ValueError, match="numpy"):
+        AsyncTCPServer(
+            host="127.0.0.1", port=0, file_path=str(tmp_path / "data.txt"),
+            reread_on_query=False, use_ssl=False, lookup_engine="numpy",
+        )
@@ -6,6 +6,9 @@ from benchmark_file_search import (
     binary_search,
     hash_based_search,
     benchmark_search,
+    build_trie,
+    trie_lookup,
+    run_benchmarks,
 )
 
 
@@ -56,3 +59,32 @@ def test_benchmark_search():
         time_taken = benchmark_search(linear_search, file_path, query)
 
         assert time_taken >= 0
+
+
+def test_trie_lookup_matches_whole_lines():
+    # Test that a prefix of a stored line is not reported as a match.
+    trie = build_trie(["line-12", "line-3"])
+    assert trie_lookup(trie, "line-12") is True
+    assert trie_lookup(trie, "line-1") is False
+    assert trie_lookup(trie, "line-4") is False
+
+
+def test_run_benchmarks_reports_each_algorithm():
+    # Test that every algorithm gets build, latency and memory figures.
+    df = run_benchmarks(sizes=[200], num_queries=20, warmup=5, repeat=2)
+    assert sorted(df["Algorithm"]) == sorted(
+        ["Linear", "Binary", "Hash", "Trie", "Regex", "NumPy"]
+    )
+    assert (df["File Size"] == 200).all()
+    assert (df["Build (ms)"] >= 0).all()
+    assert (df["p99 (us)"] >= df["p50 (us)"]).all()
+    assert (df["Queries"] == 20).all()
+
+
+def test_run_benchmarks_skips_trie_over_budget():
+    # Test that the trie is not built for files over the byte budget.
+    df = run_benchmarks(
+        sizes=[200], num_queries=20, warmup=5, repeat=2,
+        algorithms=["Hash", "Trie"], max_trie_bytes=100
+    )
+    assert list(df["Algorithm"]) == ["Hash"]
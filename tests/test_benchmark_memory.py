@@ -0,0 +1,41 @@
+import os
+from benchmark_memory import (
+    CompactHashIndex,
+    MmapIndex,
+    SortedIndex,
+    run_memory_benchmarks,
+)
+
+
+def test_indexes_answer_exact_matches(tmp_path):
+    # Tests that every compact structure finds stored lines only.
+    lines = ["beta", "alpha", "gamma", "alpha"]
+    file_path = str(tmp_path / "lines.txt")
+    with open(file_path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+    raw = [line.encode() for line in lines]
+
+    mmap_index = MmapIndex(file_path, raw)
+    for index in (SortedIndex(lines), CompactHashIndex(raw), mmap_index):
+        assert "alpha" in index
+        assert "gamma" in index
+        assert "alph" not in index
+        assert "delta" not in index
+    assert mmap_index.mapped_bytes == len("alpha\nbeta\ngamma\n")
+    mmap_index.close()
+    assert not os.path.exists(mmap_index.path)
+
+
+def test_run_memory_benchmarks_rows():
+    # Tests that each index gets steady-state and peak figures.
+    df = run_memory_benchmarks(
+        sizes=[500], distributions=["short", "long"], num_queries=50,
+        max_trie_bytes=20_000
+    )
+    short = df[df["Line Lengths"] == "short"]
+    assert len(short) == 5
+    # The trie is skipped for the long-line file over the byte budget
+    assert "trie" not in set(df[df["Line Lengths"] == "long"]["Index"])
+    assert (df["Peak (MB)"] >= df["Steady (MB)"]).all()
+    compact = short[short["Index"] == "compact hash"]["Bytes/Line"].iloc[0]
+    assert compact < short[short["Index"] == "set"]["Bytes/Line"].iloc[0]
@@ -0,0 +1,14 @@
+from benchmark_scaling import default_worker_counts, run_scaling_benchmark
+
+
+def test_scaling_matrix():
+    # Tests that inline runs once and pooled executors once per count.
+    results = run_scaling_benchmark(
+        [1, 2], executor_types=["inline", "thread"], concurrency=2,
+        duration=0.3, num_lines=200
+    )
+    assert [(r["executor"], r["workers"]) for r in results] == [
+        ("inline", 0), ("thread", 1), ("thread", 2)
+    ]
+    assert all(r["errors"] == 0 and r["throughput_rps"] > 0 for r in results)
+    assert default_worker_counts()[0] == 1
@@ -0,0 +1,12 @@
+from benchmark_startup import COLUMNS, run_startup_benchmarks
+
+
+def test_startup_probe_in_fresh_process():
+    # Tests that one fresh-process probe reports every timing.
+    df = run_startup_benchmarks(sizes=[200], repeat=1)
+    assert list(df["File Size"]) == [200]
+    for column in COLUMNS.values():
+        assert df[column].iloc[0] > 0
+    row = df.iloc[0]
+    # The first answer comes after the interpreter, import and start-up
+    assert row["Time to First Answer (ms)"] > row["Import (ms)"]
@@ -0,0 +1,77 @@
+import socket
+from collections import Counter
+import pytest
+from datasets import (
+    UNICODE_CHARS,
+    generate_dataset,
+    generate_lines,
+    generate_queries,
+    parse_length,
+    read_queries,
+    write_queries,
+)
+from harness import running_server
+from server import AsyncTCPServer
+
+
+def test_lines_are_seeded_and_shaped():
+    # Tests reproducibility, length bounds, duplicates and Unicode share.
+    lines = generate_lines(
+        2000, "uniform:10:20", unicode_ratio=0.5, duplicate_rate=0.3, seed=7
+    )
+    assert lines == generate_lines(
+        2000, "uniform:10:20", unicode_ratio=0.5, duplicate_rate=0.3, seed=7
+    )
+    assert all(10 <= len(line) <= 20 for line in lines)
+    assert all(line == line.strip() for line in lines)
+    assert 0.2 < 1 - len(set(lines)) / len(lines) < 0.4
+    with_unicode = [
+        line for line in lines if any(c in UNICODE_CHARS for c in line)
+    ]
+    assert 0.4 < len(with_unicode) / len(lines) < 0.6
+
+
+def test_parse_length_rejects_bad_specs():
+    # Tests that malformed distributions fail with a clear error.
+    with pytest.raises(ValueError):
+        parse_length("zipf:2")
+    with pytest.raises(ValueError):
+        parse_length("uniform:5")
+    assert parse_length("fixed:9999")(None) == 255
+
+
+def test_queries_hit_ratio_and_popularity(tmp_path):
+    # Tests the hit ratio, absent misses, Zipf skew and file round trip.
+    lines = generate_lines(500, seed=1)
+    queries = generate_queries(lines, 4000, hit_ratio=0.75, zipf_s=1.5)
+    hits = [q for q, hit in queries if hit]
+    assert 0.7 < len(hits) / len(queries) < 0.8
+    assert all(q in lines for q in hits)
+    assert not any(q in lines for q, hit in queries if not hit)
+
+    uniform = generate_queries(lines, 4000, hit_ratio=1.0, zipf_s=0.0)
+    top_skewed = Counter(hits).most_common(1)[0][1] / len(hits)
+    top_uniform = Counter(q for q, _ in uniform).most_common(1)[0][1] / 4000
+    assert top_skewed > 5 * top_uniform
+
+    path = str(tmp_path / "queries.jsonl")
+    write_queries(path, queries)
+    assert read_queries(path) == queries
+
+
+def test_unicode_dataset_hits_through_server(tmp_path):
+    # Tests that generated Unicode lines survive the server's sanitizer.
+    data_file = str(tmp_path / "data.txt")
+    lines = generate_dataset(data_file, 200, unicode_ratio=1.0, seed=3)
+    server = AsyncTCPServer(
+        host="127.0.0.1",
+        port=0,
+        file_path=data_file,
+        reread_on_query=False,
+        use_ssl=False,
+        executor_type="inline",
+    )
+    with running_server(server) as (host, port):
+        with socket.create_connection((host, port), timeout=30) as sock:
+            sock.sendall(lines[0].encode("utf-8"))
+            assert sock.recv(4096).decode("utf-8").endswith("EXISTS\n")
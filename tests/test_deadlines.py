@@ -0,0 +1,67 @@
+import asyncio
+import socket
+import time
+from harness import running_server
+from server import AsyncTCPServer, TimerWheel
+
+
+def test_timer_wheel_expires_and_cancels() -> None:
+    # Tests that due deadlines fire and cancelled ones do not.
+    fired = []
+
+    async def run():
+        wheel = TimerWheel(resolution=0.01, slots=8)
+        wheel.schedule(0.03, lambda: fired.append("due"))
+        key = wheel.schedule(0.03, lambda: fired.append("cancelled"))
+        wheel.schedule(0.2, lambda: fired.append("later"))
+        wheel.cancel(key)
+        await asyncio.sleep(0.1)
+        wheel.stop()
+
+    asyncio.run(run())
+    assert fired == ["due"]
+
+
+def test_timer_wheel_restarts_after_stop() -> None:
+    # Tests that deadlines still fire after the wheel is stopped and
+    # started again.
+    fired = []
+
+    async def run():
+        wheel = TimerWheel(resolution=0.01, slots=8)
+        wheel.schedule(0.01, lambda: None)
+        await asyncio.sleep(0.2)
+        wheel.stop()
+        wheel.schedule(0.03, lambda: fired.append("after restart"))
+        await asyncio.sleep(0.15)
+        wheel.stop()
+
+    asyncio.run(run())
+    assert fired == ["after restart"]
+
+
+def test_timer_wheel_disabled_timeout() -> None:
+    # Tests that a zero timeout schedules nothing.
+    wheel = TimerWheel()
+    assert wheel.schedule(0, lambda: None) is None
+    wheel.cancel(None)
+
+
+def test_idle_client_is_cut(tmp_path) -> None:
+    # Tests that a client which never sends a query is disconnected.
+    data_file = tmp_path / "test_file.txt"
+    data_file.write_text("line1\n")
+    server = AsyncTCPServer(
+        host="127.0.0.1",
+        port=0,
+        file_path=str(data_file),
+        reread_on_query=False,
+        use_ssl=False,
+        timeouts={"read": 0.2, "resolution": 0.05},
+    )
+    with running_server(server) as (host, port):
+        with socket.create_connection((host, port), timeout=5) as sock:
+            start = time.monotonic()
+            assert sock.recv(1024) == b""
+            assert time.monotonic() - start < 2
+    assert server.deadline_cuts["read"] == 1
@@ -0,0 +1,37 @@
+import socket
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from harness import running_server
+from server import AsyncTCPServer, create_executor
+
+
+@pytest.mark.parametrize("executor_type", ["inline", "thread"])
+def test_lookup_executor_types(tmp_path, executor_type) -> None:
+    # Tests that queries are answered with each non-process executor.
+    data_file = tmp_path / "test_file.txt"
+    data_file.write_text("line1\n")
+    server = AsyncTCPServer(
+        host="127.0.0.1",
+        port=0,
+        file_path=str(data_file),
+        reread_on_query=False,
+        use_ssl=False,
+        executor_type=executor_type,
+        workers=2,
+    )
+    with running_server(server) as (host, port):
+        with socket.create_connection((host, port), timeout=30) as sock:
+            sock.sendall(b"line1")
+            assert sock.recv(1024) == b"Query 'line1' EXISTS\n"
+    assert server.workers == (0 if executor_type == "inline" else 2)
+
+
+def test_create_executor() -> None:
+    # Tests executor construction and rejection of unknown types.
+    assert create_executor("inline") is None
+    executor = create_executor("thread", 3)
+    assert isinstance(executor, ThreadPoolExecutor)
+    assert executor._max_workers == 3
+    executor.shutdown()
+    with pytest.raises(ValueError):
+        create_executor("fork")
@@ -0,0 +1,75 @@
+import json
+import os
+import pytest
+from history import (
+    compare_runs, latest_runs, load_run, main, record, save_run, welch_test
+)
+
+
+def make_run(tmp_path, throughput, p99, mean):
+    # Saves a one-result run and returns its path.
+    return save_run(
+        "load", {"mode": "closed"},
+        [record("closed", mean, 1.0, 500, p99, throughput)],
+        str(tmp_path)
+    )
+
+
+def test_saved_run_is_versioned(tmp_path) -> None:
+    # Tests the schema version, environment and config of a saved run.
+    run = load_run(make_run(tmp_path, 100.0, 5.0, 2.0))
+    assert run["schema_version"] == 1
+    assert run["config"] == {"mode": "closed"}
+    assert run["environment"]["python"]
+    assert "git_revision" in run["environment"]
+
+
+def test_unknown_schema_is_rejected(tmp_path) -> None:
+    # Tests that runs from a different schema are not compared silently.
+    path = tmp_path / "old.json"
+    path.write_text(json.dumps({"schema_version": 0, "results": []}))
+    with pytest.raises(ValueError):
+        load_run(str(path))
+
+
+def test_welch_test_p_value() -> None:
+    # Tests the p-value against a reference: t = 2 with 10 degrees of
+    # freedom gives a two-sided p of 0.0734.
+    base = {"mean": 0.0, "stdev": 1.0, "count": 6}
+    new = {"mean": 2 * (1 / 3) ** 0.5, "stdev": 1.0, "count": 6}
+    t, p = welch_test(base, new)
+    assert t == pytest.approx(2.0)
+    assert p == pytest.approx(0.0734, abs=1e-3)
+
+
+def test_compare_flags_regressions(tmp_path) -> None:
+    # Tests the threshold gate and the command's exit status.
+    base = make_run(tmp_path / "a", 100.0, 5.0, 2.0)
+    same = make_run(tmp_path / "b", 97.0, 5.2, 2.0)
+    slow = make_run(tmp_path / "c", 80.0, 5.0, 3.0)
+
+    rows = compare_runs(load_run(base), load_run(slow), threshold=0.1)
+    assert rows[0]["regressed"]
+    assert rows[0]["significant"]
+    assert rows[0]["throughput_change"] == pytest.approx(-0.2)
+
+    assert main(["compare", base, same]) == 0
+    assert main(["compare", base, slow]) == 1
+    assert main(["compare", base, slow, "--threshold", "0.5"]) == 0
+
+
+def test_compare_defaults_to_newest_runs(tmp_path, capsys) -> None:
+    # Tests that runs are ordered by creation time rather than file
+    # name, and that compare defaults to the newest run's kind.
+    for kind in ("memory", "load", "load", "startup"):
+        save_run(kind, {}, [record("x", 2.0, 1.0, 500, 5.0, 100.0)],
+                 str(tmp_path))
+    paths = latest_runs(str(tmp_path))
+    assert [load_run(p)["kind"] for p in paths] == \
+        ["memory", "load", "load", "startup"]
+    assert len(latest_runs(str(tmp_path), "load")) == 2
+
+    save_run("load", {}, [record("x", 2.0, 1.0, 500, 5.0, 100.0)],
+             str(tmp_path))
+    assert main(["compare", "--dir", str(tmp_path)]) == 0
+    assert len(os.listdir(tmp_path)) == 5
@@ -0,0 +1,170 @@
+import socket
+import time
+import pytest
+from harness import make_server, running_server, use_bundled_certificates
+
+
+def read_lines(sock: socket.socket, count: int) -> list:
+    # Reads until `count` newline-terminated responses have arrived.
+    buffer = b""
+    while buffer.count(b"\n") < count:
+        chunk = sock.recv(1024)
+        assert chunk, "server closed the connection early"
+        buffer += chunk
+    return buffer.decode("utf-8").splitlines()
+
+
+def test_newline_queries_keep_connection_open(tmp_path) -> None:
+    # Tests sequential and pipelined queries on one connection.
+    data_file = tmp_path / "test_file.txt"
+    data_file.write_text("line1\nline2\n")
+    server = make_server(data_file)
+    with running_server(server) as (host, port):
+        with socket.create_connection((host, port), timeout=30) as sock:
+            sock.sendall(b"line1\n")
+            assert read_lines(sock, 1) == ["Query 'line1' EXISTS"]
+            sock.sendall(b"line2\nmissing\nli")
+            sock.sendall(b"ne1\n")
+            assert read_lines(sock, 3) == [
+                "Query 'line2' EXISTS",
+                "Query 'missing' NOT FOUND",
+                "Query 'line1' EXISTS",
+            ]
+    assert server.successful_requests == 4
+
+
+def test_bare_query_closes_connection(tmp_path) -> None:
+    # Tests that clients without newline framing still get one answer.
+    data_file = tmp_path / "test_file.txt"
+    data_file.write_text("line1\nline2\n")
+    server = make_server(data_file)
+    with running_server(server) as (host, port):
+        with socket.create_connection((host, port), timeout=30) as sock:
+            sock.sendall(b"line1")
+            assert sock.recv(1024) == b"Query 'line1' EXISTS\n"
+            assert sock.recv(1024) == b""
+
+
+class Recorder:
+    # Stands in for Locust's request event, keeping every firing.
+    def __init__(self) -> None:
+        self.events = []
+
+    def fire(self, **kwargs) -> None:
+        self.events.append(kwargs)
+
+
+def test_locust_client_modes(tmp_path) -> None:
+    # Tests persistent and one-shot modes of the Locust search client.
+    pytest.importorskip("locust")
+    from locustfile import SearchClient
+
+    data_file = tmp_path / "test_file.txt"
+    data_file.write_text("line1\nline2\n")
+    server = make_server(data_file)
+    with running_server(server) as (host, port):
+        for persistent in (True, False):
+            recorder = Recorder()
+            client = SearchClient(host, port, recorder, persistent=persistent)
+            client.query("line1", "hit", True)
+            client.query("absent", "miss", False)
+            client.query("line2", "hit", False)
+            client.close()
+            assert [e["exception"] is None for e in recorder.events] == \
+                [True, True, False]
+            assert all(e["response_time"] > 0 for e in recorder.events)
+
+
+def test_locust_client_fails_error_replies(tmp_path) -> None:
+    # Tests that rate-limit and invalid-query replies fail the request
+    # instead of counting as misses.
+    pytest.importorskip("locust")
+    from async_client import QueryError
+    from locustfile import SearchClient
+
+    data_file = tmp_path / "test_file.txt"
+    data_file.write_text("line1\nline2\n")
+    server = make_server(data_file)
+    with running_server(server) as (host, port):
+        recorder = Recorder()
+        client = SearchClient(host, port, recorder)
+        client.query(";;;", "miss", False)
+        server.rate_limit = 0
+        client.query("absent", "miss", False)
+        client.close()
+    replies = [str(e["exception"]) for e in recorder.events]
+    assert all(isinstance(e["exception"], QueryError)
+               for e in recorder.events)
+    assert replies == [
+        "Invalid query received.",
+        "Rate limit exceeded. Please try again later.",
+    ]
+
+
+def test_pipelined_batch_with_invalid_query(tmp_path) -> None:
+    # Tests that a pipelined batch is answered in order and that an
+    # invalid line is answered without closing the connection.
+    data_file = tmp_path / "test_file.txt"
+    data_file.write_text("line1\nline2\n")
+    server = make_server(data_file)
+    with running_server(server) as (host, port):
+        with socket.create_connection((host, port), timeout=30) as sock:
+            sock.sendall(b"line1\n;;;\nmissing\nline2\n")
+            assert read_lines(sock, 4) == [
+                "Query 'line1' EXISTS",
+                "Invalid query received.",
+                "Query 'missing' NOT FOUND",
+                "Query 'line2' EXISTS",
+            ]
+            sock.sendall(b"line1\n")
+            assert read_lines(sock, 1) == ["Query 'line1' EXISTS"]
+
+
+def test_idle_keep_alive_connection_is_closed(tmp_path) -> None:
+    # Tests that a keep-alive connection idle past the read deadline is
+    # closed by the server.
+    data_file = tmp_path / "test_file.txt"
+    data_file.write_text("line1\nline2\n")
+    server = make_server(data_file)
+    server.timeouts["read"] = 0.2
+    with running_server(server) as (host, port):
+        with socket.create_connection((host, port), timeout=30) as sock:
+            sock.sendall(b"line1\n")
+            assert read_lines(sock, 1) == ["Query 'line1' EXISTS"]
+            started = time.monotonic()
+            assert sock.recv(1024) == b""
+            assert time.monotonic() - started < 5
+
+
+def test_oversized_keep_alive_line_closes_connection(tmp_path) -> None:
+    # Tests that a line over the request limit is refused and closed.
+    data_file = tmp_path / "test_file.txt"
+    data_file.write_text("line1\nline2\n")
+    server = make_server(data_file)
+    with running_server(server) as (host, port):
+        with socket.create_connection((host, port), timeout=30) as sock:
+            sock.sendall(b"line1\n" + b"x" * 2000 + b"\n")
+            assert read_lines(sock, 2) == [
+                "Query 'line1' EXISTS",
+                "Request too large. Please limit your request size.",
+            ]
+            assert sock.recv(1024) == b""
+
+
+def test_locust_persistent_client_resumes_tls(tmp_path) -> None:
+    # Tests that a persistent TLS client keeps its session for reconnects.
+    pytest.importorskip("locust")
+    from locustfile import SearchClient
+
+    use_bundled_certificates()
+    data_file = tmp_path / "test_file.txt"
+    data_file.write_text("line1\n")
+    server = make_server(data_file, use_ssl=True)
+    with running_server(server) as (host, port):
+        client = SearchClient(host, port, Recorder(), use_ssl=True)
+        client.query("line1", "hit", True)
+        assert client.session is not None
+        client.close()
+        client.query("line1", "hit", True)
+        assert client.sock.session_reused
+        client.close()
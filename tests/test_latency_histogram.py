@@ -0,0 +1,51 @@
+import random
+from metrics import LatencyHistogram
+
+
+def test_percentiles_within_precision() -> None:
+    # Tests that percentiles stay within the histogram's relative error.
+    histogram = LatencyHistogram()
+    rng = random.Random(42)
+    values = sorted(rng.randint(1000, 50_000_000) for _ in range(20000))
+    for value in values:
+        histogram.record(value)
+
+    result = histogram.percentiles((50, 90, 99, 99.9))
+    for q, estimate in result.items():
+        exact = values[int(q / 100 * len(values)) - 1]
+        assert abs(estimate - exact) / exact < 0.02
+    assert histogram.count == len(values)
+    assert histogram.min == values[0]
+    assert histogram.max == values[-1]
+
+
+def test_small_values_are_exact() -> None:
+    # Tests that values below the sub-bucket count are not rounded.
+    histogram = LatencyHistogram()
+    for value in range(100):
+        histogram.record(value)
+    assert histogram.percentiles((50,))[50] == 49
+
+
+def test_percentiles_since_snapshot() -> None:
+    # Tests interval reporting from a snapshot of earlier counts.
+    histogram = LatencyHistogram()
+    for _ in range(100):
+        histogram.record(1_000)
+    snapshot = histogram.snapshot()
+    for _ in range(10):
+        histogram.record(1_000_000)
+
+    interval = histogram.percentiles((50,), since=snapshot)[50]
+    assert abs(interval - 1_000_000) / 1_000_000 < 0.02
+    assert abs(histogram.percentiles((50,))[50] - 1_000) < 20
+
+
+def test_values_are_clamped() -> None:
+    # Tests that out-of-range values land in the edge buckets.
+    histogram = LatencyHistogram(max_value=10 ** 6)
+    histogram.record(10 ** 9)
+    histogram.record(-5)
+    assert histogram.max == 10 ** 6
+    assert histogram.min == 0
+    assert histogram.percentiles((50,))[50] == 0
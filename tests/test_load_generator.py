@@ -0,0 +1,51 @@
+from harness import running_server
+from load_generator import run_load
+from server import AsyncTCPServer
+
+
+def test_closed_loop_reports_latency() -> None:
+    # Tests a short fixed-concurrency run against an in-process server.
+    result = run_load(
+        mode="closed", concurrency=2, duration=0.5, num_lines=500, warmup=2
+    )
+    assert result["requests"] > 0
+    assert result["errors"] == 0
+    assert result["throughput_rps"] > 0
+    latency = result["latency_ms"]
+    assert 0 < latency["p50"] <= latency["p99"] <= latency["max"]
+
+
+def test_open_loop_sends_at_fixed_rate() -> None:
+    # Tests that the open loop issues rate * duration requests and
+    # reports both corrected and service latency.
+    result = run_load(
+        mode="open", rate=40, duration=0.5, num_lines=500, warmup=2,
+        reread_on_query=True
+    )
+    assert result["requests"] == 20
+    assert result["errors"] == 0
+    assert result["reread_on_query"] is True
+    assert result["latency_ms"]["p50"] >= result["service_latency_ms"]["p50"]
+
+
+def test_error_replies_count_as_errors(tmp_path) -> None:
+    # Tests that rate-limit replies from a running daemon are errors,
+    # not successful requests.
+    data_file = tmp_path / "test_file.txt"
+    data_file.write_text("line1\n")
+    server = AsyncTCPServer(
+        host="127.0.0.1",
+        port=0,
+        file_path=str(data_file),
+        reread_on_query=False,
+        use_ssl=False,
+    )
+    server.rate_limit = 0
+    with running_server(server) as (host, port):
+        result = run_load(
+            mode="closed", concurrency=2, duration=0.3, host=host,
+            port=port, data_path=str(data_file), warmup=0
+        )
+    assert result["requests"] > 0
+    assert result["errors"] == result["requests"]
+    assert result["throughput_rps"] == 0
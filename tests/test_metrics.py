@@ -0,0 +1,67 @@
+import socket
+from harness import running_server
+from metrics import MetricsRegistry
+from server import AsyncTCPServer
+
+
+def test_registry_renders_prometheus_text() -> None:
+    # Tests counters, gauges and histograms in the text format.
+    registry = MetricsRegistry(prefix="app_")
+    registry.counter("hits_total", "Hits.", lambda: 3)
+    registry.gauge("size", "Size.", lambda: 7, labels={"kind": 'a"b'})
+    histogram = registry.histogram(
+        "latency_seconds", "Latency.", buckets=(0.1, 1.0)
+    )
+    histogram.observe(0.05)
+    histogram.observe(0.5)
+    histogram.observe(5)
+
+    lines = registry.render().splitlines()
+    assert "# TYPE app_hits_total counter" in lines
+    assert "app_hits_total 3" in lines
+    assert 'app_size{kind="a\\"b"} 7' in lines
+    assert 'app_latency_seconds_bucket{le="0.1"} 1' in lines
+    assert 'app_latency_seconds_bucket{le="1.0"} 2' in lines
+    assert 'app_latency_seconds_bucket{le="+Inf"} 3' in lines
+    assert "app_latency_seconds_count 3" in lines
+
+
+def http_get(port: int, path: str) -> str:
+    # Issues a bare HTTP/1.0 GET and returns the whole response.
+    with socket.create_connection(("127.0.0.1", port), timeout=5) as sock:
+        sock.sendall(f"GET {path} HTTP/1.0\r\n\r\n".encode())
+        chunks = []
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                return b"".join(chunks).decode()
+            chunks.append(chunk)
+
+
+def test_metrics_endpoint(tmp_path) -> None:
+    # Tests that the server exposes its metrics over HTTP.
+    data_file = tmp_path / "test_file.txt"
+    data_file.write_text("line1\nline2\n")
+    server = AsyncTCPServer(
+        host="127.0.0.1",
+        port=0,
+        file_path=str(data_file),
+        reread_on_query=False,
+        use_ssl=False,
+        metrics={"port": 0},
+    )
+    with running_server(server) as (host, port):
+        with socket.create_connection((host, port), timeout=30) as sock:
+            sock.sendall(b"line1")
+            sock.recv(1024)
+        metrics_port = server.metrics_server.sockets[0].getsockname()[1]
+        response = http_get(metrics_port, "/metrics")
+        missing = http_get(metrics_port, "/other")
+
+    assert response.startswith("HTTP/1.0 200 OK")
+    assert "tcpserver_requests_successful_total 1" in response
+    assert "tcpserver_index_entries 2" in response
+    assert "tcpserver_index_generation 1" in response
+    assert 'tcpserver_stage_latency_seconds_count{stage="lookup"} 1' \
+        in response
+    assert missing.startswith("HTTP/1.0 404")
@@ -0,0 +1,96 @@
+import asyncio
+import os
+import sys
+import time
+from monitoring import LoopWatchdog, ResourceSampler, SlowLog, measure_index
+
+
+def test_sample_contents() -> None:
+    # Tests that a sample describes the current process.
+    sampler = ResourceSampler(queue_depth=lambda: 3)
+    entry = sampler.sample(loop_lag=0.25)
+    assert entry["rss_bytes"] > 0
+    assert entry["cpu_percent"] >= 0
+    assert entry["loop_lag"] == 0.25
+    assert entry["executor_queue"] == 3
+    if os.name == "posix":
+        assert entry["open_fds"] > 0
+    assert sampler.latest is entry
+
+
+def test_sampler_ring_buffer() -> None:
+    # Tests that the background task fills a bounded history.
+    async def run():
+        sampler = ResourceSampler(interval=0.01, history=3)
+        sampler.start()
+        await asyncio.sleep(0.2)
+        sampler.stop()
+        return sampler
+
+    sampler = asyncio.run(run())
+    assert len(sampler.samples) == 3
+    assert all(s["loop_lag"] >= 0 for s in sampler.samples)
+
+
+def test_slow_log_keeps_recent_slow_requests() -> None:
+    # Tests the threshold, captured context and bounded size.
+    slow_log = SlowLog(threshold=0.05, size=2)
+    assert not slow_log.maybe_record(
+        0.01, {"lookup": 0.01}, "fast", ("127.0.0.1", 1), "ok", 1
+    )
+    for query in ("a", "b", "c"):
+        assert slow_log.maybe_record(
+            0.2, {"reload": 0.15, "lookup": 0.05}, query,
+            ("127.0.0.1", 1), "ok", 3
+        )
+
+    entries = slow_log.recent(10)
+    assert [e["query"] for e in entries] == ["b", "c"]
+    assert slow_log.recorded == 3
+    assert entries[-1]["reloaded"] is True
+    assert entries[-1]["stages_ms"] == {"reload": 150.0, "lookup": 50.0}
+    assert entries[-1]["index_generation"] == 3
+    assert slow_log.recent(0) == []
+
+
+def test_slow_log_disabled() -> None:
+    # Tests that a zero threshold records nothing.
+    slow_log = SlowLog(threshold=0)
+    assert not slow_log.maybe_record(10.0, {}, "q", None, "ok", 1)
+
+
+def blocking_call() -> None:
+    time.sleep(0.3)
+
+
+def test_watchdog_captures_blocking_stack() -> None:
+    # Tests that a blocking callback is reported once with its stack.
+    async def run():
+        watchdog = LoopWatchdog(interval=0.01, threshold=0.1)
+        watchdog.start()
+        await asyncio.sleep(0.05)
+        blocking_call()
+        await asyncio.sleep(0.05)
+        watchdog.stop()
+        return watchdog
+
+    watchdog = asyncio.run(run())
+    assert watchdog.stall_count == 1
+    stall = watchdog.stalls[0]
+    assert stall["blocked_ms"] >= 100
+    assert "blocking_call" in stall["stack"]
+    summary = watchdog.summary()
+    assert summary["max_lag_ms"] >= 250
+    assert summary["stalls"] == 1
+
+
+def test_measure_index_splits_payload_and_structure() -> None:
+    # Tests the per-entry accounting of an index set.
+    entries = {"alpha", "beta", "gamma", "ünïcode"}
+    stats = measure_index(entries, line_count=6)
+    assert stats["entries"] == 4
+    assert stats["lines"] == 6
+    assert stats["payload_bytes"] == sum(sys.getsizeof(e) for e in entries)
+    assert stats["structure_bytes"] == sys.getsizeof(entries)
+    assert stats["bytes_per_entry"] == round(stats["total_bytes"] / 4, 2)
+    assert measure_index(set(), 0)["bytes_per_entry"] == 0.0
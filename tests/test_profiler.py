@@ -0,0 +1,45 @@
+import threading
+import time
+from profiler import SamplingProfiler
+
+
+def busy_loop(stop: threading.Event) -> None:
+    # Keeps the profiled thread on a recognisable stack.
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_profiler_writes_collapsed_stacks(tmp_path) -> None:
+    # Tests that a profiling window samples the target thread.
+    output = tmp_path / "profile.collapsed"
+    stop = threading.Event()
+    worker = threading.Thread(target=busy_loop, args=(stop,))
+    worker.start()
+    try:
+        profiler = SamplingProfiler(str(output), interval=0.001)
+        assert profiler.start(duration=0.2, thread_id=worker.ident)
+        assert not profiler.start()  # Only one window at a time
+        profiler.join(5)
+    finally:
+        stop.set()
+        worker.join()
+
+    assert not profiler.running
+    assert profiler.samples > 0
+    lines = output.read_text().splitlines()
+    assert any("busy_loop (test_profiler.py" in line for line in lines)
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert "busy_loop" in (tmp_path / "profile.collapsed.stats").read_text()
+
+
+def test_profiler_stop_ends_window_early(tmp_path) -> None:
+    # Tests that stop() ends the window and still writes results.
+    output = tmp_path / "profile.collapsed"
+    profiler = SamplingProfiler(str(output), interval=0.001)
+    assert not profiler.stop()
+    profiler.start(duration=60)
+    start = time.monotonic()
+    assert profiler.stop()
+    profiler.join(5)
+    assert time.monotonic() - start < 5
+    assert output.exists()
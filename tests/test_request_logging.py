@@ -0,0 +1,82 @@
+import json
+import logging
+import os
+import subprocess
+import sys
+from harness import make_server
+from server import JsonFormatter
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_json_formatter_merges_fields() -> None:
+    # Tests that structured fields end up as top-level JSON keys.
+    record = logging.LogRecord(
+        "root", logging.INFO, __file__, 1, "hello %s", ("world",), None
+    )
+    record.fields = {"status": "ok", "total_ms": 1.5}
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry["message"] == "hello world"
+    assert entry["level"] == "INFO"
+    assert entry["status"] == "ok"
+    assert entry["total_ms"] == 1.5
+
+
+def test_json_formatter_includes_exception() -> None:
+    # Tests that exceptions are serialised into the JSON line.
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = logging.LogRecord(
+            "root", logging.ERROR, __file__, 1, "failed", (),
+            sys.exc_info()
+        )
+    entry = json.loads(JsonFormatter().format(record))
+    assert "ValueError: boom" in entry["exception"]
+
+
+def test_log_request_emits_one_record(caplog) -> None:
+    # Tests that a sampled request produces a single structured record.
+    server = make_server(log_sample_rate=1.0)
+    with caplog.at_level(logging.INFO):
+        server.log_request(("127.0.0.1", 1234), "line1", "ok", 0.002, 0.001)
+    records = [r for r in caplog.records if r.getMessage() == "request"]
+    assert len(records) == 1
+    assert records[0].fields["query"] == "line1"
+    assert records[0].fields["status"] == "ok"
+    assert records[0].fields["total_ms"] == 2.0
+
+
+def test_log_request_sampling_disabled(caplog) -> None:
+    # Tests that a zero sample rate suppresses per-request records.
+    server = make_server(log_sample_rate=0.0)
+    with caplog.at_level(logging.INFO):
+        for _ in range(100):
+            server.log_request(("127.0.0.1", 1234), "line1", "ok", 0.002)
+    assert not [r for r in caplog.records if r.getMessage() == "request"]
+
+
+def test_forked_child_records_are_written(tmp_path) -> None:
+    # Tests that the logging thread is restarted in a forked child, as
+    # the daemon forks after importing the server module.
+    script = (
+        "import logging, os, sys\n"
+        f"sys.path.insert(0, {ROOT_DIR!r})\n"
+        "import server\n"
+        "logging.getLogger().warning('from parent')\n"
+        "pid = os.fork()\n"
+        "if pid == 0:\n"
+        "    logging.getLogger().warning('from child after fork')\n"
+        "    sys.exit(0)\n"
+        "os.waitpid(pid, 0)\n"
+    )
+    subprocess.run(
+        [sys.executable, "-c", script], cwd=tmp_path, check=True, timeout=60
+    )
+    log_file = tmp_path / "service_debug.log"
+    messages = [
+        json.loads(line)["message"]
+        for line in log_file.read_text().splitlines()
+    ]
+    assert "from parent" in messages
+    assert "from child after fork" in messages
@@ -0,0 +1,106 @@
+import socket
+import ssl
+import pytest
+from typing import Generator, Optional
+from harness import make_server, running_server, use_bundled_certificates
+from server import ServerConfig
+
+
+@pytest.fixture
+def tls_config(tmp_path) -> Generator[str, None, None]:
+    # Creates a configuration file with a [TLS] section.
+    data_file = tmp_path / "test_file.txt"
+    data_file.write_text("line1\nline2\n")
+    config_file = tmp_path / "test_config.ini"
+    config_file.write_text(f"""
+[SERVER]
+linuxpath = {data_file}
+REREAD_ON_QUERY = False
+use_ssl = True
+
+[TLS]
+session_tickets = False
+num_tickets = 4
+ecdh_curve = prime256v1
+""")
+    yield str(config_file)
+
+
+def test_read_tls_options(tls_config: str) -> None:
+    # Tests that the [TLS] section is parsed with fallbacks.
+    config = ServerConfig(tls_config)
+    assert config.tls_options["session_resumption"] is True
+    assert config.tls_options["session_tickets"] is False
+    assert config.tls_options["num_tickets"] == 4
+    assert config.tls_options["ecdh_curve"] == "prime256v1"
+    assert config.tls_options["ciphers"] is None
+
+
+def test_tls_options_enable_tickets() -> None:
+    # Tests that tickets are enabled with the configured count.
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    server = make_server(use_ssl=True, tls_options={"num_tickets": 3})
+    server.apply_tls_options(context)
+    assert not context.options & ssl.OP_NO_TICKET
+    assert context.num_tickets == 3
+
+
+def test_tls_options_session_cache_only() -> None:
+    # Tests that disabling tickets falls back to the session cache.
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    server = make_server(use_ssl=True, tls_options={"session_tickets": False})
+    server.apply_tls_options(context)
+    assert context.options & ssl.OP_NO_TICKET
+
+
+def test_tls_options_disable_resumption() -> None:
+    # Tests that resumption can be disabled entirely.
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    server = make_server(
+        use_ssl=True, tls_options={"session_resumption": False}
+    )
+    server.apply_tls_options(context)
+    assert context.options & ssl.OP_NO_TICKET
+    assert context.num_tickets == 0
+    assert context.minimum_version == ssl.TLSVersion.TLSv1_3
+
+
+def reconnect_reuses_session(
+    tmp_path, tls_options: dict, version: ssl.TLSVersion
+) -> Optional[bool]:
+    # Queries twice, offering the first session on the second connection.
+    # Returns whether it was resumed, or None if the handshake failed.
+    use_bundled_certificates()
+    data_file = tmp_path / "test_file.txt"
+    data_file.write_text("line1\n")
+    server = make_server(data_file, use_ssl=True, tls_options=tls_options)
+    context = ssl.create_default_context()
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE
+    context.minimum_version = context.maximum_version = version
+    session = None
+    with running_server(server) as (host, port):
+        try:
+            for _ in range(2):
+                with socket.create_connection((host, port), timeout=30) as s:
+                    with context.wrap_socket(
+                        s, server_hostname=host, session=session
+                    ) as tls:
+                        tls.sendall(b"line1")
+                        tls.recv(1024)
+                        session = tls.session
+                        reused = tls.session_reused
+        except ssl.SSLError:
+            return None
+    return reused
+
+
+def test_disabled_resumption_is_never_resumed(tmp_path) -> None:
+    # Tests that no handshake is resumed with resumption disabled, while
+    # TLS 1.2 clients do resume from the session cache by default.
+    tls12 = ssl.TLSVersion.TLSv1_2
+    tls13 = ssl.TLSVersion.TLSv1_3
+    assert reconnect_reuses_session(tmp_path, {}, tls12) is True
+    disabled = {"session_resumption": False}
+    assert reconnect_reuses_session(tmp_path, disabled, tls12) is None
+    assert reconnect_reuses_session(tmp_path, disabled, tls13) is False
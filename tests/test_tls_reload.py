@@ -0,0 +1,69 @@
+import os
+import socket
+import ssl
+import pytest
+from harness import running_server, ROOT_DIR
+from server import AsyncTCPServer
+
+
+def peer_certificate(host: str, port: int) -> bytes:
+    # Returns the DER certificate presented by the server.
+    context = ssl.create_default_context()
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE
+    with socket.create_connection((host, port)) as sock:
+        with context.wrap_socket(sock, server_hostname=host) as tls:
+            return tls.getpeercert(binary_form=True)
+
+
+def read_der(name: str) -> bytes:
+    with open(os.path.join(ROOT_DIR, name)) as f:
+        return ssl.PEM_cert_to_DER_cert(f.read())
+
+
+@pytest.fixture
+def certificates(monkeypatch):
+    # Points CERT_PATH/KEY_PATH at the bundled certificate pair.
+    monkeypatch.setenv("CERT_PATH", os.path.join(ROOT_DIR, "cert.pem"))
+    monkeypatch.setenv("KEY_PATH", os.path.join(ROOT_DIR, "key.pem"))
+
+
+def test_reload_applies_to_new_connections(
+        certificates, monkeypatch, tmp_path
+) -> None:
+    # Tests that a reloaded certificate is served without a restart.
+    data_file = tmp_path / "test_file.txt"
+    data_file.write_text("line1\n")
+    server = AsyncTCPServer(
+        host="127.0.0.1",
+        port=0,
+        file_path=str(data_file),
+        reread_on_query=False,
+        use_ssl=True,
+    )
+    with running_server(server) as (host, port):
+        assert peer_certificate(host, port) == read_der("cert.pem")
+
+        monkeypatch.setenv("CERT_PATH", os.path.join(ROOT_DIR, "server.crt"))
+        monkeypatch.setenv("KEY_PATH", os.path.join(ROOT_DIR, "server.key"))
+        assert server.reload_ssl_context()
+        assert peer_certificate(host, port) == read_der("server.crt")
+
+
+def test_reload_failure_keeps_old_context(
+        certificates, monkeypatch
+) -> None:
+    # Tests that a broken certificate pair does not replace the old one.
+    server = AsyncTCPServer(
+        host="127.0.0.1",
+        port=0,
+        file_path="unused.txt",
+        reread_on_query=False,
+        use_ssl=True,
+    )
+    server.ssl_context = server.create_ssl_context()
+    previous = server.ssl_context
+
+    monkeypatch.setenv("KEY_PATH", os.path.join(ROOT_DIR, "server.key"))
+    assert not server.reload_ssl_context()
+    assert server.ssl_context is previous
@@ -0,0 +1,67 @@
+import json
+import socket
+from harness import running_server
+from server import AsyncTCPServer
+from tracing import STAGES, RequestTimings, TraceWriter
+
+
+def test_durations_skip_stages_that_did_not_run() -> None:
+    # Tests that unmarked stages are left out of the breakdown.
+    timings = RequestTimings()
+    timings.mark("rate_limit")
+    timings.mark("read")
+    timings.mark("lookup")
+    durations = timings.durations()
+    assert list(durations) == ["rate_limit", "read", "lookup"]
+    assert all(value >= 0 for value in durations.values())
+    assert len(timings.ends) == len(STAGES)
+
+
+def test_trace_writer_emits_chrome_events(tmp_path) -> None:
+    # Tests that flushed events load as a Chrome trace-event array.
+    path = tmp_path / "trace.json"
+    writer = TraceWriter(str(path), sample_rate=1.0, flush_every=4)
+    for request_id in (1, 2):
+        timings = RequestTimings()
+        timings.mark("read")
+        timings.mark("write")
+        due = writer.add(request_id, timings, status="ok")
+    assert due
+    writer.flush()
+    writer.flush()  # Nothing buffered, nothing written
+
+    text = path.read_text()
+    assert text.startswith("[\n")
+    events = json.loads(text.rstrip().rstrip(",") + "]")
+    assert [e["name"] for e in events] == ["read", "write"] * 2
+    assert {e["tid"] for e in events} == {1, 2}
+    assert all(e["ph"] == "X" and e["dur"] >= 0 for e in events)
+    assert events[0]["args"] == {"status": "ok"}
+
+
+def test_trace_writer_disabled_without_path() -> None:
+    # Tests that no path means nothing is ever sampled.
+    writer = TraceWriter(None, sample_rate=1.0)
+    assert not writer.sampled()
+
+
+def test_server_traces_sampled_requests(tmp_path) -> None:
+    # Tests that a served request appears in the trace with its stages.
+    data_file = tmp_path / "test_file.txt"
+    data_file.write_text("line1\n")
+    trace_path = tmp_path / "trace.json"
+    server = AsyncTCPServer(
+        host="127.0.0.1",
+        port=0,
+        file_path=str(data_file),
+        reread_on_query=True,
+        use_ssl=False,
+        metrics={"trace_path": str(trace_path), "trace_sample_rate": 1.0},
+    )
+    with running_server(server) as (host, port):
+        with socket.create_connection((host, port), timeout=30) as sock:
+            sock.sendall(b"line1")
+            assert sock.recv(1024) == b"Query 'line1' EXISTS\n"
+
+    events = json.loads(trace_path.read_text().rstrip().rstrip(",") + "]")
+    assert [e["name"] for e in events] == list(STAGES)
@@ -0,0 +1,60 @@
+import asyncio
+import socket
+from harness import make_server, running_server
+
+
+def udp_query(port: int, payload: bytes) -> bytes:
+    # Sends one datagram and returns the answer.
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.settimeout(5)
+        sock.sendto(payload, ("127.0.0.1", port))
+        return sock.recvfrom(2048)[0]
+
+
+def test_udp_query_matches_request_id(tmp_path) -> None:
+    # Tests that answers echo the request id of the query.
+    data_file = tmp_path / "test_file.txt"
+    data_file.write_text("line1\nexact line\n")
+    server = make_server(data_file, udp_port=0)
+    with running_server(server):
+        port = server.udp_transport.get_extra_info("sockname")[1]
+        assert udp_query(port, b"17 exact line") == \
+            b"17 Query 'exact line' EXISTS"
+        assert udp_query(port, b"18 missing") == \
+            b"18 Query 'missing' NOT FOUND"
+        assert udp_query(port, b"19 ") == b"19 Invalid query received."
+    assert server.successful_requests == 2
+
+
+def test_udp_query_rereads_file(tmp_path) -> None:
+    # Tests that REREAD_ON_QUERY also applies to datagrams.
+    data_file = tmp_path / "test_file.txt"
+    data_file.write_text("line1\n")
+    server = make_server(data_file, reread_on_query=True, udp_port=0)
+    with running_server(server):
+        port = server.udp_transport.get_extra_info("sockname")[1]
+        assert udp_query(port, b"1 line2") == b"1 Query 'line2' NOT FOUND"
+        data_file.write_text("line1\nline2\n")
+        assert udp_query(port, b"2 line2") == b"2 Query 'line2' EXISTS"
+
+
+def test_running_server_waits_for_udp_endpoint(tmp_path) -> None:
+    # Tests that the server is only reported ready once the UDP endpoint,
+    # created after the TCP listener and admin socket, is bound.
+    data_file = tmp_path / "test_file.txt"
+    data_file.write_text("line1\n")
+    server = make_server(
+        data_file, udp_port=0, admin_socket=str(tmp_path / "admin.sock")
+    )
+    start_admin = server.admin.start
+
+    async def slow_admin_start(path: str) -> None:
+        await asyncio.sleep(0.3)
+        await start_admin(path)
+
+    server.admin.start = slow_admin_start
+    with running_server(server):
+        assert server.udp_transport is not None
+        port = server.udp_transport.get_extra_info("sockname")[1]
+        assert udp_query(port, b"1 line1") == b"1 Query 'line1' EXISTS"
+    assert not server.ready.is_set()
@@ -0,0 +1,78 @@
+import asyncio
+import os
+import socket
+from harness import running_server
+from server import AsyncTCPServer
+
+
+def unix_query(path: str, query: str) -> str:
+    # Sends one query over the Unix socket and returns the response.
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(30)
+        sock.connect(path)
+        sock.sendall(query.encode("utf-8"))
+        return sock.recv(1024).decode("utf-8").strip()
+
+
+def test_unix_socket_query(tmp_path) -> None:
+    # Tests that the Unix listener answers queries like the TCP one.
+    data_file = tmp_path / "test_file.txt"
+    data_file.write_text("line1\nexact_line\n")
+    socket_path = str(tmp_path / "server.sock")
+    server = AsyncTCPServer(
+        host="127.0.0.1",
+        port=0,
+        file_path=str(data_file),
+        reread_on_query=False,
+        use_ssl=False,
+        unix_socket=socket_path,
+    )
+    with running_server(server):
+        assert unix_query(socket_path, "exact_line") == \
+            "Query 'exact_line' EXISTS"
+        assert list(server.ip_request_count) == [f"uid:{os.getuid()}"]
+    assert not os.path.exists(socket_path)
+
+
+def test_unix_socket_rate_limit(tmp_path) -> None:
+    # Tests that rate limiting applies per peer uid.
+    data_file = tmp_path / "test_file.txt"
+    data_file.write_text("line1\n")
+    socket_path = str(tmp_path / "server.sock")
+    server = AsyncTCPServer(
+        host="127.0.0.1",
+        port=0,
+        file_path=str(data_file),
+        reread_on_query=False,
+        use_ssl=False,
+        unix_socket=socket_path,
+    )
+    server.rate_limit = 0
+    with running_server(server):
+        assert unix_query(socket_path, "line1") == \
+            "Rate limit exceeded. Please try again later."
+
+
+def test_running_server_waits_for_unix_listener(tmp_path, monkeypatch) -> None:
+    # Tests that the server is only reported ready once the Unix socket,
+    # bound after the TCP listener, accepts connections.
+    data_file = tmp_path / "test_file.txt"
+    data_file.write_text("line1\n")
+    socket_path = str(tmp_path / "server.sock")
+    server = AsyncTCPServer(
+        host="127.0.0.1",
+        port=0,
+        file_path=str(data_file),
+        reread_on_query=False,
+        use_ssl=False,
+        unix_socket=socket_path,
+    )
+    start_unix_server = asyncio.start_unix_server
+
+    async def slow_start_unix_server(*args, **kwargs):
+        await asyncio.sleep(0.3)
+        return await start_unix_server(*args, **kwargs)
+
+    monkeypatch.setattr(asyncio, "start_unix_server", slow_start_unix_server)
+    with running_server(server):
+        assert unix_query(socket_path, "line1") == "Query 'line1' EXISTS"
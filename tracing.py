@@ -0,0 +1,97 @@
+import json
+import logging
+import os
+import random
+import threading
+import time
+from typing import Optional
+
+logger = logging.getLogger()
+
+# Stages of a stream request, in the order they happen
+STAGES = ("rate_limit", "read", "sanitize", "reload", "lookup", "write")
+STAGE_INDEX = {stage: index for index, stage in enumerate(STAGES)}
+
+
+# Fixed-size record of when each stage of one request finished
+class RequestTimings:
+    # One float slot per stage, allocated up front. mark() only stores a
+    # perf_counter() reading; durations are worked out after the response
+    # has been sent. Stages that never ran keep 0.0 and are skipped.
+    __slots__ = ("started", "ends")
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.ends = [0.0] * len(STAGES)
+
+    def mark(self, stage: str) -> None:
+        self.ends[STAGE_INDEX[stage]] = time.perf_counter()
+
+    def durations(self) -> dict:
+        # Returns {stage: seconds} for every stage that ran.
+        result = {}
+        previous = self.started
+        for stage, end in zip(STAGES, self.ends):
+            if end:
+                result[stage] = end - previous
+                previous = end
+        return result
+
+
+# Writes sampled request timings as Chrome trace events
+class TraceWriter:
+    # Events use the JSON Array Format and are appended as "{...},\n";
+    # chrome://tracing and Perfetto accept the missing closing bracket.
+    # Each request is its own track (tid) so stages line up per request.
+    def __init__(
+        self, path: Optional[str], sample_rate: float, flush_every: int = 1000
+    ) -> None:
+        self.path = path
+        self.sample_rate = sample_rate if path else 0.0
+        self.flush_every = flush_every
+        self.events = []
+        self.lock = threading.Lock()
+        self.pid = os.getpid()
+        # perf_counter() has an arbitrary origin; trace time is in us
+        self.origin = time.perf_counter()
+
+    def sampled(self) -> bool:
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def add(self, request_id: int, timings: RequestTimings, **args) -> bool:
+        # Buffers one complete ("X") event per stage. Returns True when
+        # the buffer is due to be flushed.
+        previous = timings.started
+        for stage, end in zip(STAGES, timings.ends):
+            if not end:
+                continue
+            self.events.append({
+                "name": stage,
+                "cat": "request",
+                "ph": "X",
+                "ts": round((previous - self.origin) * 1e6, 3),
+                "dur": round((end - previous) * 1e6, 3),
+                "pid": self.pid,
+                "tid": request_id,
+                "args": args,
+            })
+            previous = end
+        return len(self.events) >= self.flush_every
+
+    def flush(self) -> None:
+        # Appends buffered events to the trace file. Safe to call from a
+        # worker thread; the buffer is swapped before any I/O happens.
+        events, self.events = self.events, []
+        if not events or not self.path:
+            return
+        with self.lock:
+            try:
+                new_file = not os.path.exists(self.path) or \
+                    os.path.getsize(self.path) == 0
+                with open(self.path, "a") as f:
+                    if new_file:
+                        f.write("[\n")
+                    for event in events:
+                        f.write(json.dumps(event) + ",\n")
+            except OSError as e:
+                logger.error("Failed to write trace events: %s", e)